@@ -6,7 +6,10 @@ Create Date: 2025-12-14 00:06:26.086062
 
 """
 from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 import uuid
+from datetime import datetime, timezone
 
 
 # revision identifiers, used by Alembic.
@@ -16,13 +19,28 @@ branch_labels = None
 depends_on = None
 
 
+# Облегчённое описание таблицы для параметризованных INSERT/DELETE без f-string SQL
+quests_table = sa.table(
+	'quests',
+	sa.column('id', postgresql.UUID(as_uuid=False)),
+	sa.column('name', sa.String),
+	sa.column('description', sa.String),
+	sa.column('quest_type', postgresql.ENUM('daily', 'achievement', name='quest_type', create_type=False)),
+	sa.column('condition_key', sa.String),
+	sa.column('target_value', sa.Integer),
+	sa.column('reward_xp', sa.Integer),
+	sa.column('is_active', sa.Boolean),
+	sa.column('created_at', sa.DateTime(timezone=True)),
+)
+
+
+
 def upgrade() -> None:
 	# Добавляем начальные квесты
 	
 	# Achievements
 	achievements = [
 		{
-			"id": str(uuid.uuid4()),
 			"name": "Привязать все платформы",
 			"description": "Привяжи все платформы в профиле (Twitch, Discord, Steam)",
 			"quest_type": "achievement",
@@ -32,7 +50,6 @@ def upgrade() -> None:
 			"is_active": True
 		},
 		{
-			"id": str(uuid.uuid4()),
 			"name": "Написать 10000 сообщений в чате",
 			"description": "Напиши 10000 сообщений в чате на сервере",
 			"quest_type": "achievement",
@@ -42,7 +59,6 @@ def upgrade() -> None:
 			"is_active": True
 		},
 		{
-			"id": str(uuid.uuid4()),
 			"name": "Пройти 1000000 блоков в майнкрафте",
 			"description": "Пройди 1000000 блоков в майнкрафте",
 			"quest_type": "achievement",
@@ -56,7 +72,6 @@ def upgrade() -> None:
 	# Daily Quests
 	daily_quests = [
 		{
-			"id": str(uuid.uuid4()),
 			"name": "Играй 1 час",
 			"description": "Играй на сервере 1 час за день",
 			"quest_type": "daily",
@@ -66,7 +81,6 @@ def upgrade() -> None:
 			"is_active": True
 		},
 		{
-			"id": str(uuid.uuid4()),
 			"name": "Зайди на сервер",
 			"description": "Зайди на сервер",
 			"quest_type": "daily",
@@ -77,44 +91,43 @@ def upgrade() -> None:
 		}
 	]
 	
-	# Вставляем achievements
-	for achievement in achievements:
-		op.execute(f"""
-			INSERT INTO quests (id, name, description, quest_type, condition_key, target_value, reward_xp, is_active, created_at)
-			VALUES (
-				'{achievement["id"]}'::uuid,
-				'{achievement["name"].replace("'", "''")}',
-				'{achievement["description"].replace("'", "''")}',
-				'{achievement["quest_type"]}'::quest_type,
-				'{achievement["condition_key"]}',
-				{achievement["target_value"]},
-				{achievement["reward_xp"]},
-				{achievement["is_active"]},
-				NOW()
-			)
-		""")
+	# Вставляем все квесты одним multi-row INSERT вместо отдельного запроса на каждую строку
+	# (значения передаются bind-параметрами)
+	rows = achievements + daily_quests
+	
+	# Детерминированные id: одна и та же строка при каждом запуске, можно ссылаться из будущих миграций.
+	# created_at передаем явно одним значением на весь batch вместо server_default now()
+	created_at = datetime.now(timezone.utc)
+	for row in rows:
+		row["id"] = str(uuid.uuid5(uuid.NAMESPACE_OID, f"quest:{row['condition_key']}"))
+		row["created_at"] = created_at
 	
-	# Вставляем daily quests
-	for daily in daily_quests:
-		op.execute(f"""
-			INSERT INTO quests (id, name, description, quest_type, condition_key, target_value, reward_xp, is_active, created_at)
-			VALUES (
-				'{daily["id"]}'::uuid,
-				'{daily["name"].replace("'", "''")}',
-				'{daily["description"].replace("'", "''")}',
-				'{daily["quest_type"]}'::quest_type,
-				'{daily["condition_key"]}',
-				{daily["target_value"]},
-				{daily["reward_xp"]},
-				{daily["is_active"]},
-				NOW()
-			)
-		""")
+	# Повторный запуск (например, после частичного сбоя) не должен дублировать квесты: строки, чей
+	# condition_key уже есть в таблице, отсекает сам INSERT (WHERE NOT EXISTS) - без чтения через
+	# bind, так что миграция работает и в offline-режиме (alembic upgrade --sql)
+	columns = list(quests_table.c)
+	seed = sa.values(*[sa.column(column.name, column.type) for column in columns], name='seed').data(
+		[tuple(row[column.name] for column in columns) for row in rows]
+	)
+	existing = quests_table.alias('existing')
+	op.execute(
+		postgresql.insert(quests_table)
+		.from_select(
+			[column.name for column in columns],
+			# VALUES не знает типов колонок quests (uuid, enum) - приводим явно
+			sa.select(*[sa.cast(seed.c[column.name], column.type) for column in columns])
+			.where(~sa.exists().where(existing.c.condition_key == seed.c.condition_key))
+		)
+		.on_conflict_do_nothing(index_elements=['id'])
+	)
 
 
 def downgrade() -> None:
 	# Удаляем начальные квесты по condition_key
-	op.execute("""
-		DELETE FROM quests 
-		WHERE condition_key IN ('link_all_platforms', 'messages_sent', 'blocks_traveled', 'playtime_daily', 'server_join')
-	""")
+	op.execute(
+		quests_table.delete().where(
+			quests_table.c.condition_key.in_([
+				'link_all_platforms', 'messages_sent', 'blocks_traveled', 'playtime_daily', 'server_join'
+			])
+		)
+	)
@@ -8,6 +8,7 @@ Create Date: 2025-01-27 00:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
 
 
 # revision identifiers, used by Alembic.
@@ -18,9 +19,12 @@ depends_on = None
 
 
 def upgrade() -> None:
+	# Описания таблиц собираем в MetaData, а создаем одним запросом ниже
+	metadata = sa.MetaData()
+
 	# Таблица minecraft_servers - связь с game_servers
-	op.create_table(
-		'minecraft_servers',
+	sa.Table(
+		'minecraft_servers', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('game_server_id', postgresql.UUID(as_uuid=True), nullable=False),
 		sa.Column('server_uuid', sa.String(length=36), nullable=False),
@@ -31,16 +35,13 @@ def upgrade() -> None:
 		sa.Column('max_players', sa.Integer(), nullable=False, server_default='-1'),
 		sa.Column('plan_version', sa.String(length=18), nullable=False, server_default='Old'),
 		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['game_server_id'], ['game_servers.id'], ),
 		sa.UniqueConstraint('game_server_id'),
 		sa.UniqueConstraint('server_uuid')
 	)
-	op.create_index(op.f('ix_minecraft_servers_game_server_id'), 'minecraft_servers', ['game_server_id'], unique=True)
-	op.create_index(op.f('ix_minecraft_servers_server_uuid'), 'minecraft_servers', ['server_uuid'], unique=True)
 
 	# Таблица minecraft_users - базовая информация об игроках
-	op.create_table(
-		'minecraft_users',
+	sa.Table(
+		'minecraft_users', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('uuid', sa.String(length=36), nullable=False),
 		sa.Column('registered', sa.BigInteger(), nullable=False),
@@ -49,22 +50,19 @@ def upgrade() -> None:
 		sa.PrimaryKeyConstraint('id'),
 		sa.UniqueConstraint('uuid')
 	)
-	op.create_index(op.f('ix_minecraft_users_uuid'), 'minecraft_users', ['uuid'], unique=True)
-	op.create_index(op.f('ix_minecraft_users_name'), 'minecraft_users', ['name'], unique=False)
 
 	# Таблица minecraft_join_address - адреса подключений
-	op.create_table(
-		'minecraft_join_address',
+	sa.Table(
+		'minecraft_join_address', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('join_address', sa.String(length=191), nullable=False),
 		sa.PrimaryKeyConstraint('id'),
 		sa.UniqueConstraint('join_address')
 	)
-	op.create_index(op.f('ix_minecraft_join_address_join_address'), 'minecraft_join_address', ['join_address'], unique=True)
 
 	# Таблица minecraft_user_info - информация об игроке на конкретном сервере
-	op.create_table(
-		'minecraft_user_info',
+	sa.Table(
+		'minecraft_user_info', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('user_id', sa.Integer(), nullable=False),
 		sa.Column('server_id', sa.Integer(), nullable=False),
@@ -72,16 +70,12 @@ def upgrade() -> None:
 		sa.Column('registered', sa.BigInteger(), nullable=False),
 		sa.Column('opped', sa.Boolean(), nullable=False, server_default='false'),
 		sa.Column('banned', sa.Boolean(), nullable=False, server_default='false'),
-		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['user_id'], ['minecraft_users.id'], ),
-		sa.ForeignKeyConstraint(['server_id'], ['minecraft_servers.id'], )
+		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_user_info_user_id'), 'minecraft_user_info', ['user_id'], unique=False)
-	op.create_index(op.f('ix_minecraft_user_info_server_id'), 'minecraft_user_info', ['server_id'], unique=False)
 
 	# Таблица minecraft_sessions - игровые сессии
-	op.create_table(
-		'minecraft_sessions',
+	sa.Table(
+		'minecraft_sessions', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('user_id', sa.Integer(), nullable=False),
 		sa.Column('server_id', sa.Integer(), nullable=False),
@@ -91,17 +85,12 @@ def upgrade() -> None:
 		sa.Column('deaths', sa.Integer(), nullable=True),
 		sa.Column('afk_time', sa.BigInteger(), nullable=True),
 		sa.Column('join_address_id', sa.Integer(), nullable=False, server_default='1'),
-		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['user_id'], ['minecraft_users.id'], ),
-		sa.ForeignKeyConstraint(['server_id'], ['minecraft_servers.id'], ),
-		sa.ForeignKeyConstraint(['join_address_id'], ['minecraft_join_address.id'], )
+		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_sessions_user_id'), 'minecraft_sessions', ['user_id'], unique=False)
-	op.create_index(op.f('ix_minecraft_sessions_server_id'), 'minecraft_sessions', ['server_id'], unique=False)
 
 	# Таблица minecraft_nicknames - история ников
-	op.create_table(
-		'minecraft_nicknames',
+	sa.Table(
+		'minecraft_nicknames', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('uuid', sa.String(length=36), nullable=False),
 		sa.Column('nickname', sa.String(length=75), nullable=False),
@@ -109,12 +98,10 @@ def upgrade() -> None:
 		sa.Column('last_used', sa.BigInteger(), nullable=False),
 		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_nicknames_uuid'), 'minecraft_nicknames', ['uuid'], unique=False)
-	op.create_index(op.f('ix_minecraft_nicknames_server_uuid'), 'minecraft_nicknames', ['server_uuid'], unique=False)
 
 	# Таблица minecraft_kills - убийства
-	op.create_table(
-		'minecraft_kills',
+	sa.Table(
+		'minecraft_kills', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('killer_uuid', sa.String(length=36), nullable=False),
 		sa.Column('victim_uuid', sa.String(length=36), nullable=False),
@@ -122,17 +109,12 @@ def upgrade() -> None:
 		sa.Column('weapon', sa.String(length=30), nullable=True),
 		sa.Column('date', sa.BigInteger(), nullable=False),
 		sa.Column('session_id', sa.Integer(), nullable=True),
-		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['session_id'], ['minecraft_sessions.id'], )
+		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_kills_killer_uuid'), 'minecraft_kills', ['killer_uuid'], unique=False)
-	op.create_index(op.f('ix_minecraft_kills_victim_uuid'), 'minecraft_kills', ['victim_uuid'], unique=False)
-	op.create_index(op.f('ix_minecraft_kills_server_uuid'), 'minecraft_kills', ['server_uuid'], unique=False)
-	op.create_index(op.f('ix_minecraft_kills_date'), 'minecraft_kills', ['date'], unique=False)
 
 	# Таблица minecraft_ping - пинг игроков
-	op.create_table(
-		'minecraft_ping',
+	sa.Table(
+		'minecraft_ping', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('user_id', sa.Integer(), nullable=False),
 		sa.Column('server_id', sa.Integer(), nullable=False),
@@ -140,17 +122,12 @@ def upgrade() -> None:
 		sa.Column('max_ping', sa.Integer(), nullable=True),
 		sa.Column('min_ping', sa.Integer(), nullable=True),
 		sa.Column('avg_ping', sa.Double(), nullable=True),
-		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['user_id'], ['minecraft_users.id'], ),
-		sa.ForeignKeyConstraint(['server_id'], ['minecraft_servers.id'], )
+		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_ping_user_id'), 'minecraft_ping', ['user_id'], unique=False)
-	op.create_index(op.f('ix_minecraft_ping_server_id'), 'minecraft_ping', ['server_id'], unique=False)
-	op.create_index(op.f('ix_minecraft_ping_date'), 'minecraft_ping', ['date'], unique=False)
 
 	# Таблица minecraft_platforms - платформы игроков
-	op.create_table(
-		'minecraft_platforms',
+	sa.Table(
+		'minecraft_platforms', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('uuid', sa.String(length=36), nullable=False),
 		sa.Column('platform', sa.Integer(), nullable=False),
@@ -162,34 +139,30 @@ def upgrade() -> None:
 		sa.PrimaryKeyConstraint('id'),
 		sa.UniqueConstraint('uuid')
 	)
-	op.create_index(op.f('ix_minecraft_platforms_uuid'), 'minecraft_platforms', ['uuid'], unique=True)
 
 	# Таблица minecraft_plugin_versions - версии плагинов
-	op.create_table(
-		'minecraft_plugin_versions',
+	sa.Table(
+		'minecraft_plugin_versions', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('server_id', sa.Integer(), nullable=False),
 		sa.Column('plugin_name', sa.String(length=100), nullable=False),
 		sa.Column('version', sa.String(length=255), nullable=True),
 		sa.Column('modified', sa.BigInteger(), nullable=False, server_default='0'),
-		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['server_id'], ['minecraft_servers.id'], )
+		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_plugin_versions_server_id'), 'minecraft_plugin_versions', ['server_id'], unique=False)
 
 	# Таблица minecraft_worlds - миры на серверах
-	op.create_table(
-		'minecraft_worlds',
+	sa.Table(
+		'minecraft_worlds', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('world_name', sa.String(length=100), nullable=False),
 		sa.Column('server_uuid', sa.String(length=36), nullable=False),
 		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_worlds_server_uuid'), 'minecraft_worlds', ['server_uuid'], unique=False)
 
 	# Таблица minecraft_tps - производительность серверов
-	op.create_table(
-		'minecraft_tps',
+	sa.Table(
+		'minecraft_tps', metadata,
 		sa.Column('server_id', sa.Integer(), nullable=False),
 		sa.Column('date', sa.BigInteger(), nullable=False),
 		sa.Column('tps', sa.Double(), nullable=True),
@@ -199,14 +172,12 @@ def upgrade() -> None:
 		sa.Column('entities', sa.Integer(), nullable=True),
 		sa.Column('chunks_loaded', sa.Integer(), nullable=True),
 		sa.Column('free_disk_space', sa.BigInteger(), nullable=True),
-		sa.PrimaryKeyConstraint('server_id', 'date'),
-		sa.ForeignKeyConstraint(['server_id'], ['minecraft_servers.id'], )
+		sa.PrimaryKeyConstraint('server_id', 'date')
 	)
-	op.create_index(op.f('ix_minecraft_tps_date'), 'minecraft_tps', ['date'], unique=False)
 
 	# Таблица minecraft_world_times - время в разных режимах игры
-	op.create_table(
-		'minecraft_world_times',
+	sa.Table(
+		'minecraft_world_times', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('user_id', sa.Integer(), nullable=False),
 		sa.Column('world_id', sa.Integer(), nullable=False),
@@ -216,42 +187,32 @@ def upgrade() -> None:
 		sa.Column('creative_time', sa.BigInteger(), nullable=False, server_default='0'),
 		sa.Column('adventure_time', sa.BigInteger(), nullable=False, server_default='0'),
 		sa.Column('spectator_time', sa.BigInteger(), nullable=False, server_default='0'),
-		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['user_id'], ['minecraft_users.id'], ),
-		sa.ForeignKeyConstraint(['world_id'], ['minecraft_worlds.id'], ),
-		sa.ForeignKeyConstraint(['server_id'], ['minecraft_servers.id'], ),
-		sa.ForeignKeyConstraint(['session_id'], ['minecraft_sessions.id'], )
+		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_world_times_user_id'), 'minecraft_world_times', ['user_id'], unique=False)
-	op.create_index(op.f('ix_minecraft_world_times_world_id'), 'minecraft_world_times', ['world_id'], unique=False)
-	op.create_index(op.f('ix_minecraft_world_times_server_id'), 'minecraft_world_times', ['server_id'], unique=False)
 
 	# Таблица minecraft_version_protocol - версии протокола
-	op.create_table(
-		'minecraft_version_protocol',
+	sa.Table(
+		'minecraft_version_protocol', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('uuid', sa.String(length=36), nullable=False),
 		sa.Column('protocol_version', sa.Integer(), nullable=False),
 		sa.PrimaryKeyConstraint('id'),
 		sa.UniqueConstraint('uuid')
 	)
-	op.create_index(op.f('ix_minecraft_version_protocol_uuid'), 'minecraft_version_protocol', ['uuid'], unique=True)
 
 	# Таблица minecraft_geolocations - геолокации игроков
-	op.create_table(
-		'minecraft_geolocations',
+	sa.Table(
+		'minecraft_geolocations', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('user_id', sa.Integer(), nullable=False),
 		sa.Column('geolocation', sa.String(length=50), nullable=True),
 		sa.Column('last_used', sa.BigInteger(), nullable=False, server_default='0'),
-		sa.PrimaryKeyConstraint('id'),
-		sa.ForeignKeyConstraint(['user_id'], ['minecraft_users.id'], )
+		sa.PrimaryKeyConstraint('id')
 	)
-	op.create_index(op.f('ix_minecraft_geolocations_user_id'), 'minecraft_geolocations', ['user_id'], unique=False)
 
 	# Таблица minecraft_settings - настройки серверов
-	op.create_table(
-		'minecraft_settings',
+	sa.Table(
+		'minecraft_settings', metadata,
 		sa.Column('id', sa.Integer(), nullable=False),
 		sa.Column('server_uuid', sa.String(length=39), nullable=False),
 		sa.Column('updated', sa.BigInteger(), nullable=False),
@@ -259,15 +220,89 @@ def upgrade() -> None:
 		sa.PrimaryKeyConstraint('id'),
 		sa.UniqueConstraint('server_uuid')
 	)
-	op.create_index(op.f('ix_minecraft_settings_server_uuid'), 'minecraft_settings', ['server_uuid'], unique=True)
+
+	# Все CREATE TABLE одним round-trip к серверу. asyncpg не принимает несколько команд
+	# в одном запросе (prepared statement), поэтому DDL заворачиваем в один DO-блок.
+	# Каждая фаза миграции (таблицы, индексы, FK, проверка FK) коммитится отдельно
+	# в autocommit_block, чтобы блокировки не копились в одной большой транзакции
+	dialect = op.get_bind().dialect
+	ddl = ";\n".join(str(CreateTable(table).compile(dialect=dialect)).strip() for table in metadata.tables.values())
+	with op.get_context().autocommit_block():
+		op.execute(f"DO $$ BEGIN\n{ddl};\nEND $$;")
+
+	# Индексы строим CONCURRENTLY вне транзакции миграции, чтобы на заполненной БД
+	# не держать ShareLock на таблицах на время построения btree.
+	# Уникальные колонки отдельных ix_ индексов не получают - их покрывает индекс UniqueConstraint.
+	# Здесь только одноколоночные индексы: сначала по ключам и ссылкам, date-индексы в конце.
+	# Составной (user_id, server_id, session_start) для minecraft_sessions строится позже, в b7c1d2e3f4a5
+	with op.get_context().autocommit_block():
+		op.create_index(op.f('ix_minecraft_users_name'), 'minecraft_users', ['name'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_user_info_user_id'), 'minecraft_user_info', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_user_info_server_id'), 'minecraft_user_info', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_sessions_user_id'), 'minecraft_sessions', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_sessions_server_id'), 'minecraft_sessions', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_nicknames_uuid'), 'minecraft_nicknames', ['uuid'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_nicknames_server_uuid'), 'minecraft_nicknames', ['server_uuid'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_kills_killer_uuid'), 'minecraft_kills', ['killer_uuid'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_kills_victim_uuid'), 'minecraft_kills', ['victim_uuid'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_kills_server_uuid'), 'minecraft_kills', ['server_uuid'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_ping_user_id'), 'minecraft_ping', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_ping_server_id'), 'minecraft_ping', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_plugin_versions_server_id'), 'minecraft_plugin_versions', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_worlds_server_uuid'), 'minecraft_worlds', ['server_uuid'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_world_times_user_id'), 'minecraft_world_times', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_world_times_world_id'), 'minecraft_world_times', ['world_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_world_times_server_id'), 'minecraft_world_times', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_geolocations_user_id'), 'minecraft_geolocations', ['user_id'], unique=False, postgresql_concurrently=True)
+		# Индексы по date у append-only таблиц строим последними: к этому моменту
+		# остальные индексы таблиц уже построены и их страницы прогреты в кэше
+		op.create_index(op.f('ix_minecraft_ping_date'), 'minecraft_ping', ['date'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_tps_date'), 'minecraft_tps', ['date'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_minecraft_kills_date'), 'minecraft_kills', ['date'], unique=False, postgresql_concurrently=True)
+
+	# Внешние ключи добавляем после индексов: сначала NOT VALID (без проверки существующих строк),
+	# затем VALIDATE отдельно - проверка берёт лишь SHARE UPDATE EXCLUSIVE и не блокирует запись
+	with op.get_context().autocommit_block():
+		op.create_foreign_key('minecraft_servers_game_server_id_fkey', 'minecraft_servers', 'game_servers', ['game_server_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_user_info_user_id_fkey', 'minecraft_user_info', 'minecraft_users', ['user_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_user_info_server_id_fkey', 'minecraft_user_info', 'minecraft_servers', ['server_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_sessions_user_id_fkey', 'minecraft_sessions', 'minecraft_users', ['user_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_sessions_server_id_fkey', 'minecraft_sessions', 'minecraft_servers', ['server_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_sessions_join_address_id_fkey', 'minecraft_sessions', 'minecraft_join_address', ['join_address_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_kills_session_id_fkey', 'minecraft_kills', 'minecraft_sessions', ['session_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_ping_user_id_fkey', 'minecraft_ping', 'minecraft_users', ['user_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_ping_server_id_fkey', 'minecraft_ping', 'minecraft_servers', ['server_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_plugin_versions_server_id_fkey', 'minecraft_plugin_versions', 'minecraft_servers', ['server_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_tps_server_id_fkey', 'minecraft_tps', 'minecraft_servers', ['server_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_world_times_user_id_fkey', 'minecraft_world_times', 'minecraft_users', ['user_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_world_times_world_id_fkey', 'minecraft_world_times', 'minecraft_worlds', ['world_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_world_times_server_id_fkey', 'minecraft_world_times', 'minecraft_servers', ['server_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_world_times_session_id_fkey', 'minecraft_world_times', 'minecraft_sessions', ['session_id'], ['id'], postgresql_not_valid=True)
+		op.create_foreign_key('minecraft_geolocations_user_id_fkey', 'minecraft_geolocations', 'minecraft_users', ['user_id'], ['id'], postgresql_not_valid=True)
+
+	with op.get_context().autocommit_block():
+		op.execute('ALTER TABLE minecraft_servers VALIDATE CONSTRAINT minecraft_servers_game_server_id_fkey')
+		op.execute('ALTER TABLE minecraft_user_info VALIDATE CONSTRAINT minecraft_user_info_user_id_fkey')
+		op.execute('ALTER TABLE minecraft_user_info VALIDATE CONSTRAINT minecraft_user_info_server_id_fkey')
+		op.execute('ALTER TABLE minecraft_sessions VALIDATE CONSTRAINT minecraft_sessions_user_id_fkey')
+		op.execute('ALTER TABLE minecraft_sessions VALIDATE CONSTRAINT minecraft_sessions_server_id_fkey')
+		op.execute('ALTER TABLE minecraft_sessions VALIDATE CONSTRAINT minecraft_sessions_join_address_id_fkey')
+		op.execute('ALTER TABLE minecraft_kills VALIDATE CONSTRAINT minecraft_kills_session_id_fkey')
+		op.execute('ALTER TABLE minecraft_ping VALIDATE CONSTRAINT minecraft_ping_user_id_fkey')
+		op.execute('ALTER TABLE minecraft_ping VALIDATE CONSTRAINT minecraft_ping_server_id_fkey')
+		op.execute('ALTER TABLE minecraft_plugin_versions VALIDATE CONSTRAINT minecraft_plugin_versions_server_id_fkey')
+		op.execute('ALTER TABLE minecraft_tps VALIDATE CONSTRAINT minecraft_tps_server_id_fkey')
+		op.execute('ALTER TABLE minecraft_world_times VALIDATE CONSTRAINT minecraft_world_times_user_id_fkey')
+		op.execute('ALTER TABLE minecraft_world_times VALIDATE CONSTRAINT minecraft_world_times_world_id_fkey')
+		op.execute('ALTER TABLE minecraft_world_times VALIDATE CONSTRAINT minecraft_world_times_server_id_fkey')
+		op.execute('ALTER TABLE minecraft_world_times VALIDATE CONSTRAINT minecraft_world_times_session_id_fkey')
+		op.execute('ALTER TABLE minecraft_geolocations VALIDATE CONSTRAINT minecraft_geolocations_user_id_fkey')
 
 
 def downgrade() -> None:
-	op.drop_index(op.f('ix_minecraft_settings_server_uuid'), table_name='minecraft_settings')
 	op.drop_table('minecraft_settings')
 	op.drop_index(op.f('ix_minecraft_geolocations_user_id'), table_name='minecraft_geolocations')
 	op.drop_table('minecraft_geolocations')
-	op.drop_index(op.f('ix_minecraft_version_protocol_uuid'), table_name='minecraft_version_protocol')
 	op.drop_table('minecraft_version_protocol')
 	op.drop_index(op.f('ix_minecraft_world_times_server_id'), table_name='minecraft_world_times')
 	op.drop_index(op.f('ix_minecraft_world_times_world_id'), table_name='minecraft_world_times')
@@ -279,7 +314,6 @@ def downgrade() -> None:
 	op.drop_table('minecraft_worlds')
 	op.drop_index(op.f('ix_minecraft_plugin_versions_server_id'), table_name='minecraft_plugin_versions')
 	op.drop_table('minecraft_plugin_versions')
-	op.drop_index(op.f('ix_minecraft_platforms_uuid'), table_name='minecraft_platforms')
 	op.drop_table('minecraft_platforms')
 	op.drop_index(op.f('ix_minecraft_ping_date'), table_name='minecraft_ping')
 	op.drop_index(op.f('ix_minecraft_ping_server_id'), table_name='minecraft_ping')
@@ -299,11 +333,7 @@ def downgrade() -> None:
 	op.drop_index(op.f('ix_minecraft_user_info_server_id'), table_name='minecraft_user_info')
 	op.drop_index(op.f('ix_minecraft_user_info_user_id'), table_name='minecraft_user_info')
 	op.drop_table('minecraft_user_info')
-	op.drop_index(op.f('ix_minecraft_join_address_join_address'), table_name='minecraft_join_address')
 	op.drop_table('minecraft_join_address')
 	op.drop_index(op.f('ix_minecraft_users_name'), table_name='minecraft_users')
-	op.drop_index(op.f('ix_minecraft_users_uuid'), table_name='minecraft_users')
 	op.drop_table('minecraft_users')
-	op.drop_index(op.f('ix_minecraft_servers_server_uuid'), table_name='minecraft_servers')
-	op.drop_index(op.f('ix_minecraft_servers_game_server_id'), table_name='minecraft_servers')
 	op.drop_table('minecraft_servers')
@@ -6,7 +6,6 @@ Create Date: 2025-01-16 16:00:00.000000
 
 """
 from alembic import op
-import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
 
@@ -19,18 +18,13 @@ depends_on = None
 
 def upgrade() -> None:
 	# Создаем enum для статуса сервера (если еще не существует)
-	op.execute("""
-		DO $$ BEGIN
-			CREATE TYPE server_status AS ENUM ('active', 'disabled', 'maintenance');
-		EXCEPTION
-			WHEN duplicate_object THEN null;
-		END $$;
-	""")
-	
+	# checkfirst проверяет pg_type - без DO-блока с EXCEPTION, который открывает SAVEPOINT
 	server_status_enum = postgresql.ENUM('active', 'disabled', 'maintenance', name='server_status', create_type=False)
+	server_status_enum.create(op.get_bind(), checkfirst=True)
 	
 	# Добавляем колонку status в таблицу game_servers
-	op.add_column('game_servers', sa.Column('status', server_status_enum, nullable=False, server_default='active'))
+	# Константный DEFAULT (PG11+): колонка добавляется только в каталог, без перезаписи таблицы
+	op.execute("ALTER TABLE game_servers ADD COLUMN status server_status DEFAULT 'active' NOT NULL")
 	op.create_index(op.f('ix_game_servers_status'), 'game_servers', ['status'], unique=False)
 
 
@@ -6,8 +6,6 @@ Create Date: 2025-12-13 12:40:16.764136
 
 """
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import text
 
 
 # revision identifiers, used by Alembic.
@@ -18,17 +16,8 @@ depends_on = None
 
 
 def upgrade() -> None:
-	conn = op.get_bind()
-	
-	# Проверяем наличие столбца
-	result = conn.execute(text("""
-		SELECT column_name 
-		FROM information_schema.columns 
-		WHERE table_name = 'badges' AND column_name = 'unicode_char'
-	"""))
-	
-	if result.fetchone() is None:
-		op.add_column('badges', sa.Column('unicode_char', sa.String(), nullable=True))
+	# ADD COLUMN IF NOT EXISTS вместо предварительной проверки через information_schema
+	op.execute('ALTER TABLE badges ADD COLUMN IF NOT EXISTS unicode_char VARCHAR')
 
 
 def downgrade() -> None:
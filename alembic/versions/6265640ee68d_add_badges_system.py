@@ -19,15 +19,9 @@ depends_on = None
 
 def upgrade() -> None:
 	# Создаем enum для типа бэйджа (если еще не существует)
-	op.execute("""
-		DO $$ BEGIN
-			CREATE TYPE badge_type AS ENUM ('temporary', 'event', 'permanent');
-		EXCEPTION
-			WHEN duplicate_object THEN null;
-		END $$;
-	""")
-	
+	# checkfirst проверяет pg_type - без DO-блока с EXCEPTION, который открывает SAVEPOINT
 	badge_type_enum = postgresql.ENUM('temporary', 'event', 'permanent', name='badge_type', create_type=False)
+	badge_type_enum.create(op.get_bind(), checkfirst=True)
 	
 	# Создаем таблицу badges
 	op.create_table(
@@ -58,9 +52,15 @@ def upgrade() -> None:
 	op.create_index(op.f('ix_user_badges_user_id'), 'user_badges', ['user_id'], unique=False)
 	op.create_index(op.f('ix_user_badges_badge_id'), 'user_badges', ['badge_id'], unique=False)
 	
-	# Добавляем поле selected_badge_id в users
-	op.add_column('users', sa.Column('selected_badge_id', postgresql.UUID(as_uuid=True), nullable=True))
-	op.create_foreign_key('fk_users_selected_badge_id', 'users', 'badges', ['selected_badge_id'], ['id'])
+	# Добавляем поле selected_badge_id в users: колонка и FK одним ALTER TABLE (одна блокировка users),
+	# FK сначала NOT VALID, проверка - отдельно вне транзакции, чтобы не блокировать запись в users
+	op.execute("""
+		ALTER TABLE users
+			ADD COLUMN selected_badge_id UUID,
+			ADD CONSTRAINT fk_users_selected_badge_id FOREIGN KEY (selected_badge_id) REFERENCES badges (id) NOT VALID
+	""")
+	with op.get_context().autocommit_block():
+		op.execute('ALTER TABLE users VALIDATE CONSTRAINT fk_users_selected_badge_id')
 
 
 def downgrade() -> None:
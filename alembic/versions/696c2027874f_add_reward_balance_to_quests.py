@@ -6,8 +6,7 @@ Create Date: 2025-12-14 00:56:55.539626
 
 """
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import inspect
+from sqlalchemy import text
 
 
 # revision identifiers, used by Alembic.
@@ -20,17 +19,20 @@ depends_on = None
 def drop_column_if_exists(table_name: str, column_name: str) -> None:
 	"""Безопасно удаляет колонку, если она существует"""
 	conn = op.get_bind()
-	inspector = inspect(conn)
-	if not inspector.has_table(table_name):
-		return
-	columns = [col['name'] for col in inspector.get_columns(table_name)]
-	if column_name in columns:
+	# pg_attribute напрямую вместо рефлексии inspect(): один запрос, без information_schema
+	column_exists = conn.execute(text("""
+		SELECT 1 
+		FROM pg_attribute 
+		WHERE attrelid = to_regclass(:table_name) AND attname = :column_name AND attnum > 0 AND NOT attisdropped
+	"""), {'table_name': table_name, 'column_name': column_name}).scalar()
+	if column_exists:
 		op.drop_column(table_name, column_name)
 
 
 def upgrade() -> None:
 	# Добавляем колонку reward_balance в quests
-	op.add_column('quests', sa.Column('reward_balance', sa.Integer(), nullable=False, server_default='0'))
+	# Константный DEFAULT (PG11+): колонка добавляется только в каталог, без перезаписи таблицы
+	op.execute('ALTER TABLE quests ADD COLUMN reward_balance INTEGER DEFAULT 0 NOT NULL')
 
 
 def downgrade() -> None:
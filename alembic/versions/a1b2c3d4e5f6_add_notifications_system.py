@@ -34,10 +34,11 @@ def upgrade() -> None:
 		sa.ForeignKeyConstraint(['user_id'], ['users.id'], )
 	)
 	
-	# Создаем индексы
-	op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
-	op.create_index(op.f('ix_notifications_created_at'), 'notifications', ['created_at'], unique=False)
-	op.create_index('ix_notifications_user_created', 'notifications', ['user_id', sa.text('created_at DESC')], unique=False)
+	# Создаем индексы (CONCURRENTLY - без блокировки записи в таблицу)
+	with op.get_context().autocommit_block():
+		op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_notifications_created_at'), 'notifications', ['created_at'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_notifications_user_created', 'notifications', ['user_id', sa.text('created_at DESC')], unique=False, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
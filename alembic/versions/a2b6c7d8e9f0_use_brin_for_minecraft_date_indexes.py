@@ -0,0 +1,45 @@
+"""use_brin_for_minecraft_date_indexes
+
+Revision ID: a2b6c7d8e9f0
+Revises: f1a5b6c7d8e9
+Create Date: 2026-10-15 12:50:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2b6c7d8e9f0'
+down_revision = 'f1a5b6c7d8e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# date в append-only таблицах монотонно растет - BRIN хранит по записи на диапазон страниц
+	# вместо записи на строку. У minecraft_ping date покрыт btree (user_id, server_id, date DESC)
+	# под ORDER BY date DESC LIMIT k, поэтому там оставляем btree.
+	# Таблицы партиционированы - CONCURRENTLY недоступен
+	op.create_index(
+		'ix_minecraft_tps_date_brin',
+		'minecraft_tps',
+		['date'],
+		unique=False,
+		postgresql_using='brin',
+		postgresql_with={'pages_per_range': 32}
+	)
+	op.drop_index('ix_minecraft_tps_date', table_name='minecraft_tps')
+	op.create_index(
+		'ix_minecraft_kills_date_brin',
+		'minecraft_kills',
+		['date'],
+		unique=False,
+		postgresql_using='brin',
+		postgresql_with={'pages_per_range': 32}
+	)
+
+
+def downgrade() -> None:
+	op.drop_index('ix_minecraft_kills_date_brin', table_name='minecraft_kills')
+	op.create_index('ix_minecraft_tps_date', 'minecraft_tps', ['date'], unique=False)
+	op.drop_index('ix_minecraft_tps_date_brin', table_name='minecraft_tps')
@@ -6,7 +6,6 @@ Create Date: 2025-01-20 12:00:00.000000
 
 """
 from alembic import op
-import sqlalchemy as sa
 from sqlalchemy import text
 
 
@@ -20,23 +19,26 @@ depends_on = None
 def upgrade() -> None:
 	conn = op.get_bind()
 	
-	# Проверяем наличие столбцов
+	# Проверяем наличие столбцов (pg_attribute напрямую - без представлений information_schema)
 	result = conn.execute(text("""
-		SELECT column_name 
-		FROM information_schema.columns 
-		WHERE table_name = 'game_servers'
+		SELECT attname 
+		FROM pg_attribute 
+		WHERE attrelid = 'game_servers'::regclass AND attnum > 0 AND NOT attisdropped
 	"""))
 	existing_columns = {row[0] for row in result}
 	
-	if 'season_start' not in existing_columns:
-		op.add_column('game_servers', sa.Column('season_start', sa.Date(), nullable=True))
-	if 'season_end' not in existing_columns:
-		op.add_column('game_servers', sa.Column('season_end', sa.Date(), nullable=True))
+	# Недостающие колонки добавляем одним ALTER TABLE (одна блокировка таблицы)
+	new_columns = [
+		f'ADD COLUMN {name} DATE'
+		for name in ('season_start', 'season_end')
+		if name not in existing_columns
+	]
+	if new_columns:
+		op.execute(f"ALTER TABLE game_servers {', '.join(new_columns)}")
 
 
 def downgrade() -> None:
-	op.drop_column('game_servers', 'season_end')
-	op.drop_column('game_servers', 'season_start')
+	op.execute('ALTER TABLE game_servers DROP COLUMN season_end, DROP COLUMN season_start')
 
 
 
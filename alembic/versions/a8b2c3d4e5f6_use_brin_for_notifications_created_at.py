@@ -0,0 +1,40 @@
+"""use_brin_for_notifications_created_at
+
+Revision ID: a8b2c3d4e5f6
+Revises: f7a1b2c3d4e5
+Create Date: 2026-10-15 13:50:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8b2c3d4e5f6'
+down_revision = 'f7a1b2c3d4e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# notifications - append-only, created_at растет вместе с физическим порядком строк:
+	# для выборок по диапазону времени хватает BRIN (запись на диапазон страниц, а не на строку).
+	# Выдача уведомлений пользователя идет по btree (user_id, created_at DESC), он остается.
+	# ix_activities_created_at не заменяем: лента без фильтра читает его под ORDER BY created_at DESC LIMIT k,
+	# а BRIN порядок не отдает
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'ix_notifications_created_at_brin',
+			'notifications',
+			['created_at'],
+			unique=False,
+			postgresql_using='brin',
+			postgresql_with={'pages_per_range': 32},
+			postgresql_concurrently=True
+		)
+		op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_notifications_created_at')
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.create_index('ix_notifications_created_at', 'notifications', ['created_at'], unique=False, postgresql_concurrently=True)
+		op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_notifications_created_at_brin')
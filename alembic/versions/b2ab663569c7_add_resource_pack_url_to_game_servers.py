@@ -6,7 +6,6 @@ Create Date: 2025-12-13 11:43:53.142893
 
 """
 from alembic import op
-import sqlalchemy as sa
 from sqlalchemy import text
 
 
@@ -20,20 +19,23 @@ depends_on = None
 def upgrade() -> None:
 	conn = op.get_bind()
 	
-	# Проверяем наличие столбцов
+	# Проверяем наличие столбцов (pg_attribute напрямую - без представлений information_schema)
 	result = conn.execute(text("""
-		SELECT column_name 
-		FROM information_schema.columns 
-		WHERE table_name = 'game_servers'
+		SELECT attname 
+		FROM pg_attribute 
+		WHERE attrelid = 'game_servers'::regclass AND attnum > 0 AND NOT attisdropped
 	"""))
 	existing_columns = {row[0] for row in result}
 	
-	if 'resource_pack_url' not in existing_columns:
-		op.add_column('game_servers', sa.Column('resource_pack_url', sa.String(), nullable=True))
-	if 'resource_pack_hash' not in existing_columns:
-		op.add_column('game_servers', sa.Column('resource_pack_hash', sa.String(), nullable=True))
+	# Недостающие колонки добавляем одним ALTER TABLE (одна блокировка таблицы)
+	new_columns = [
+		f'ADD COLUMN {name} VARCHAR'
+		for name in ('resource_pack_url', 'resource_pack_hash')
+		if name not in existing_columns
+	]
+	if new_columns:
+		op.execute(f"ALTER TABLE game_servers {', '.join(new_columns)}")
 
 
 def downgrade() -> None:
-	op.drop_column('game_servers', 'resource_pack_hash')
-	op.drop_column('game_servers', 'resource_pack_url')
+	op.execute('ALTER TABLE game_servers DROP COLUMN resource_pack_hash, DROP COLUMN resource_pack_url')
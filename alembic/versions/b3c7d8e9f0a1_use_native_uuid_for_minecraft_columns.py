@@ -0,0 +1,102 @@
+"""use_native_uuid_for_minecraft_columns
+
+Revision ID: b3c7d8e9f0a1
+Revises: a2b6c7d8e9f0
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3c7d8e9f0a1'
+down_revision = 'a2b6c7d8e9f0'
+branch_labels = None
+depends_on = None
+
+
+# (таблица, колонка) - UUID из игры, хранившиеся строкой VARCHAR(36)
+UUID_COLUMNS = [
+	('minecraft_servers', 'server_uuid'),
+	('minecraft_users', 'uuid'),
+	('minecraft_nicknames', 'uuid'),
+	('minecraft_nicknames', 'server_uuid'),
+	('minecraft_kills', 'killer_uuid'),
+	('minecraft_kills', 'victim_uuid'),
+	('minecraft_kills', 'server_uuid'),
+	('minecraft_worlds', 'server_uuid'),
+	('minecraft_platforms', 'uuid'),
+	('minecraft_version_protocol', 'uuid'),
+]
+
+# (таблица, колонка, прежний тип) - свободные строки, длина которых ничего не ограничивает
+TEXT_COLUMNS = [
+	('minecraft_join_address', 'join_address', 'VARCHAR(191)'),
+	('minecraft_user_info', 'join_address', 'VARCHAR(191)'),
+	('minecraft_servers', 'plan_version', 'VARCHAR(18)'),
+]
+
+
+# Формы, которые принимает ввод типа uuid в Postgres: группы по 4 hex-цифры, дефис после любой из них,
+# необязательные фигурные скобки
+UUID_INPUT_RE = r'^\{?[0-9a-fA-F]{4}(-?[0-9a-fA-F]{4}){7}\}?$'
+
+
+def check_uuid_columns(conn) -> None:
+	"""Перед ALTER проверяем, что все значения приводятся к uuid и не сталкиваются в уникальных колонках:
+	иначе миграция упадет посреди цепочки на невнятной ошибке. Перечисляем колонки и примеры значений"""
+	problems = []
+	for table, column in UUID_COLUMNS:
+		count, samples = conn.execute(sa.text(
+			f"SELECT COUNT(*), (array_agg(DISTINCT {column}))[1:5] FROM {table} "
+			f"WHERE {column} IS NOT NULL AND {column} !~ :pattern"
+		), {'pattern': UUID_INPUT_RE}).one()
+		if count:
+			problems.append(f"  {table}.{column}: {count} rows are not UUIDs, e.g. {', '.join(repr(s) for s in samples)}")
+			continue
+
+		# Уникальная колонка: разные написания одного UUID ('ABC...' и 'abc...') после приведения совпадут
+		has_unique_index = conn.execute(sa.text(
+			"SELECT EXISTS (SELECT 1 FROM pg_index i "
+			"JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+			"WHERE i.indrelid = CAST(:table AS regclass) AND i.indisunique AND i.indnatts = 1 "
+			"AND a.attname = :column)"
+		), {'table': table, 'column': column}).scalar()
+		if not has_unique_index:
+			continue
+		duplicates = conn.execute(sa.text(
+			f"SELECT array_agg({column} ORDER BY {column}) FROM {table} "
+			f"WHERE {column} IS NOT NULL GROUP BY {column}::uuid HAVING COUNT(*) > 1 LIMIT 5"
+		)).scalars().all()
+		if duplicates:
+			problems.append(
+				f"  {table}.{column}: one UUID spelled several ways, e.g. "
+				+ "; ".join(", ".join(repr(s) for s in values) for values in duplicates)
+			)
+	if problems:
+		raise RuntimeError(
+			"Minecraft UUID columns can't be converted to uuid:\n"
+			+ "\n".join(problems) + "\n"
+			"Fix or delete these rows and run the migration again."
+		)
+
+
+def upgrade() -> None:
+	# В offline-режиме (--sql) данных нет, проверять нечего
+	if not op.get_context().as_sql:
+		check_uuid_columns(op.get_bind())
+
+	# Нативный UUID - 16 байт вместо 36 символов + заголовок varlena: индексы по этим колонкам
+	# примерно вдвое компактнее. minecraft_settings.server_uuid (VARCHAR(39)) не UUID и не трогаем
+	for table, column in UUID_COLUMNS:
+		op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE UUID USING {column}::uuid')
+	for table, column, _ in TEXT_COLUMNS:
+		op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE TEXT')
+
+
+def downgrade() -> None:
+	for table, column, old_type in TEXT_COLUMNS:
+		op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {old_type}')
+	for table, column in UUID_COLUMNS:
+		op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR(36) USING {column}::text')
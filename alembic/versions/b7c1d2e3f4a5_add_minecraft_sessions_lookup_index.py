@@ -0,0 +1,39 @@
+"""add_minecraft_sessions_lookup_index
+
+Revision ID: b7c1d2e3f4a5
+Revises: dc3aa69c4a86
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c1d2e3f4a5'
+down_revision = 'dc3aa69c4a86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# Составной индекс под поиск сессии при импорте статистики
+	# (user_id, server_id, session_start) - см. process_statistics_batch.
+	# Одиночные ix_minecraft_sessions_user_id/server_id к этому моменту уже построены (32d19276e205);
+	# новые узкие индексы по префиксу составного добавлять не нужно
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'ix_minecraft_sessions_user_server_start',
+			'minecraft_sessions',
+			['user_id', 'server_id', 'session_start'],
+			unique=False,
+			postgresql_concurrently=True
+		)
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.drop_index(
+			'ix_minecraft_sessions_user_server_start',
+			table_name='minecraft_sessions',
+			postgresql_concurrently=True
+		)
@@ -0,0 +1,29 @@
+"""drop_resource_progress_duplicate_index
+
+Revision ID: b9c3d4e5f6a7
+Revises: a8b2c3d4e5f6
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9c3d4e5f6a7'
+down_revision = 'a8b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# resource_progress остается отдельной таблицей: прогресс привязан к (server_id, resource_type)
+	# и переживает удаление, пересоздание и правку цели, поэтому данные не переносятся и не удаляются.
+	# Инкремент идет через upsert по uq_resource_progress_server_resource, обычный индекс
+	# на тех же колонках его только дублирует
+	with op.get_context().autocommit_block():
+		op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_resource_progress_server_resource')
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.create_index('ix_resource_progress_server_resource', 'resource_progress', ['server_id', 'resource_type'], unique=False, postgresql_concurrently=True)
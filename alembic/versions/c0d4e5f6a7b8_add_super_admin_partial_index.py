@@ -0,0 +1,35 @@
+"""add_super_admin_partial_index
+
+Revision ID: c0d4e5f6a7b8
+Revises: b9c3d4e5f6a7
+Create Date: 2026-10-15 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c0d4e5f6a7b8'
+down_revision = 'b9c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# Частичный индекс только по super admin (их единицы): EXISTS в check-super-admin
+	# и create-super-admin читает одну страницу индекса вместо скана users
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'ix_users_is_super_admin',
+			'users',
+			['id'],
+			unique=False,
+			postgresql_where=sa.text('is_super_admin'),
+			postgresql_concurrently=True
+		)
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.drop_index('ix_users_is_super_admin', table_name='users', postgresql_concurrently=True)
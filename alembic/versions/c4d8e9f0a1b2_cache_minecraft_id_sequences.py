@@ -0,0 +1,35 @@
+"""cache_minecraft_id_sequences
+
+Revision ID: c4d8e9f0a1b2
+Revises: b3c7d8e9f0a1
+Create Date: 2026-10-15 13:10:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e9f0a1b2'
+down_revision = 'b3c7d8e9f0a1'
+branch_labels = None
+depends_on = None
+
+
+# Последовательности таблиц с высокой частотой вставок из batch-статистики
+HIGH_RATE_SEQUENCES = [
+	'minecraft_kills_id_seq',
+	'minecraft_sessions_id_seq',
+	'minecraft_ping_id_seq',
+]
+
+
+def upgrade() -> None:
+	# Каждое соединение резервирует блок значений и не обращается к последовательности на каждую строку.
+	# id остаются уникальными, но могут идти с пропусками и не в порядке вставки
+	for sequence in HIGH_RATE_SEQUENCES:
+		op.execute(f'ALTER SEQUENCE {sequence} CACHE 1000')
+
+
+def downgrade() -> None:
+	for sequence in HIGH_RATE_SEQUENCES:
+		op.execute(f'ALTER SEQUENCE {sequence} CACHE 1')
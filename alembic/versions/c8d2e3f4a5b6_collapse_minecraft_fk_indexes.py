@@ -0,0 +1,57 @@
+"""collapse_minecraft_fk_indexes
+
+Revision ID: c8d2e3f4a5b6
+Revises: b7c1d2e3f4a5
+Create Date: 2026-10-15 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d2e3f4a5b6'
+down_revision = 'b7c1d2e3f4a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# Заменяем одиночные индексы по FK на составные: запросы фильтруют по (user_id, server_id)
+	# вместе, а FK-поиск по user_id покрывается префиксом составного индекса
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'ix_minecraft_world_times_user_server_world',
+			'minecraft_world_times',
+			['user_id', 'server_id', 'world_id'],
+			unique=False,
+			postgresql_concurrently=True
+		)
+		op.drop_index('ix_minecraft_world_times_user_id', table_name='minecraft_world_times', postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_world_times_server_id', table_name='minecraft_world_times', postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_world_times_world_id', table_name='minecraft_world_times', postgresql_concurrently=True)
+
+		# date DESC - под выборки последних замеров пинга игрока на сервере
+		op.create_index(
+			'ix_minecraft_ping_user_server_date',
+			'minecraft_ping',
+			['user_id', 'server_id', sa.text('date DESC')],
+			unique=False,
+			postgresql_concurrently=True
+		)
+		op.drop_index('ix_minecraft_ping_user_id', table_name='minecraft_ping', postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_ping_server_id', table_name='minecraft_ping', postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_ping_date', table_name='minecraft_ping', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.create_index('ix_minecraft_ping_date', 'minecraft_ping', ['date'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_minecraft_ping_server_id', 'minecraft_ping', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_minecraft_ping_user_id', 'minecraft_ping', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_ping_user_server_date', table_name='minecraft_ping', postgresql_concurrently=True)
+
+		op.create_index('ix_minecraft_world_times_world_id', 'minecraft_world_times', ['world_id'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_minecraft_world_times_server_id', 'minecraft_world_times', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_minecraft_world_times_user_id', 'minecraft_world_times', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_world_times_user_server_world', table_name='minecraft_world_times', postgresql_concurrently=True)
@@ -0,0 +1,36 @@
+"""add_admins_covering_index
+
+Revision ID: d1e5f6a7b8c9
+Revises: c0d4e5f6a7b8
+Create Date: 2026-10-15 14:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1e5f6a7b8c9'
+down_revision = 'c0d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# /admin/list: WHERE is_admin OR is_super_admin ORDER BY created_at - частичный индекс отдает строки
+	# уже в нужном порядке, а колонки ответа в INCLUDE позволяют обойтись без чтения heap
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'ix_users_admins_created',
+			'users',
+			['created_at'],
+			unique=False,
+			postgresql_where=sa.text('is_admin OR is_super_admin'),
+			postgresql_include=['id', 'email', 'username', 'is_admin', 'is_super_admin'],
+			postgresql_concurrently=True
+		)
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.drop_index('ix_users_admins_created', table_name='users', postgresql_concurrently=True)
@@ -6,7 +6,6 @@ Create Date: 2025-12-12 19:03:36.432624
 
 """
 from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -17,7 +16,8 @@ depends_on = None
 
 
 def upgrade() -> None:
-	op.add_column('users', sa.Column('balance', sa.Integer(), nullable=False, server_default='0'))
+	# Константный DEFAULT (PG11+): колонка добавляется только в каталог, без перезаписи таблицы
+	op.execute('ALTER TABLE users ADD COLUMN balance INTEGER DEFAULT 0 NOT NULL')
 
 
 def downgrade() -> None:
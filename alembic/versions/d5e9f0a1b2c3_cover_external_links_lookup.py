@@ -0,0 +1,41 @@
+"""cover_external_links_lookup
+
+Revision ID: d5e9f0a1b2c3
+Revises: c4d8e9f0a1b2
+Create Date: 2026-10-15 13:20:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e9f0a1b2c3'
+down_revision = 'c4d8e9f0a1b2'
+branch_labels = None
+depends_on = None
+
+
+def replace_unique_index(include_sql: str) -> None:
+	"""Перестраивает индекс uq_platform_external_id (platform, external_id) с заданным INCLUDE"""
+	with op.get_context().autocommit_block():
+		op.execute('DROP INDEX CONCURRENTLY IF EXISTS uq_platform_external_id_new')
+		op.execute(
+			'CREATE UNIQUE INDEX CONCURRENTLY uq_platform_external_id_new '
+			f'ON external_links (platform, external_id){include_sql}'
+		)
+	# Подмена ограничения на готовый индекс - короткая блокировка без повторного построения btree
+	op.execute('ALTER TABLE external_links DROP CONSTRAINT uq_platform_external_id')
+	op.execute(
+		'ALTER TABLE external_links '
+		'ADD CONSTRAINT uq_platform_external_id UNIQUE USING INDEX uq_platform_external_id_new'
+	)
+
+
+def upgrade() -> None:
+	# Поиск привязки по (platform, external_id) читает user_id и platform_username -
+	# с INCLUDE это index-only scan без обращения к heap
+	replace_unique_index(' INCLUDE (user_id, platform_username)')
+
+
+def downgrade() -> None:
+	replace_unique_index('')
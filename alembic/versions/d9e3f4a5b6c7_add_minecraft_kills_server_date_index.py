@@ -0,0 +1,38 @@
+"""add_minecraft_kills_server_date_index
+
+Revision ID: d9e3f4a5b6c7
+Revises: c8d2e3f4a5b6
+Create Date: 2026-10-15 12:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9e3f4a5b6c7'
+down_revision = 'c8d2e3f4a5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# Убийства на сервере за временное окно: один составной индекс вместо BitmapAnd
+	# по отдельным server_uuid и date. killer_uuid/victim_uuid остаются одиночными
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'ix_minecraft_kills_server_date',
+			'minecraft_kills',
+			['server_uuid', sa.text('date DESC')],
+			unique=False,
+			postgresql_concurrently=True
+		)
+		op.drop_index('ix_minecraft_kills_server_uuid', table_name='minecraft_kills', postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_kills_date', table_name='minecraft_kills', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.create_index('ix_minecraft_kills_date', 'minecraft_kills', ['date'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_minecraft_kills_server_uuid', 'minecraft_kills', ['server_uuid'], unique=False, postgresql_concurrently=True)
+		op.drop_index('ix_minecraft_kills_server_date', table_name='minecraft_kills', postgresql_concurrently=True)
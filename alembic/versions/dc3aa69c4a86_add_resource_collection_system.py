@@ -32,9 +32,6 @@ def upgrade() -> None:
 		sa.PrimaryKeyConstraint('id'),
 		sa.ForeignKeyConstraint(['server_id'], ['game_servers.id'], )
 	)
-	op.create_index(op.f('ix_resource_goals_server_id'), 'resource_goals', ['server_id'], unique=False)
-	op.create_index(op.f('ix_resource_goals_resource_type'), 'resource_goals', ['resource_type'], unique=False)
-	op.create_index('ix_resource_goals_server_resource', 'resource_goals', ['server_id', 'resource_type'], unique=False)
 	
 	# Создаем таблицу resource_progress
 	op.create_table(
@@ -48,9 +45,15 @@ def upgrade() -> None:
 		sa.ForeignKeyConstraint(['server_id'], ['game_servers.id'], ),
 		sa.UniqueConstraint('server_id', 'resource_type', name='uq_resource_progress_server_resource')
 	)
-	op.create_index(op.f('ix_resource_progress_server_id'), 'resource_progress', ['server_id'], unique=False)
-	op.create_index(op.f('ix_resource_progress_resource_type'), 'resource_progress', ['resource_type'], unique=False)
-	op.create_index('ix_resource_progress_server_resource', 'resource_progress', ['server_id', 'resource_type'], unique=False)
+	
+	# Индексы обеих таблиц строим после их создания, CONCURRENTLY - без блокировки записи
+	with op.get_context().autocommit_block():
+		op.create_index(op.f('ix_resource_goals_server_id'), 'resource_goals', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_resource_goals_resource_type'), 'resource_goals', ['resource_type'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_resource_goals_server_resource', 'resource_goals', ['server_id', 'resource_type'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_resource_progress_server_id'), 'resource_progress', ['server_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_resource_progress_resource_type'), 'resource_progress', ['resource_type'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_resource_progress_server_resource', 'resource_progress', ['server_id', 'resource_type'], unique=False, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
@@ -8,7 +8,6 @@ Create Date: 2025-12-13 20:58:00.912484
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
-from sqlalchemy import inspect
 
 
 # revision identifiers, used by Alembic.
@@ -18,47 +17,11 @@ branch_labels = None
 depends_on = None
 
 
-def drop_index_if_exists(index_name: str, table_name: str) -> None:
-	"""Безопасно удаляет индекс, если он существует"""
-	conn = op.get_bind()
-	inspector = inspect(conn)
-	if not inspector.has_table(table_name):
-		return
-	indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
-	if index_name in indexes:
-		op.drop_index(index_name, table_name=table_name)
-
-
-def drop_table_if_exists(table_name: str) -> None:
-	"""Безопасно удаляет таблицу, если она существует"""
-	conn = op.get_bind()
-	inspector = inspect(conn)
-	if inspector.has_table(table_name):
-		op.drop_table(table_name)
-
-
-def drop_column_if_exists(table_name: str, column_name: str) -> None:
-	"""Безопасно удаляет колонку, если она существует"""
-	conn = op.get_bind()
-	inspector = inspect(conn)
-	if not inspector.has_table(table_name):
-		return
-	columns = [col['name'] for col in inspector.get_columns(table_name)]
-	if column_name in columns:
-		op.drop_column(table_name, column_name)
-
-
 def upgrade() -> None:
 	# Создаем enum для типа квеста
-	op.execute("""
-		DO $$ BEGIN
-			CREATE TYPE quest_type AS ENUM ('daily', 'achievement');
-		EXCEPTION
-			WHEN duplicate_object THEN null;
-		END $$;
-	""")
-	
+	# checkfirst проверяет pg_type - без DO-блока с EXCEPTION, который открывает SAVEPOINT
 	quest_type_enum = postgresql.ENUM('daily', 'achievement', name='quest_type', create_type=False)
+	quest_type_enum.create(op.get_bind(), checkfirst=True)
 	
 	# Создаем таблицу quests
 	op.create_table(
@@ -94,16 +57,15 @@ def upgrade() -> None:
 		sa.ForeignKeyConstraint(['quest_id'], ['quests.id'], ),
 		sa.UniqueConstraint('user_id', 'quest_id', 'quest_date', name='uq_user_quest_date')
 	)
-	op.create_index(op.f('ix_user_quests_user_id'), 'user_quests', ['user_id'], unique=False)
-	op.create_index(op.f('ix_user_quests_quest_id'), 'user_quests', ['quest_id'], unique=False)
-	op.create_index(op.f('ix_user_quests_quest_date'), 'user_quests', ['quest_date'], unique=False)
 	
 	# Расширяем таблицу badges
-	op.add_column('badges', sa.Column('condition_key', sa.String(), nullable=True))
-	op.add_column('badges', sa.Column('target_value', sa.Integer(), nullable=True))
-	op.add_column('badges', sa.Column('auto_check', sa.Boolean(), nullable=False, server_default='false'))
-	op.create_index(op.f('ix_badges_condition_key'), 'badges', ['condition_key'], unique=False)
-	op.create_index(op.f('ix_badges_auto_check'), 'badges', ['auto_check'], unique=False)
+	# Все новые колонки одним ALTER TABLE (одна блокировка таблицы)
+	op.execute(
+		'ALTER TABLE badges '
+		'ADD COLUMN condition_key VARCHAR, '
+		'ADD COLUMN target_value INTEGER, '
+		'ADD COLUMN auto_check BOOLEAN DEFAULT false NOT NULL'
+	)
 	
 	# Создаем таблицу user_badge_progress
 	op.create_table(
@@ -120,33 +82,30 @@ def upgrade() -> None:
 	)
 	op.create_index(op.f('ix_user_badge_progress_user_id'), 'user_badge_progress', ['user_id'], unique=False)
 	op.create_index(op.f('ix_user_badge_progress_badge_id'), 'user_badge_progress', ['badge_id'], unique=False)
+	
+	# Индексы user_quests и уже заполненной таблицы badges строим последними,
+	# CONCURRENTLY (без блокировки записи) и с увеличенной памятью на сортировку
+	with op.get_context().autocommit_block():
+		op.execute("SET maintenance_work_mem = '256MB'")
+		op.create_index(op.f('ix_user_quests_user_id'), 'user_quests', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_user_quests_quest_id'), 'user_quests', ['quest_id'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_user_quests_quest_date'), 'user_quests', ['quest_date'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_badges_condition_key'), 'badges', ['condition_key'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_badges_auto_check'), 'badges', ['auto_check'], unique=False, postgresql_concurrently=True)
+		op.execute('RESET maintenance_work_mem')
 
 
 def downgrade() -> None:
-	# Удаляем таблицу user_badge_progress
-	drop_index_if_exists('ix_user_badge_progress_badge_id', 'user_badge_progress')
-	drop_index_if_exists('ix_user_badge_progress_user_id', 'user_badge_progress')
-	drop_table_if_exists('user_badge_progress')
+	# Таблицы одним DROP: CASCADE удаляет их индексы и внешние ключи вместе с таблицами
+	op.execute('DROP TABLE IF EXISTS user_badge_progress, user_quests, quests CASCADE')
 	
-	# Удаляем колонки из badges
-	drop_index_if_exists('ix_badges_auto_check', 'badges')
-	drop_index_if_exists('ix_badges_condition_key', 'badges')
-	drop_column_if_exists('badges', 'auto_check')
-	drop_column_if_exists('badges', 'target_value')
-	drop_column_if_exists('badges', 'condition_key')
-	
-	# Удаляем таблицу user_quests
-	drop_index_if_exists('ix_user_quests_quest_date', 'user_quests')
-	drop_index_if_exists('ix_user_quests_quest_id', 'user_quests')
-	drop_index_if_exists('ix_user_quests_user_id', 'user_quests')
-	drop_table_if_exists('user_quests')
-	
-	# Удаляем таблицу quests
-	drop_index_if_exists('ix_quests_condition_key', 'quests')
-	drop_index_if_exists('ix_quests_is_active', 'quests')
-	drop_index_if_exists('ix_quests_quest_type', 'quests')
-	drop_index_if_exists('ix_quests_name', 'quests')
-	drop_table_if_exists('quests')
+	# Колонки badges одним ALTER TABLE: индексы ix_badges_auto_check и ix_badges_condition_key удаляются вместе с колонками
+	op.execute(
+		'ALTER TABLE badges '
+		'DROP COLUMN IF EXISTS auto_check, '
+		'DROP COLUMN IF EXISTS target_value, '
+		'DROP COLUMN IF EXISTS condition_key'
+	)
 	
 	# Удаляем enum
 	quest_type_enum = postgresql.ENUM(name='quest_type')
@@ -0,0 +1,41 @@
+"""drop_duplicate_minecraft_unique_indexes
+
+Revision ID: e0f4a5b6c7d8
+Revises: d9e3f4a5b6c7
+Create Date: 2026-10-15 12:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0f4a5b6c7d8'
+down_revision = 'd9e3f4a5b6c7'
+branch_labels = None
+depends_on = None
+
+
+# (индекс, таблица, колонка) - уникальные ix_ индексы, дублирующие индексы UniqueConstraint
+DUPLICATE_UNIQUE_INDEXES = [
+	('ix_minecraft_servers_game_server_id', 'minecraft_servers', 'game_server_id'),
+	('ix_minecraft_servers_server_uuid', 'minecraft_servers', 'server_uuid'),
+	('ix_minecraft_users_uuid', 'minecraft_users', 'uuid'),
+	('ix_minecraft_join_address_join_address', 'minecraft_join_address', 'join_address'),
+	('ix_minecraft_platforms_uuid', 'minecraft_platforms', 'uuid'),
+	('ix_minecraft_version_protocol_uuid', 'minecraft_version_protocol', 'uuid'),
+	('ix_minecraft_settings_server_uuid', 'minecraft_settings', 'server_uuid'),
+]
+
+
+def upgrade() -> None:
+	# На БД, созданных до правки 32d19276e205, каждая уникальная колонка имеет два btree:
+	# индекс UniqueConstraint (*_key) и такой же ix_*. Оставляем только первый
+	with op.get_context().autocommit_block():
+		for index_name, _, _ in DUPLICATE_UNIQUE_INDEXES:
+			op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		for index_name, table_name, column_name in DUPLICATE_UNIQUE_INDEXES:
+			op.create_index(index_name, table_name, [column_name], unique=True, postgresql_concurrently=True)
@@ -0,0 +1,78 @@
+"""add_oauth_accounts_provider_unique
+
+Revision ID: e2f6a7b8c9d0
+Revises: d1e5f6a7b8c9
+Create Date: 2026-10-15 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import logging
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f6a7b8c9d0'
+down_revision = 'd1e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade() -> None:
+	conn = op.get_bind()
+
+	# Один аккаунт провайдера у разных пользователей молча не чиним: удаление строки решило бы,
+	# кто из них может входить. Останавливаемся и перечисляем конфликты для ручного разбора
+	conflicts = conn.execute(sa.text(
+		"SELECT provider, provider_account_id, array_agg(user_id::text ORDER BY created_at) "
+		"FROM oauth_accounts "
+		"GROUP BY provider, provider_account_id "
+		"HAVING COUNT(DISTINCT user_id) > 1"
+	)).all()
+	if conflicts:
+		details = "\n".join(
+			f"  {provider} {provider_account_id}: users {', '.join(user_ids)}"
+			for provider, provider_account_id, user_ids in conflicts
+		)
+		raise RuntimeError(
+			"oauth_accounts has provider accounts linked to several users:\n"
+			f"{details}\n"
+			"Decide which user keeps each account, delete the other oauth_accounts rows "
+			"(or merge the users) and run the migration again."
+		)
+
+	# Остальные дубликаты (provider, provider_account_id) - повторные строки одного пользователя
+	# после гонки двух первых входов; оставляем самую свежую (актуальные токены). Каждая удаленная
+	# строка попадает в лог миграции
+	deleted = conn.execute(sa.text(
+		"DELETE FROM oauth_accounts a USING oauth_accounts b "
+		"WHERE a.provider = b.provider AND a.provider_account_id = b.provider_account_id "
+		"AND a.user_id = b.user_id "
+		"AND (COALESCE(a.created_at, '-infinity'), a.id) < (COALESCE(b.created_at, '-infinity'), b.id) "
+		"RETURNING a.id, a.user_id, a.provider, a.provider_account_id"
+	)).all()
+	for account_id, user_id, provider, provider_account_id in deleted:
+		logger.warning(
+			f"Deleted duplicate oauth_accounts row {account_id} "
+			f"(user {user_id}, {provider} {provider_account_id})"
+		)
+
+	# Уникальный индекс строим CONCURRENTLY и превращаем в ограничение без повторного скана:
+	# поиск аккаунта при каждом входе идет по индексу, а INSERT ... ON CONFLICT опирается на ограничение
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'uq_oauth_accounts_provider_account',
+			'oauth_accounts',
+			['provider', 'provider_account_id'],
+			unique=True,
+			postgresql_concurrently=True
+		)
+		op.execute(
+			'ALTER TABLE oauth_accounts ADD CONSTRAINT uq_oauth_accounts_provider_account '
+			'UNIQUE USING INDEX uq_oauth_accounts_provider_account'
+		)
+
+
+def downgrade() -> None:
+	op.drop_constraint('uq_oauth_accounts_provider_account', 'oauth_accounts', type_='unique')
@@ -6,7 +6,6 @@ Create Date: 2025-12-07 13:59:10.518143
 
 """
 from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -17,10 +16,13 @@ depends_on = None
 
 
 def upgrade() -> None:
-	op.add_column('users', sa.Column('is_admin', sa.Boolean(), nullable=False, server_default='false'))
-	op.add_column('users', sa.Column('is_super_admin', sa.Boolean(), nullable=False, server_default='false'))
+	# Обе колонки одним ALTER TABLE (одна блокировка таблицы)
+	op.execute(
+		'ALTER TABLE users '
+		'ADD COLUMN is_admin BOOLEAN DEFAULT false NOT NULL, '
+		'ADD COLUMN is_super_admin BOOLEAN DEFAULT false NOT NULL'
+	)
 
 
 def downgrade() -> None:
-	op.drop_column('users', 'is_super_admin')
-	op.drop_column('users', 'is_admin')
+	op.execute('ALTER TABLE users DROP COLUMN is_super_admin, DROP COLUMN is_admin')
@@ -0,0 +1,37 @@
+"""drop_prefix_duplicate_indexes
+
+Revision ID: e6f0a1b2c3d4
+Revises: d5e9f0a1b2c3
+Create Date: 2026-10-15 13:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f0a1b2c3d4'
+down_revision = 'd5e9f0a1b2c3'
+branch_labels = None
+depends_on = None
+
+
+# (индекс, таблица, колонка) - одноколоночные индексы, покрытые составным индексом
+# с той же ведущей колонкой (ix_notifications_user_created, ix_resource_*_server_resource)
+PREFIX_DUPLICATE_INDEXES = [
+	('ix_notifications_user_id', 'notifications', 'user_id'),
+	('ix_resource_goals_server_id', 'resource_goals', 'server_id'),
+	('ix_resource_progress_server_id', 'resource_progress', 'server_id'),
+]
+
+
+def upgrade() -> None:
+	# Поиск по ведущей колонке обслуживает составной индекс, отдельный btree только замедляет запись
+	with op.get_context().autocommit_block():
+		for index_name, _, _ in PREFIX_DUPLICATE_INDEXES:
+			op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		for index_name, table_name, column_name in PREFIX_DUPLICATE_INDEXES:
+			op.create_index(index_name, table_name, [column_name], unique=False, postgresql_concurrently=True)
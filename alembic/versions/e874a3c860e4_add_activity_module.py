@@ -19,24 +19,7 @@ depends_on = None
 
 def upgrade() -> None:
 	# Создаем enum для типа активности
-	op.execute("""
-		DO $$ BEGIN
-			CREATE TYPE activity_type AS ENUM (
-				'badge_earned',
-				'achievement_unlocked',
-				'quest_completed',
-				'level_up',
-				'leaderboard_first_place',
-				'leaderboard_changed',
-				'daily_quests_refreshed',
-				'server_status_changed',
-				'new_user'
-			);
-		EXCEPTION
-			WHEN duplicate_object THEN null;
-		END $$;
-	""")
-	
+	# checkfirst проверяет pg_type - без DO-блока с EXCEPTION, который открывает SAVEPOINT
 	activity_type_enum = postgresql.ENUM(
 		'badge_earned',
 		'achievement_unlocked',
@@ -50,6 +33,7 @@ def upgrade() -> None:
 		name='activity_type',
 		create_type=False
 	)
+	activity_type_enum.create(op.get_bind(), checkfirst=True)
 	
 	# Создаем таблицу activities
 	op.create_table(
@@ -67,11 +51,12 @@ def upgrade() -> None:
 		sa.ForeignKeyConstraint(['server_id'], ['game_servers.id'], )
 	)
 	
-	# Создаем индексы
-	op.create_index(op.f('ix_activities_activity_type'), 'activities', ['activity_type'], unique=False)
-	op.create_index(op.f('ix_activities_user_id'), 'activities', ['user_id'], unique=False)
-	op.create_index('ix_activities_created_at', 'activities', [sa.text('created_at DESC')], unique=False)
-	op.create_index('ix_activities_type_created', 'activities', ['activity_type', sa.text('created_at DESC')], unique=False)
+	# Создаем индексы (CONCURRENTLY - без блокировки записи в таблицу)
+	with op.get_context().autocommit_block():
+		op.create_index(op.f('ix_activities_activity_type'), 'activities', ['activity_type'], unique=False, postgresql_concurrently=True)
+		op.create_index(op.f('ix_activities_user_id'), 'activities', ['user_id'], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_activities_created_at', 'activities', [sa.text('created_at DESC')], unique=False, postgresql_concurrently=True)
+		op.create_index('ix_activities_type_created', 'activities', ['activity_type', sa.text('created_at DESC')], unique=False, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
@@ -6,7 +6,6 @@ Create Date: 2025-12-07 12:00:00.000000
 
 """
 from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -17,10 +16,13 @@ depends_on = None
 
 
 def upgrade() -> None:
-	op.add_column('users', sa.Column('xp', sa.Integer(), nullable=False, server_default='0'))
-	op.add_column('users', sa.Column('level', sa.Integer(), nullable=False, server_default='1'))
+	# Обе колонки одним ALTER TABLE (одна блокировка таблицы)
+	op.execute(
+		'ALTER TABLE users '
+		'ADD COLUMN xp INTEGER DEFAULT 0 NOT NULL, '
+		'ADD COLUMN level INTEGER DEFAULT 1 NOT NULL'
+	)
 
 
 def downgrade() -> None:
-	op.drop_column('users', 'level')
-	op.drop_column('users', 'xp')
+	op.execute('ALTER TABLE users DROP COLUMN level, DROP COLUMN xp')
@@ -0,0 +1,150 @@
+"""partition_minecraft_time_series
+
+Revision ID: f1a5b6c7d8e9
+Revises: e0f4a5b6c7d8
+Create Date: 2026-10-15 12:40:00.000000
+
+"""
+from alembic import op
+from datetime import datetime, timezone
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a5b6c7d8e9'
+down_revision = 'e0f4a5b6c7d8'
+branch_labels = None
+depends_on = None
+
+
+# Сколько месяцев вперед создавать партиции сразу (дальше - задача в планировщике)
+MONTHS_AHEAD = 2
+
+# Определения append-only таблиц: колонки, первичный ключ (партиционированный PK обязан
+# включать date), последовательность id и индексы. Имена FK заданы явно: иначе при
+# существующей *_old таблице PostgreSQL выберет имя с суффиксом (*_fkey1)
+TABLES = {
+	'minecraft_tps': {
+		'columns': """
+			server_id INTEGER NOT NULL CONSTRAINT minecraft_tps_server_id_fkey REFERENCES minecraft_servers(id),
+			date BIGINT NOT NULL,
+			tps DOUBLE PRECISION,
+			players_online INTEGER,
+			cpu_usage DOUBLE PRECISION,
+			ram_usage BIGINT,
+			entities INTEGER,
+			chunks_loaded INTEGER,
+			free_disk_space BIGINT
+		""",
+		'column_names': 'server_id, date, tps, players_online, cpu_usage, ram_usage, entities, chunks_loaded, free_disk_space',
+		'pk': 'server_id, date',
+		'old_pk': 'server_id, date',
+		'sequence': None,
+		'indexes': [
+			'CREATE INDEX ix_minecraft_tps_date ON minecraft_tps (date)',
+		],
+	},
+	'minecraft_ping': {
+		'columns': """
+			id INTEGER NOT NULL DEFAULT nextval('minecraft_ping_id_seq'::regclass),
+			user_id INTEGER NOT NULL CONSTRAINT minecraft_ping_user_id_fkey REFERENCES minecraft_users(id),
+			server_id INTEGER NOT NULL CONSTRAINT minecraft_ping_server_id_fkey REFERENCES minecraft_servers(id),
+			date BIGINT NOT NULL,
+			max_ping INTEGER,
+			min_ping INTEGER,
+			avg_ping DOUBLE PRECISION
+		""",
+		'column_names': 'id, user_id, server_id, date, max_ping, min_ping, avg_ping',
+		'pk': 'id, date',
+		'old_pk': 'id',
+		'sequence': 'minecraft_ping_id_seq',
+		'indexes': [
+			'CREATE INDEX ix_minecraft_ping_user_server_date ON minecraft_ping (user_id, server_id, date DESC)',
+		],
+	},
+	'minecraft_kills': {
+		'columns': """
+			id INTEGER NOT NULL DEFAULT nextval('minecraft_kills_id_seq'::regclass),
+			killer_uuid VARCHAR(36) NOT NULL,
+			victim_uuid VARCHAR(36) NOT NULL,
+			server_uuid VARCHAR(36) NOT NULL,
+			weapon VARCHAR(30),
+			date BIGINT NOT NULL,
+			session_id INTEGER CONSTRAINT minecraft_kills_session_id_fkey REFERENCES minecraft_sessions(id)
+		""",
+		'column_names': 'id, killer_uuid, victim_uuid, server_uuid, weapon, date, session_id',
+		'pk': 'id, date',
+		'old_pk': 'id',
+		'sequence': 'minecraft_kills_id_seq',
+		'indexes': [
+			'CREATE INDEX ix_minecraft_kills_killer_uuid ON minecraft_kills (killer_uuid)',
+			'CREATE INDEX ix_minecraft_kills_victim_uuid ON minecraft_kills (victim_uuid)',
+			'CREATE INDEX ix_minecraft_kills_server_date ON minecraft_kills (server_uuid, date DESC)',
+		],
+	},
+}
+
+
+def month_start_ms(year: int, month: int) -> int:
+	"""Начало месяца (UTC) в миллисекундах"""
+	return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def next_month(year: int, month: int) -> tuple[int, int]:
+	return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def replace_table(table: str, partitioned: bool) -> None:
+	"""Пересоздает таблицу (партиционированной или обычной) с переносом данных"""
+	spec = TABLES[table]
+
+	# Старая таблица уходит в сторону; имя PK-индекса освобождаем для новой таблицы,
+	# последовательность отвязываем, чтобы DROP старой таблицы её не удалил
+	op.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+	op.execute(f'ALTER INDEX {table}_pkey RENAME TO {table}_old_pkey')
+	if spec['sequence']:
+		op.execute(f"ALTER SEQUENCE {spec['sequence']} OWNED BY NONE")
+
+	if partitioned:
+		op.execute(f"CREATE TABLE {table} ({spec['columns']}, PRIMARY KEY ({spec['pk']})) PARTITION BY RANGE (date)")
+
+		now = datetime.now(timezone.utc)
+		year, month = now.year, now.month
+		op.execute(
+			f'CREATE TABLE {table}_p_initial PARTITION OF {table} '
+			f'FOR VALUES FROM (MINVALUE) TO ({month_start_ms(year, month)})'
+		)
+		for _ in range(MONTHS_AHEAD + 1):
+			upper_year, upper_month = next_month(year, month)
+			op.execute(
+				f'CREATE TABLE {table}_p{year}{month:02d} PARTITION OF {table} '
+				f'FOR VALUES FROM ({month_start_ms(year, month)}) TO ({month_start_ms(upper_year, upper_month)})'
+			)
+			year, month = upper_year, upper_month
+		# Страховка на случай, если задача планировщика не успела создать партицию
+		op.execute(f'CREATE TABLE {table}_p_default PARTITION OF {table} DEFAULT')
+	else:
+		op.execute(f"CREATE TABLE {table} ({spec['columns']}, PRIMARY KEY ({spec['old_pk']}))")
+
+	op.execute(
+		f"INSERT INTO {table} ({spec['column_names']}) "
+		f"SELECT {spec['column_names']} FROM {table}_old"
+	)
+	if spec['sequence']:
+		op.execute(f"ALTER SEQUENCE {spec['sequence']} OWNED BY {table}.id")
+	op.execute(f'DROP TABLE {table}_old')
+
+	for index_sql in spec['indexes']:
+		op.execute(index_sql)
+
+
+def upgrade() -> None:
+	# Append-only time-series таблицы партиционируем по date (миллисекунды):
+	# pruning по диапазону дат, небольшие горячие индексы, удаление старых данных через DROP партиции.
+	# CONCURRENTLY для партиционированных таблиц недоступен, поэтому индексы строятся обычным CREATE INDEX
+	for table in TABLES:
+		replace_table(table, partitioned=True)
+
+
+def downgrade() -> None:
+	for table in TABLES:
+		replace_table(table, partitioned=False)
@@ -0,0 +1,34 @@
+"""add_oauth_accounts_user_id_index
+
+Revision ID: f3a7b8c9d0e1
+Revises: e2f6a7b8c9d0
+Create Date: 2026-10-15 15:10:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a7b8c9d0e1'
+down_revision = 'e2f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# Поиск по (provider, provider_account_id) уже обслуживает uq_oauth_accounts_provider_account,
+	# email/username уникальны с первой миграции. Без индекса оставался user_id: обновление токенов,
+	# список провайдеров пользователя, подсчет привязок после link и удаление аккаунта
+	with op.get_context().autocommit_block():
+		op.create_index(
+			'ix_oauth_accounts_user_id',
+			'oauth_accounts',
+			['user_id'],
+			unique=False,
+			postgresql_concurrently=True
+		)
+
+
+def downgrade() -> None:
+	with op.get_context().autocommit_block():
+		op.drop_index('ix_oauth_accounts_user_id', table_name='oauth_accounts', postgresql_concurrently=True)
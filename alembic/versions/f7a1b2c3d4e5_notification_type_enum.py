@@ -0,0 +1,45 @@
+"""notification_type_enum
+
+Revision ID: f7a1b2c3d4e5
+Revises: e6f0a1b2c3d4
+Create Date: 2026-10-15 13:40:00.000000
+
+"""
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a1b2c3d4e5'
+down_revision = 'e6f0a1b2c3d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	# Закрытый набор типов уведомлений: enum занимает 4 байта вместо строки переменной длины
+	# checkfirst проверяет pg_type - без DO-блока с EXCEPTION, который открывает SAVEPOINT
+	notification_type_enum = postgresql.ENUM(
+		'level_up',
+		'achievement_unlocked',
+		'badge_earned',
+		name='notification_type',
+		create_type=False
+	)
+	notification_type_enum.create(op.get_bind(), checkfirst=True)
+	
+	op.execute(
+		'ALTER TABLE notifications '
+		'ALTER COLUMN notification_type TYPE notification_type USING notification_type::notification_type'
+	)
+
+
+def downgrade() -> None:
+	op.execute(
+		'ALTER TABLE notifications '
+		'ALTER COLUMN notification_type TYPE VARCHAR USING notification_type::text'
+	)
+	
+	# Удаляем enum
+	notification_type_enum = postgresql.ENUM(name='notification_type')
+	notification_type_enum.drop(op.get_bind(), checkfirst=True)
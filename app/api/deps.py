@@ -1,29 +1,93 @@
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Optional, Tuple
+from dataclasses import dataclass
+import hashlib
+import time
+from uuid import UUID
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.config import settings
-from app.core.security import create_access_token, create_refresh_token
+from app.core.security import JWT_KEY, create_access_token, create_refresh_token, roles_to_bits
 from app.db.session import AsyncSessionLocal
-from app.db.redis import get_refresh_token, save_refresh_token, delete_refresh_token, acquire_lock, release_lock
+from app.db.redis import get_refresh_token, rotate_refresh_token, refresh_token_lock_key, acquire_lock, release_lock, get_cache, set_cache, delete_cache
 from app.models.user import User
 from datetime import datetime, timezone
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token", auto_error=False)
 
+# In-process cache of verified access tokens: sha256(token) -> (user_id, exp, adm).
+# Skips HMAC verification and payload parsing for repeated requests with the same token;
+# entries live at most 30s and are never used past the token's own exp.
+# Keyed by digest so raw bearer tokens are not kept in process memory.
+_JWT_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+
+# Roles of a user cached in Redis as 2 bits: 1 - is_admin, 2 - is_super_admin
+USER_ROLES_CACHE_PREFIX = "user_roles:"
+USER_ROLES_CACHE_TTL = 60
+
+# Serialized GET /auth/me body per user. Short TTL bounds staleness if some write path
+# forgets to invalidate; profile, badge and role changes drop the key explicitly
+USER_INFO_CACHE_PREFIX = "user_info:"
+USER_INFO_CACHE_TTL = 30
+
+# "A super admin exists" flag for the public bootstrap check. Only the positive answer is cached:
+# it flips back only when a super admin deletes their account, which drops the key
+HAS_SUPER_ADMIN_CACHE_KEY = "has_super_admin"
+HAS_SUPER_ADMIN_CACHE_TTL = 3600
+
+@dataclass(slots=True)
+class AuthPrincipal:
+    """Authenticated user reduced to id and role flags - for endpoints that don't need the full User row"""
+    id: UUID
+    is_admin: bool
+    is_super_admin: bool
+
+async def invalidate_user_roles_cache(user_id) -> None:
+    """Drop cached roles after is_admin/is_super_admin change or user deletion"""
+    await delete_cache(f"{USER_ROLES_CACHE_PREFIX}{user_id}")
+    # Roles are part of the /auth/me body as well
+    await invalidate_user_info_cache(user_id)
+
+async def invalidate_user_info_cache(user_id) -> None:
+    """Drop cached /auth/me body after the user's profile or selected badge changes"""
+    await delete_cache(f"{USER_INFO_CACHE_PREFIX}{user_id}")
+
+def _verify_and_cache(token: str) -> Tuple[Optional[str], Optional[int]]:
+    """Verify an access token and return (user_id, adm claim), using the in-process cache.
+    Raises JWTError for invalid or expired tokens; failures are not cached."""
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _JWT_CACHE.get(key)
+    if cached is not None:
+        if cached[1] > time.time():
+            return cached[0], cached[2]
+        del _JWT_CACHE[key]
+    
+    payload = jwt.decode(token, JWT_KEY, algorithms=_JWT_ALGORITHMS)
+    user_id = payload.get("sub")
+    roles_claim = payload.get("adm")
+    if user_id is not None and payload.get("exp") is not None:
+        _JWT_CACHE[key] = (user_id, payload["exp"], roles_claim)
+    return user_id, roles_claim
+
 async def get_db() -> AsyncGenerator:
     async with AsyncSessionLocal() as session:
         yield session
 
-async def get_current_user(
+async def get_authenticated_user_id(
     request: Request,
     db: AsyncSession = Depends(get_db), 
     token: Optional[str] = Depends(oauth2_scheme)
-) -> User:
-    """Get current user from JWT token (cookie or Authorization header). 
-    Automatically refreshes access token if expired but refresh token is valid."""
+) -> Tuple[str, Optional[User], Optional[int]]:
+    """Get user_id from JWT token (cookie or Authorization header). 
+    Automatically refreshes access token if expired but refresh token is valid.
+    Returns (user_id, refreshed_user, roles_claim) - refreshed_user is the User loaded during rotation, otherwise None;
+    roles_claim is the adm claim of the access token (roles_to_bits), None for tokens issued without it.
+    Shared by get_current_user and the principal dependencies, so FastAPI resolves it (and rotates tokens) once per request."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -36,14 +100,13 @@ async def get_current_user(
     
     # Try to decode access token
     user_id = None
+    roles_claim = None
     token_valid = False
     
     if token:
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            user_id = payload.get("sub")
-            if user_id is not None:
-                token_valid = True
+            user_id, roles_claim = _verify_and_cache(token)
+            token_valid = user_id is not None
         except JWTError:
             # Token is invalid or expired, will try refresh token
             token_valid = False
@@ -58,43 +121,36 @@ async def get_current_user(
             
             if redis_user_id:
                 # Use lock to prevent race condition when multiple requests try to refresh simultaneously
-                lock_key = f"token_refresh_lock:{redis_user_id}"
-                lock_acquired = await acquire_lock(lock_key, timeout=10)
+                lock_key = refresh_token_lock_key(refresh_token_value)
+                lock_acquired = await acquire_lock(lock_key, timeout=5)
                 
                 if lock_acquired:
                     try:
-                        # Verify refresh token still exists (might have been refreshed by another request)
-                        current_user_id = await get_refresh_token(refresh_token_value)
-                        if not current_user_id or current_user_id != redis_user_id:
-                            # Token was already refreshed, use existing token
-                            lock_acquired = False
-                        else:
-                            # Verify user exists
-                            result = await db.execute(select(User).where(User.id == redis_user_id))
-                            user = result.scalars().first()
+                        # Verify user exists. Whether the refresh token is still unused is checked
+                        # atomically by rotate_refresh_token, no separate GET needed here
+                        result = await db.execute(select(User).where(User.id == redis_user_id))
+                        user = result.scalars().first()
+                        
+                        if user:
+                            # Refresh OAuth tokens if needed (lazy import to avoid circular dependency)
+                            from app.api.v1.endpoints.auth import refresh_oauth_token_if_needed
+                            max_expires_at, _ = await refresh_oauth_token_if_needed(user, db)
                             
-                            if user:
-                                # Refresh OAuth tokens if needed (lazy import to avoid circular dependency)
-                                from app.api.v1.endpoints.auth import refresh_oauth_token_if_needed
-                                max_expires_at, _ = await refresh_oauth_token_if_needed(user, db)
-                                
-                                # Create new tokens (rotation)
-                                new_access_token = create_access_token(subject=user.id)
-                                new_refresh_token = create_refresh_token()
-                                
-                                # Calculate new refresh token TTL
-                                min_refresh_ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
-                                refresh_ttl = min_refresh_ttl
-                                
-                                if max_expires_at:
-                                    oauth_ttl = int((max_expires_at - datetime.now(timezone.utc)).total_seconds())
-                                    if oauth_ttl > refresh_ttl:
-                                        refresh_ttl = oauth_ttl
-                                
-                                # Atomic swap: save new token BEFORE deleting old one
-                                await save_refresh_token(str(user.id), new_refresh_token, refresh_ttl)
-                                await delete_refresh_token(refresh_token_value)
-                                
+                            # Create new tokens (rotation)
+                            new_access_token = create_access_token(subject=user.id, roles=roles_to_bits(user.is_admin, user.is_super_admin))
+                            new_refresh_token = create_refresh_token()
+                            
+                            # Calculate new refresh token TTL
+                            min_refresh_ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+                            refresh_ttl = min_refresh_ttl
+                            
+                            if max_expires_at:
+                                oauth_ttl = int((max_expires_at - datetime.now(timezone.utc)).total_seconds())
+                                if oauth_ttl > refresh_ttl:
+                                    refresh_ttl = oauth_ttl
+                            
+                            # Atomic compare-and-swap in one round-trip (Lua): fails if the token was already used
+                            if await rotate_refresh_token(refresh_token_value, str(user.id), new_refresh_token, refresh_ttl):
                                 # Store new tokens in request.state for middleware to set cookies
                                 request.state.new_tokens = {
                                     'access_token': new_access_token,
@@ -116,6 +172,15 @@ async def get_current_user(
     if not token_valid or not user_id:
         raise credentials_exception
     
+    return user_id, refreshed_user, roles_claim
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    auth: Tuple[str, Optional[User], Optional[int]] = Depends(get_authenticated_user_id)
+) -> User:
+    """Get current user as a full ORM object"""
+    user_id, refreshed_user, _ = auth
+    
     # Use refreshed user if available, otherwise get from database
     if refreshed_user:
         return refreshed_user
@@ -125,12 +190,71 @@ async def get_current_user(
     user = result.scalars().first()
     
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
+async def load_principal(db: AsyncSession, user_id: str) -> AuthPrincipal:
+    """Load (id, is_admin, is_super_admin) of user without hydrating the full User row.
+    Roles are cached in Redis for USER_ROLES_CACHE_TTL seconds, so steady-state requests skip Postgres"""
+    cache_key = f"{USER_ROLES_CACHE_PREFIX}{user_id}"
+    cached_roles = await get_cache(cache_key)
+    if cached_roles is not None:
+        roles_bits = int(cached_roles)
+        return AuthPrincipal(UUID(str(user_id)), bool(roles_bits & 1), bool(roles_bits & 2))
+    
+    result = await db.execute(
+        select(User.id, User.is_admin, User.is_super_admin).where(User.id == user_id)
+    )
+    roles = result.first()
+    
+    if roles is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    principal = AuthPrincipal(*roles)
+    await set_cache(cache_key, str(roles_to_bits(principal.is_admin, principal.is_super_admin)), USER_ROLES_CACHE_TTL)
+    return principal
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_db),
+    auth: Tuple[str, Optional[User], Optional[int]] = Depends(get_authenticated_user_id)
+) -> AuthPrincipal:
+    """Get current user as AuthPrincipal for endpoints that only need the user id.
+    Roles come from the adm claim when the token has it - no Redis/Postgres round-trip at all.
+    The claim may be stale for up to ACCESS_TOKEN_EXPIRE_MINUTES, so role checks use get_verified_principal"""
+    user_id, refreshed_user, roles_claim = auth
+    
+    if refreshed_user:
+        return AuthPrincipal(refreshed_user.id, refreshed_user.is_admin, refreshed_user.is_super_admin)
+    
+    if roles_claim is not None:
+        return AuthPrincipal(UUID(str(user_id)), bool(roles_claim & 1), bool(roles_claim & 2))
+    
+    return await load_principal(db, user_id)
+
+async def get_verified_principal(
+    db: AsyncSession = Depends(get_db),
+    auth: Tuple[str, Optional[User], Optional[int]] = Depends(get_authenticated_user_id)
+) -> AuthPrincipal:
+    """Get current user as AuthPrincipal with roles from Redis cache/Postgres, never from token claims:
+    promotion/demotion takes effect without waiting for the access token to expire"""
+    user_id, refreshed_user, _ = auth
+    
+    if refreshed_user:
+        return AuthPrincipal(refreshed_user.id, refreshed_user.is_admin, refreshed_user.is_super_admin)
+    
+    return await load_principal(db, user_id)
+
 async def get_current_admin(
-	current_user: User = Depends(get_current_user)
-) -> User:
+	current_user: AuthPrincipal = Depends(get_verified_principal)
+) -> AuthPrincipal:
 	"""Get current user and verify they are an admin (is_admin=True or is_super_admin=True)"""
 	if not current_user.is_admin and not current_user.is_super_admin:
 		raise HTTPException(
@@ -140,8 +264,8 @@ async def get_current_admin(
 	return current_user
 
 async def get_current_super_admin(
-	current_user: User = Depends(get_current_user)
-) -> User:
+	current_user: AuthPrincipal = Depends(get_verified_principal)
+) -> AuthPrincipal:
 	"""Get current user and verify they are a super admin (is_super_admin=True)"""
 	if not current_user.is_super_admin:
 		raise HTTPException(
@@ -44,12 +44,12 @@ async def get_activity(
 		activity_type=activity_type_enum
 	)
 	
-	# Преобразуем в ответы
+	# Преобразуем в ответы. Данные из БД уже нужных типов - собираем модели без валидации
 	result = []
 	for activity in activities:
 		user_data = None
 		if activity.user:
-			user_data = UserBase(
+			user_data = UserBase.model_construct(
 				email=activity.user.email,
 				username=activity.user.username,
 				avatar=activity.user.avatar,
@@ -63,13 +63,13 @@ async def get_activity(
 		
 		server_data = None
 		if activity.server:
-			server_data = ServerInfo(
+			server_data = ServerInfo.model_construct(
 				id=activity.server.id,
 				name=activity.server.name,
 				status=activity.server.status.value
 			)
 		
-		result.append(ActivityResponse(
+		result.append(ActivityResponse.model_construct(
 			id=activity.id,
 			activity_type=activity.activity_type.value,
 			title=activity.title,
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, exists
 from app.api import deps
 from app.models.user import User
+from app.db.redis import get_cache, set_cache
 from uuid import UUID
 import logging
 
@@ -16,6 +17,10 @@ class CreateSuperAdminRequest(BaseModel):
 	user_id: UUID
 
 
+class SuperAdminCheckResponse(BaseModel):
+	has_super_admin: bool
+
+
 class AdminResponse(BaseModel):
 	id: UUID
 	email: str | None
@@ -44,16 +49,27 @@ class UserResponse(BaseModel):
 		from_attributes = True
 
 
-@router.get("/check-super-admin")
+async def super_admin_exists(db: AsyncSession) -> bool:
+	"""Есть ли хотя бы один super admin (EXISTS останавливается на первой строке, в отличие от COUNT)"""
+	result = await db.execute(
+		select(exists().where(User.is_super_admin))
+	)
+	return result.scalar()
+
+
+@router.get("/check-super-admin", response_model=SuperAdminCheckResponse)
 async def check_super_admin(
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Публичный эндпоинт для проверки наличия super admin в БД. Возвращает true/false."""
-	result = await db.execute(
-		select(func.count(User.id)).where(User.is_super_admin)
-	)
-	super_admin_count = result.scalar()
-	return {"has_super_admin": super_admin_count > 0}
+	# Фронтенд дергает проверку на каждой загрузке страницы; после создания super admin ответ не меняется
+	if await get_cache(deps.HAS_SUPER_ADMIN_CACHE_KEY) == "1":
+		return {"has_super_admin": True}
+	
+	has_super_admin = await super_admin_exists(db)
+	if has_super_admin:
+		await set_cache(deps.HAS_SUPER_ADMIN_CACHE_KEY, "1", deps.HAS_SUPER_ADMIN_CACHE_TTL)
+	return {"has_super_admin": has_super_admin}
 
 
 @router.post("/create-super-admin", response_model=AdminResponse)
@@ -63,12 +79,7 @@ async def create_super_admin(
 ):
 	"""Создание первого super admin. Доступно только если нет ни одного super admin."""
 	# Проверяем, есть ли уже super admin
-	result = await db.execute(
-		select(func.count(User.id)).where(User.is_super_admin)
-	)
-	super_admin_count = result.scalar()
-	
-	if super_admin_count > 0:
+	if await super_admin_exists(db):
 		raise HTTPException(
 			status_code=status.HTTP_403_FORBIDDEN,
 			detail="Super admin already exists. This endpoint is only available when no super admin exists."
@@ -88,6 +99,7 @@ async def create_super_admin(
 	user.is_super_admin = True
 	user.is_admin = True  # Super admin автоматически является админом
 	await db.commit()
+	await deps.invalidate_user_roles_cache(user.id)
 	await db.refresh(user)
 	
 	return AdminResponse(
@@ -127,6 +139,7 @@ async def promote_to_admin(
 	# Назначаем админом
 	user.is_admin = True
 	await db.commit()
+	await deps.invalidate_user_roles_cache(user.id)
 	await db.refresh(user)
 	
 	return AdminResponse(
@@ -173,6 +186,7 @@ async def demote_from_admin(
 	# Снимаем админку
 	user.is_admin = False
 	await db.commit()
+	await deps.invalidate_user_roles_cache(user.id)
 	await db.refresh(user)
 	
 	return AdminResponse(
@@ -193,18 +207,23 @@ async def list_admins(
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Список всех админов. Доступно только для админов."""
-	# Получаем всех админов (is_admin=True или is_super_admin=True)
+	# Получаем всех админов (is_admin=True или is_super_admin=True).
+	# Выбираем только колонки ответа, без гидрации ORM-объектов User
 	result = await db.execute(
-		select(User).where(
+		select(
+			User.id, User.email, User.username,
+			User.is_admin, User.is_super_admin, User.created_at
+		).where(
 			(User.is_admin) | (User.is_super_admin)
 		).order_by(User.created_at)
 		.offset(skip)
 		.limit(limit)
 	)
-	admins = result.scalars().all()
+	admins = result.all()
 	
+	# Данные только что прочитаны из БД и уже нужных типов - собираем ответ без валидации
 	return [
-		AdminResponse(
+		AdminResponse.model_construct(
 			id=admin.id,
 			email=admin.email,
 			username=admin.username,
@@ -224,15 +243,19 @@ async def get_all_users(
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получить список всех пользователей. Доступно только для админов."""
+	# Только колонки ответа, без гидрации ORM-объектов User
 	result = await db.execute(
-		select(User).order_by(User.created_at)
+		select(
+			User.id, User.email, User.username, User.avatar, User.is_active,
+			User.is_admin, User.is_super_admin, User.xp, User.level, User.created_at
+		).order_by(User.created_at)
 		.offset(skip)
 		.limit(limit)
 	)
-	users = result.scalars().all()
+	users = result.all()
 	
 	return [
-		UserResponse(
+		UserResponse.model_construct(
 			id=user.id,
 			email=user.email,
 			username=user.username,
@@ -1,32 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Request, status, UploadFile, File
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, and_
+from sqlalchemy import select, update, delete, exists, func, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload, aliased
 from app.api import deps
 from app.core.config import settings
-from app.core.security import create_access_token, create_refresh_token
+from app.core.security import create_access_token, create_refresh_token, roles_to_bits
 from app.core.storage import get_storage
+from app.core.http_client import get_http_client
 from app.models.user import User, OAuthAccount, ExternalLink
-from app.schemas.user import UserUpdate, OAuthAccountPublic
+from app.schemas.user import UserUpdate, OAuthAccountPublic, CurrentUserResponse, UpdatedUserResponse
 from app.schemas.link import LinkCodeGenerateResponse, LinkRequest, LinkResponse, LinkStatusResponse, ExternalLinkResponse
-from app.db.redis import save_refresh_token, get_refresh_token, delete_refresh_token, save_link_code, get_link_code, delete_link_code, acquire_lock, release_lock
-import httpx
+from app.db.redis import save_refresh_token, get_refresh_token, delete_refresh_token, rotate_refresh_token, refresh_token_lock_key, save_oauth_state, pop_oauth_state, save_link_code, get_link_code, delete_link_code, acquire_lock, try_acquire_lock, release_lock, get_cache, set_cache, delete_cache
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode
-from itsdangerous import URLSafeTimedSerializer
 import secrets
+import asyncio
+import hashlib
+import httpx
+import json
 import logging
+import re
 import uuid
 from uuid import UUID
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Secure serializer for state tokens
-serializer = URLSafeTimedSerializer(settings.SECRET_KEY)
-
 PROVIDERS = {
     "twitch": {
         "auth_url": "https://id.twitch.tv/oauth2/authorize",
@@ -52,26 +56,252 @@ PROVIDERS = {
     }
 }
 
+DISCORD_CDN = "https://cdn.discordapp.com"
+
+# Default Discord avatars for users without an avatar hash (indices 0-5)
+DEFAULT_DISCORD_AVATARS = tuple(f"{DISCORD_CDN}/embed/avatars/{i}.png" for i in range(6))
+
+# Latest OAuth token expiry per user, cached while none of the user's tokens is due for refresh:
+# the key expires a minute before the earliest token does, so a hit means there is nothing to refresh
+OAUTH_EXPIRY_CACHE_PREFIX = "oauth_max_expiry:"
+OAUTH_EXPIRY_CACHE_BUFFER = 60
+OAUTH_EXPIRY_CACHE_MAX_TTL = 24 * 60 * 60
+
 # Check Steam API key on startup
 if not settings.STEAM_API_KEY:
     logger.warning("STEAM_API_KEY is not configured - Steam authentication will fail")
 
 
-def create_state_token(action: str, user_id: str = None) -> str:
-    """Create secure state token with CSRF protection"""
-    data = {
-        "action": action,
-        "nonce": secrets.token_urlsafe(32),
-        "user_id": user_id
+# Error codes the callback reports to the frontend; redirect URLs are built once at import
+AUTH_ERROR_URLS = {
+    error: f"{settings.FRONTEND_URL}/auth/error?{urlencode({'error': error})}"
+    for error in (
+        "oauth_error",
+        "invalid_provider",
+        "invalid_request",
+        "invalid_state",
+        "token_error",
+        "invalid_identity",
+        "config_error",
+        "user_info_error",
+        "link_error",
+        "already_linked",
+        "user_not_found",
+        "user_creation_failed",
+        "server_error",
+    )
+}
+
+def auth_error_redirect(error: str) -> RedirectResponse:
+    """Redirect to the frontend auth error page"""
+    return RedirectResponse(AUTH_ERROR_URLS[error])
+
+@lru_cache(maxsize=None)
+def get_redirect_uri(provider: str) -> str:
+    """OAuth callback URL for the provider (built once per provider)"""
+    return f"{settings.BACKEND_CORS_ORIGINS[1]}{settings.API_V1_STR}/auth/callback/{provider}"
+
+def get_openid_params(return_to: str) -> dict:
+    """Steam OpenID 2.0 checkid_setup parameters"""
+    return {
+        "openid.ns": "http://specs.openid.net/auth/2.0",
+        "openid.mode": "checkid_setup",
+        "openid.return_to": return_to,
+        "openid.realm": settings.BACKEND_CORS_ORIGINS[1],
+        "openid.identity": "http://specs.openid.net/auth/2.0/identifier_select",
+        "openid.claimed_id": "http://specs.openid.net/auth/2.0/identifier_select",
     }
-    return serializer.dumps(data)
 
-def verify_state_token(state: str, max_age: int = 600) -> dict:
-    """Verify and decode state token (max_age in seconds, default 10 minutes)"""
-    try:
-        return serializer.loads(state, max_age=max_age)
-    except Exception:
+@lru_cache(maxsize=None)
+def get_authorize_url_prefix(provider: str) -> str:
+    """Authorize URL with all static query parameters already encoded (built once per provider).
+    OAuth 2.0 requests only append &state=... (token_urlsafe, needs no encoding); the Steam login URL is used as is"""
+    config = PROVIDERS[provider]
+    if provider == "steam":
+        params = get_openid_params(get_redirect_uri(provider))
+    else:
+        params = {
+            "client_id": config['client_id'],
+            "redirect_uri": get_redirect_uri(provider),
+            "response_type": "code",
+            "scope": config['scope'],
+        }
+    return f"{config['auth_url']}?{urlencode(params)}"
+
+
+async def create_state_token(action: str, user_id: str = None) -> str:
+    """Create opaque state token with CSRF protection (payload is kept in Redis, 10 minutes)"""
+    state = secrets.token_urlsafe(32)
+    await save_oauth_state(state, json.dumps({"action": action, "user_id": user_id}))
+    return state
+
+async def verify_state_token(state: str) -> dict:
+    """Verify and consume state token: each state is accepted only once"""
+    data = await pop_oauth_state(state)
+    if data is None:
         raise HTTPException(status_code=400, detail="Invalid or expired state token")
+    return json.loads(data)
+
+async def gather_settled(*aws):
+    """asyncio.gather that waits for every awaitable even if one fails, then re-raises the first error.
+    Used when a DB query runs alongside an HTTP call: the session must not be left with a query in flight."""
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+def other_accounts_max_expiry(account):
+    """Latest token expiry among the user's other OAuth accounts, correlated to the enclosing row
+    (`account` is OAuthAccount or any selectable with id and user_id columns).
+    The callback combines it with the new expiry of the account being logged in to size the refresh token TTL"""
+    other = aliased(OAuthAccount)
+    return (
+        select(func.max(other.expires_at))
+        .where(other.user_id == account.user_id, other.id != account.id)
+        .correlate_except(other)
+        .scalar_subquery()
+    )
+
+async def load_oauth_account(
+    db: AsyncSession,
+    provider: str,
+    provider_account_id: str
+) -> Tuple[Optional[OAuthAccount], Optional[datetime]]:
+    """
+    OAuth account by provider id with its user joined in the same query (login needs both),
+    plus other_accounts_max_expiry - one round-trip for everything the login path reads.
+    """
+    result = await db.execute(
+        select(OAuthAccount, other_accounts_max_expiry(OAuthAccount))
+        .options(joinedload(OAuthAccount.user))
+        .where(
+            OAuthAccount.provider == provider,
+            OAuthAccount.provider_account_id == provider_account_id
+        )
+    )
+    row = result.first()
+    return (row[0], row[1]) if row else (None, None)
+
+async def prefetch_callback_rows(
+    db: AsyncSession,
+    provider: str,
+    provider_account_id: Optional[str],
+    action: Optional[str],
+    user_id: Optional[str]
+) -> Tuple[Optional[OAuthAccount], Optional[datetime], Optional[User]]:
+    """
+    Load the rows the OAuth callback needs after the provider responds, so they can be read
+    while the user-info request is in flight: the OAuth account (only when provider_account_id
+    is already known, i.e. Steam) and the user being linked (for action == "link").
+    """
+    oauth_account, other_expires_at = None, None
+    if provider_account_id:
+        oauth_account, other_expires_at = await load_oauth_account(db, provider, provider_account_id)
+    
+    link_user = None
+    if action == "link" and user_id:
+        result = await db.execute(select(User).where(User.id == user_id))
+        link_user = result.scalars().first()
+    
+    # End the read transaction so the pooled connection isn't held while the provider request
+    # is still in flight (expire_on_commit=False keeps the loaded rows usable)
+    await db.commit()
+    
+    return oauth_account, other_expires_at, link_user
+
+# In-flight provider refreshes per (user_id, provider): concurrent requests of one user
+# (several tabs or devices) share one POST instead of racing with the same refresh token,
+# which providers that rotate refresh tokens would reject for every caller but the first.
+# This dedupe is per process; across workers the POST is guarded by a Redis lock per OAuth account
+_refresh_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+# The refresh runs inside a user's request (token rotation), so a slow provider gets a tighter
+# budget than the shared client's 10 s; a timeout counts as a failed refresh
+OAUTH_REFRESH_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+
+# Covers the provider POST (OAUTH_REFRESH_TIMEOUT) and the commit of the new tokens.
+# After a successful refresh the lock is left to expire instead of being released, so a worker
+# that read the row before that commit can't POST the already rotated refresh token
+OAUTH_REFRESH_LOCK_TIMEOUT = 10
+
+def oauth_refresh_lock_key(oauth_account: OAuthAccount) -> str:
+    return f"oauth_refresh_lock:{oauth_account.id}"
+
+async def request_refreshed_token(oauth_account: OAuthAccount, config: dict) -> Optional[dict]:
+    """
+    Exchange the account's refresh token at the provider.
+    Returns the token response, or None if the provider rejected the refresh
+    or another worker holds the account's refresh lock. If Redis is unavailable
+    the refresh goes ahead without the lock.
+    """
+    key = (str(oauth_account.user_id), oauth_account.provider)
+    inflight = _refresh_inflight.get(key)
+    if inflight is not None:
+        # shield: a cancelled follower must not cancel the leader's future
+        return await asyncio.shield(inflight)
+    
+    future = asyncio.get_running_loop().create_future()
+    _refresh_inflight[key] = future
+    lock_key = oauth_refresh_lock_key(oauth_account)
+    lock_acquired = False
+    try:
+        lock_state = await try_acquire_lock(lock_key, timeout=OAUTH_REFRESH_LOCK_TIMEOUT)
+        if lock_state is False:
+            # Another worker is refreshing this account right now; its result lands in the DB,
+            # a second POST with the same refresh token would only be rejected
+            logger.info(f"OAuth token refresh for user {oauth_account.user_id}, provider {oauth_account.provider} is already running in another worker")
+            future.set_result(None)
+            return None
+        if lock_state is None:
+            # Redis is down: skipping the refresh would leave tokens expired for the whole outage.
+            # Refresh without the cross-worker lock - the in-process dedupe above still applies
+            logger.warning(f"Redis unavailable, refreshing OAuth token for user {oauth_account.user_id}, provider {oauth_account.provider} without the cross-worker lock")
+        lock_acquired = lock_state is True
+        
+        client = get_http_client()
+        response = await client.post(config["token_url"], data={
+            "client_id": config["client_id"],
+            "client_secret": config["client_secret"],
+            "grant_type": "refresh_token",
+            "refresh_token": oauth_account.refresh_token,
+        }, timeout=OAUTH_REFRESH_TIMEOUT)
+        if response.status_code != 200:
+            logger.warning(f"Failed to refresh OAuth token for user {oauth_account.user_id}, provider {oauth_account.provider}: {response.status_code}")
+            future.set_result(None)
+        else:
+            future.set_result(response.json())
+        return future.result()
+    finally:
+        # Released only when the refresh did not happen (see OAUTH_REFRESH_LOCK_TIMEOUT)
+        refreshed = future.done() and future.result() is not None
+        if lock_acquired and not refreshed:
+            await release_lock(lock_key)
+        # On errors and cancellation followers get None; the leader re-raises
+        if not future.done():
+            future.set_result(None)
+        del _refresh_inflight[key]
+
+async def invalidate_oauth_expiry_cache(user_id) -> None:
+    """Drop the cached OAuth expiry after the user's OAuth accounts are written or removed"""
+    await delete_cache(f"{OAUTH_EXPIRY_CACHE_PREFIX}{user_id}")
+
+async def cache_oauth_expiry(
+    user_id,
+    max_expires_at: Optional[datetime],
+    earliest_expires_at: Optional[datetime]
+) -> None:
+    """Cache max_expires_at until shortly before the earliest OAuth token expires"""
+    ttl = OAUTH_EXPIRY_CACHE_MAX_TTL
+    if earliest_expires_at:
+        ttl = min(ttl, int((earliest_expires_at - datetime.now(timezone.utc)).total_seconds()) - OAUTH_EXPIRY_CACHE_BUFFER)
+    if ttl > 0:
+        # Empty string: the user has no expiring tokens at all
+        await set_cache(
+            f"{OAUTH_EXPIRY_CACHE_PREFIX}{user_id}",
+            max_expires_at.isoformat() if max_expires_at else "",
+            ttl
+        )
 
 async def refresh_oauth_token_if_needed(
     user: User,
@@ -81,6 +311,11 @@ async def refresh_oauth_token_if_needed(
     Refresh OAuth tokens if they expired.
     Returns: (max_expires_at, success)
     """
+    # While the cached expiry is present no token is due, so the oauth_accounts query is skipped
+    cached = await get_cache(f"{OAUTH_EXPIRY_CACHE_PREFIX}{user.id}")
+    if cached is not None:
+        return (datetime.fromisoformat(cached) if cached else None), True
+    
     result = await db.execute(
         select(OAuthAccount).where(OAuthAccount.user_id == user.id)
     )
@@ -90,8 +325,10 @@ async def refresh_oauth_token_if_needed(
         return None, False
     
     max_expires_at = None
+    earliest_expires_at = None
     all_refreshed = True
     now = datetime.now(timezone.utc)
+    expired_accounts = []
     
     for oauth_account in oauth_accounts:
         # Skip Steam - it doesn't use refresh tokens
@@ -103,6 +340,8 @@ async def refresh_oauth_token_if_needed(
             if oauth_account.expires_at:
                 if max_expires_at is None or oauth_account.expires_at > max_expires_at:
                     max_expires_at = oauth_account.expires_at
+                if earliest_expires_at is None or oauth_account.expires_at < earliest_expires_at:
+                    earliest_expires_at = oauth_account.expires_at
             continue
         
         # Skip if no refresh token
@@ -115,111 +354,104 @@ async def refresh_oauth_token_if_needed(
             all_refreshed = False
             continue
         
-        config = PROVIDERS[oauth_account.provider]
+        expired_accounts.append(oauth_account)
+    
+    if not expired_accounts:
+        if all_refreshed:
+            await cache_oauth_expiry(user.id, max_expires_at, earliest_expires_at)
+        return max_expires_at, all_refreshed
+    
+    # Release the pooled connection for the duration of the provider requests
+    await db.commit()
+    
+    # Providers are independent: refresh all expired tokens concurrently
+    results = await asyncio.gather(
+        *(request_refreshed_token(account, PROVIDERS[account.provider]) for account in expired_accounts),
+        return_exceptions=True
+    )
+    
+    refreshed_accounts = []
+    refreshed_values = []
+    for oauth_account, token_data in zip(expired_accounts, results):
+        if isinstance(token_data, BaseException):
+            logger.error(f"Error refreshing OAuth token for user {user.id}, provider {oauth_account.provider}: {token_data}", exc_info=token_data)
+            all_refreshed = False
+            continue
+        if token_data is None:
+            all_refreshed = False
+            continue
         
         try:
-            async with httpx.AsyncClient() as client:
-                data = {
-                    "client_id": config["client_id"],
-                    "client_secret": config["client_secret"],
-                    "grant_type": "refresh_token",
-                    "refresh_token": oauth_account.refresh_token,
-                }
-                
-                response = await client.post(config["token_url"], data=data)
-                
-                if response.status_code == 200:
-                    token_data = response.json()
-                    oauth_account.access_token = token_data["access_token"]
-                    oauth_account.refresh_token = token_data.get("refresh_token") or oauth_account.refresh_token
-                    
-                    expires_in = token_data.get("expires_in")
-                    if expires_in:
-                        oauth_account.expires_at = now + timedelta(seconds=int(expires_in))
-                        if max_expires_at is None or oauth_account.expires_at > max_expires_at:
-                            max_expires_at = oauth_account.expires_at
-                    else:
-                        oauth_account.expires_at = None
-                    
-                    await db.commit()
-                    logger.info(f"Refreshed OAuth token for user {user.id}, provider {oauth_account.provider}")
-                else:
-                    logger.warning(f"Failed to refresh OAuth token for user {user.id}, provider {oauth_account.provider}: {response.status_code}")
-                    all_refreshed = False
-        except Exception as e:
-            logger.exception(f"Error refreshing OAuth token for user {user.id}, provider {oauth_account.provider}: {str(e)}")
+            access_token = token_data["access_token"]
+            expires_in = token_data.get("expires_in")
+            expires_at = now + timedelta(seconds=int(expires_in)) if expires_in else None
+        except (KeyError, ValueError, TypeError) as e:
+            logger.error(f"Invalid token response for user {user.id}, provider {oauth_account.provider}: {e}")
             all_refreshed = False
+            continue
+        
+        refreshed_accounts.append(oauth_account)
+        refreshed_values.append({
+            "id": oauth_account.id,
+            "access_token": access_token,
+            "refresh_token": token_data.get("refresh_token") or oauth_account.refresh_token,
+            "expires_at": expires_at,
+        })
+    
+    if refreshed_values:
+        # ORM bulk UPDATE by primary key: one executemany and one commit for all refreshed accounts
+        try:
+            await db.execute(update(OAuthAccount), refreshed_values)
+            await db.commit()
+        except Exception as e:
+            logger.exception(f"Error saving refreshed OAuth tokens for user {user.id}: {str(e)}")
+            await db.rollback()
+            return max_expires_at, False
+        
+        for oauth_account, values in zip(refreshed_accounts, refreshed_values):
+            logger.info(f"Refreshed OAuth token for user {user.id}, provider {oauth_account.provider}")
+            if values["expires_at"] and (max_expires_at is None or values["expires_at"] > max_expires_at):
+                max_expires_at = values["expires_at"]
+            if values["expires_at"] and (earliest_expires_at is None or values["expires_at"] < earliest_expires_at):
+                earliest_expires_at = values["expires_at"]
+    
+    if all_refreshed:
+        await cache_oauth_expiry(user.id, max_expires_at, earliest_expires_at)
     
     return max_expires_at, all_refreshed
 
 @router.get("/login/{provider}")
-def login(provider: str):
+async def login(provider: str):
     """Initiate OAuth login flow with CSRF protection"""
     if provider not in PROVIDERS:
         raise HTTPException(status_code=400, detail="Provider not supported")
     
-    config = PROVIDERS[provider]
-    redirect_uri = f"{settings.BACKEND_CORS_ORIGINS[1]}{settings.API_V1_STR}/auth/callback/{provider}"
-    
-    # Create secure state token for CSRF protection
-    state = create_state_token("login")
-    
-    # Steam uses OpenID 2.0, not OAuth 2.0
+    # Steam uses OpenID 2.0, not OAuth 2.0: the login URL has no state
     if provider == "steam":
-        params = {
-            "openid.ns": "http://specs.openid.net/auth/2.0",
-            "openid.mode": "checkid_setup",
-            "openid.return_to": redirect_uri,
-            "openid.realm": settings.BACKEND_CORS_ORIGINS[1],
-            "openid.identity": "http://specs.openid.net/auth/2.0/identifier_select",
-            "openid.claimed_id": "http://specs.openid.net/auth/2.0/identifier_select",
-        }
-    else:
-        params = {
-            "client_id": config['client_id'],
-            "redirect_uri": redirect_uri,
-            "response_type": "code",
-            "scope": config['scope'],
-            "state": state
-        }
+        return RedirectResponse(get_authorize_url_prefix(provider))
     
-    url = f"{config['auth_url']}?{urlencode(params)}"
+    # Create secure state token for CSRF protection
+    state = await create_state_token("login")
+    url = f"{get_authorize_url_prefix(provider)}&state={state}"
     return RedirectResponse(url)
 
 @router.get("/link/{provider}")
-async def link(provider: str, current_user: User = Depends(deps.get_current_user)):
+async def link(provider: str, current_user: deps.AuthPrincipal = Depends(deps.get_current_principal)):
     """Get OAuth URL for linking a new provider to existing account"""
     if provider not in PROVIDERS:
         raise HTTPException(status_code=400, detail="Provider not supported")
     
-    config = PROVIDERS[provider]
-    redirect_uri = f"{settings.BACKEND_CORS_ORIGINS[1]}{settings.API_V1_STR}/auth/callback/{provider}"
-    
     # Create secure state token with user ID for linking
-    state = create_state_token("link", str(current_user.id))
+    state = await create_state_token("link", str(current_user.id))
     
     # Steam uses OpenID 2.0, not OAuth 2.0
     if provider == "steam":
         # Add state to return_to for linking support
-        redirect_uri_with_state = f"{redirect_uri}?state={state}"
-        params = {
-            "openid.ns": "http://specs.openid.net/auth/2.0",
-            "openid.mode": "checkid_setup",
-            "openid.return_to": redirect_uri_with_state,
-            "openid.realm": settings.BACKEND_CORS_ORIGINS[1],
-            "openid.identity": "http://specs.openid.net/auth/2.0/identifier_select",
-            "openid.claimed_id": "http://specs.openid.net/auth/2.0/identifier_select",
-        }
+        redirect_uri_with_state = f"{get_redirect_uri(provider)}?state={state}"
+        url = f"{PROVIDERS[provider]['auth_url']}?{urlencode(get_openid_params(redirect_uri_with_state))}"
     else:
-        params = {
-            "client_id": config['client_id'],
-            "redirect_uri": redirect_uri,
-            "response_type": "code",
-            "scope": config['scope'],
-            "state": state
-        }
+        url = f"{get_authorize_url_prefix(provider)}&state={state}"
     
-    url = f"{config['auth_url']}?{urlencode(params)}"
     return RedirectResponse(url)
 
 @router.get("/callback/{provider}")
@@ -236,15 +468,13 @@ async def callback(
     
     # Handle OAuth errors
     if error:
-        error_params = urlencode({"error": "oauth_error"})
-        return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+        return auth_error_redirect("oauth_error")
     
     if provider not in PROVIDERS:
-        error_params = urlencode({"error": "invalid_provider"})
-        return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+        return auth_error_redirect("invalid_provider")
     
     config = PROVIDERS[provider]
-    redirect_uri = f"{settings.BACKEND_CORS_ORIGINS[1]}{settings.API_V1_STR}/auth/callback/{provider}"
+    redirect_uri = get_redirect_uri(provider)
     
     try:
         # Steam uses OpenID 2.0, handle differently
@@ -253,22 +483,20 @@ async def callback(
             openid_params = dict(request.query_params)
             
             if "openid.mode" not in openid_params or openid_params.get("openid.mode") != "id_res":
-                error_params = urlencode({"error": "invalid_request"})
-                return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+                return auth_error_redirect("invalid_request")
             
             # Extract state if present (for linking)
             state = openid_params.get("state")
             if state:
                 try:
-                    state_data = verify_state_token(state)
+                    state_data = await verify_state_token(state)
                     action = state_data.get("action")
                     user_id = state_data.get("user_id")
                 except Exception:
                     # Invalid or expired state token - return error instead of fallback to login
                     # This prevents security issues where invalid linking attempts become logins
                     logger.warning(f"Invalid state token for Steam callback: {state[:20] if state else 'None'}")
-                    error_params = urlencode({"error": "invalid_state"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+                    return auth_error_redirect("invalid_state")
             else:
                 # No state means this is a login flow (not linking)
                 action = "login"
@@ -303,215 +531,219 @@ async def callback(
                     if full_param not in verify_data:
                         logger.error(f"Missing signed parameter: {full_param}")
             
-            async with httpx.AsyncClient(follow_redirects=False, timeout=10.0) as client:
-                # Steam OpenID expects application/x-www-form-urlencoded
-                headers = {
-                    "Content-Type": "application/x-www-form-urlencoded",
-                    "User-Agent": "PolystirolHub/1.0"
-                }
-                
-                verify_response = await client.post(
-                    config["openid_verify_url"], 
-                    data=verify_data,
-                    headers=headers
-                )
-                
-                # Steam should return text/plain, not text/html
-                content_type = verify_response.headers.get('Content-Type', '').lower()
-                if 'text/html' in content_type:
-                    logger.error("Steam returned HTML instead of text/plain. This usually means the request was invalid or redirected.")
-                    if verify_response.status_code == 302:
-                        location = verify_response.headers.get('Location', '')
-                        logger.error(f"302 redirect to: {location}")
-                    error_params = urlencode({"error": "token_error"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                verify_text = verify_response.text
-                
-                # Steam returns plain text in format: "is_valid:true" or "is_valid:false"
-                is_valid = False
-                
-                # Try to parse the response
-                if verify_text:
-                    for line in verify_text.split('\n'):
-                        line = line.strip()
-                        if line.startswith('is_valid:'):
-                            is_valid_value = line.split(':', 1)[1].strip().lower()
-                            is_valid = is_valid_value == 'true'
-                            break
-                
-                # If we got 302, it might be an error, but check body first
+            client = get_http_client()
+            # Steam OpenID expects application/x-www-form-urlencoded
+            headers = {
+                "Content-Type": "application/x-www-form-urlencoded",
+                "User-Agent": "PolystirolHub/1.0"
+            }
+            
+            verify_response = await client.post(
+                config["openid_verify_url"], 
+                data=verify_data,
+                headers=headers
+            )
+            
+            # Steam should return text/plain, not text/html
+            content_type = verify_response.headers.get('Content-Type', '').lower()
+            if 'text/html' in content_type:
+                logger.error("Steam returned HTML instead of text/plain. This usually means the request was invalid or redirected.")
                 if verify_response.status_code == 302:
-                    if not is_valid:
-                        logger.error("Steam returned 302 without is_valid in response body")
-                        error_params = urlencode({"error": "token_error"})
-                        return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
+                    location = verify_response.headers.get('Location', '')
+                    logger.error(f"302 redirect to: {location}")
+                return auth_error_redirect("token_error")
+            
+            verify_text = verify_response.text
+            
+            # Steam returns plain key-value text ("ns:...\nis_valid:true\n"); OpenID 2.0 fixes the
+            # literal "is_valid:true", so a substring check is enough
+            is_valid = "is_valid:true" in verify_text
+            
+            # If we got 302, it might be an error, but check body first
+            if verify_response.status_code == 302:
                 if not is_valid:
-                    logger.error(f"Steam OpenID verification failed. Status: {verify_response.status_code}, Response: {verify_text[:200]}")
-                    error_params = urlencode({"error": "token_error"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                # Extract Steam ID from openid.identity
-                identity = openid_params.get("openid.identity", "")
-                if not identity.startswith("https://steamcommunity.com/openid/id/"):
-                    error_params = urlencode({"error": "invalid_identity"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                steam_id = identity.replace("https://steamcommunity.com/openid/id/", "")
-                provider_account_id = steam_id
-                
-                # Get user data from Steam Web API
-                if not config.get("api_key"):
-                    logger.error("STEAM_API_KEY is not configured")
-                    error_params = urlencode({"error": "config_error"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                api_url = f"{config['api_url']}?key={config['api_key']}&steamids={steam_id}"
-                user_response = await client.get(api_url)
-                
-                if user_response.status_code != 200:
-                    logger.error(f"Steam API error: {user_response.status_code}, {user_response.text}")
-                    error_params = urlencode({"error": "user_info_error"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                user_data = user_response.json()
-                players = user_data.get("response", {}).get("players", [])
-                
-                if not players:
-                    logger.error(f"Steam API returned no players: {user_data}")
-                    error_params = urlencode({"error": "user_info_error"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                player = players[0]
-                username = player.get("personaname", "")
-                avatar = player.get("avatarfull") or player.get("avatarmedium", "")
-                email = None  # Steam doesn't provide email via OpenID
-                access_token = steam_id  # Store Steam ID as access_token
-                refresh_token = None  # Steam doesn't use refresh tokens
-                expires_in = None
-                
+                    logger.error("Steam returned 302 without is_valid in response body")
+                    return auth_error_redirect("token_error")
+            
+            if not is_valid:
+                logger.error(f"Steam OpenID verification failed. Status: {verify_response.status_code}, Response: {verify_text[:200]}")
+                return auth_error_redirect("token_error")
+            
+            # Extract Steam ID from openid.identity
+            identity = openid_params.get("openid.identity", "")
+            if not identity.startswith("https://steamcommunity.com/openid/id/"):
+                return auth_error_redirect("invalid_identity")
+            
+            steam_id = identity.replace("https://steamcommunity.com/openid/id/", "")
+            provider_account_id = steam_id
+            
+            # Get user data from Steam Web API
+            if not config.get("api_key"):
+                logger.error("STEAM_API_KEY is not configured")
+                return auth_error_redirect("config_error")
+            
+            api_url = f"{config['api_url']}?key={config['api_key']}&steamids={steam_id}"
+            # Steam ID is already known: look up the OAuth account (and the user being linked)
+            # while the Steam Web API request is in flight
+            user_response, (oauth_account, other_expires_at, link_user) = await gather_settled(
+                client.get(api_url),
+                prefetch_callback_rows(db, provider, provider_account_id, action, user_id)
+            )
+            oauth_account_loaded = True
+            
+            if user_response.status_code != 200:
+                logger.error(f"Steam API error: {user_response.status_code}, {user_response.text}")
+                return auth_error_redirect("user_info_error")
+            
+            user_data = user_response.json()
+            players = user_data.get("response", {}).get("players", [])
+            
+            if not players:
+                logger.error(f"Steam API returned no players: {user_data}")
+                return auth_error_redirect("user_info_error")
+            
+            player = players[0]
+            username = player.get("personaname", "")
+            avatar = player.get("avatarfull") or player.get("avatarmedium", "")
+            email = None  # Steam doesn't provide email via OpenID
+            access_token = steam_id  # Store Steam ID as access_token
+            refresh_token = None  # Steam doesn't use refresh tokens
+            expires_in = None
+            
         else:
             # Standard OAuth 2.0 flow
             if not code or not state:
-                error_params = urlencode({"error": "invalid_request"})
-                return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+                return auth_error_redirect("invalid_request")
             
             # Verify state token (CSRF protection)
             try:
-                state_data = verify_state_token(state)
+                state_data = await verify_state_token(state)
                 action = state_data.get("action")
                 user_id = state_data.get("user_id")
             except Exception:
-                error_params = urlencode({"error": "invalid_state"})
-                return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+                return auth_error_redirect("invalid_state")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(config["token_url"], data={
-                    "client_id": config["client_id"],
-                    "client_secret": config["client_secret"],
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": redirect_uri,
-                })
-                
-                if response.status_code != 200:
-                    error_params = urlencode({"error": "token_error"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                token_data = response.json()
-                access_token = token_data["access_token"]
-                refresh_token = token_data.get("refresh_token")
-                expires_in = token_data.get("expires_in")
-                if expires_in is not None:
-                    try:
-                        expires_in = int(expires_in)
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid expires_in value: {expires_in}, treating as None")
-                        expires_in = None
-                
-                headers = {"Authorization": f"Bearer {access_token}"}
-                if provider == "twitch":
-                    headers["Client-Id"] = config["client_id"]
-                    
-                user_response = await client.get(config["user_url"], headers=headers)
-                
-                if user_response.status_code != 200:
-                    error_params = urlencode({"error": "user_info_error"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
-                
-                user_data = user_response.json()
-                
-                provider_account_id = ""
-                email = ""
-                username = ""
-                avatar = ""
+            client = get_http_client()
+            response = await client.post(config["token_url"], data={
+                "client_id": config["client_id"],
+                "client_secret": config["client_secret"],
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": redirect_uri,
+            })
+            
+            if response.status_code != 200:
+                return auth_error_redirect("token_error")
+            
+            token_data = response.json()
+            access_token = token_data["access_token"]
+            refresh_token = token_data.get("refresh_token")
+            expires_in = token_data.get("expires_in")
+            if expires_in is not None:
+                try:
+                    expires_in = int(expires_in)
+                except (ValueError, TypeError):
+                    logger.warning(f"Invalid expires_in value: {expires_in}, treating as None")
+                    expires_in = None
+            
+            headers = {"Authorization": f"Bearer {access_token}"}
+            if provider == "twitch":
+                headers["Client-Id"] = config["client_id"]
                 
-                if provider == "twitch":
-                    data = user_data["data"][0]
-                    provider_account_id = data["id"]
-                    email = data.get("email")
-                    username = data["login"]
-                    avatar = data.get("profile_image_url", "")
-                elif provider == "discord":
-                    provider_account_id = user_data["id"]
-                    email = user_data.get("email")
-                    username = user_data["username"]
-                    avatar_hash = user_data.get("avatar")
-                    if avatar_hash:
-                        avatar = f"https://cdn.discordapp.com/avatars/{provider_account_id}/{avatar_hash}.png?size=512"
+            # The user being linked is loaded while the user-info request is in flight
+            user_response, (oauth_account, other_expires_at, link_user) = await gather_settled(
+                client.get(config["user_url"], headers=headers),
+                prefetch_callback_rows(db, provider, None, action, user_id)
+            )
+            oauth_account_loaded = False
+            
+            if user_response.status_code != 200:
+                return auth_error_redirect("user_info_error")
+            
+            user_data = user_response.json()
+            
+            provider_account_id = ""
+            email = ""
+            username = ""
+            avatar = ""
+            
+            if provider == "twitch":
+                data = user_data["data"][0]
+                provider_account_id = data["id"]
+                email = data.get("email")
+                username = data["login"]
+                avatar = data.get("profile_image_url", "")
+            elif provider == "discord":
+                provider_account_id = user_data["id"]
+                email = user_data.get("email")
+                username = user_data["username"]
+                avatar_hash = user_data.get("avatar")
+                if avatar_hash:
+                    avatar = f"{DISCORD_CDN}/avatars/{provider_account_id}/{avatar_hash}.png?size=512"
+                else:
+                    # Discord may send the key with null, so fall back with "or", not a get() default
+                    discriminator = user_data.get("discriminator") or "0"
+                    if discriminator == "0":
+                        # Migrated username (no discriminator): Discord picks the default avatar from the user id
+                        avatar = DEFAULT_DISCORD_AVATARS[(int(provider_account_id) >> 22) % 6]
                     else:
-                        discriminator = user_data.get("discriminator", "0")
-                        discriminator_mod = int(discriminator) % 5
-                        avatar = f"https://cdn.discordapp.com/embed/avatars/{discriminator_mod}.png"
+                        avatar = DEFAULT_DISCORD_AVATARS[int(discriminator) % 5]
 
-        # Check if OAuth account exists
-        result = await db.execute(select(OAuthAccount).where(
-            OAuthAccount.provider == provider,
-            OAuthAccount.provider_account_id == provider_account_id
-        ))
-        oauth_account = result.scalars().first()
+        # Token expiry is computed once, every branch below stores the same value
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in) if expires_in else None
+
+        # Check if OAuth account exists (Steam has already loaded it)
+        if not oauth_account_loaded:
+            oauth_account, other_expires_at = await load_oauth_account(db, provider, provider_account_id)
 
         user = None
         
         # Handle Linking
         if action == "link" and user_id:
-            result = await db.execute(select(User).where(User.id == user_id))
-            user = result.scalars().first()
+            user = link_user
             
             if not user:
-                error_params = urlencode({"error": "link_error"})
-                return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+                return auth_error_redirect("link_error")
             
             # Check if this provider account is already linked to another user
             if oauth_account:
                 if oauth_account.user_id != user.id:
-                    error_params = urlencode({"error": "already_linked"})
-                    return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+                    return auth_error_redirect("already_linked")
                 
                 # Update existing OAuth account (refresh tokens)
-                oauth_account.access_token = access_token
-                oauth_account.refresh_token = refresh_token
-                oauth_account.provider_username = username
-                oauth_account.provider_avatar = avatar
-                if expires_in:
-                    oauth_account.expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
-                else:
-                    oauth_account.expires_at = None
+                await db.execute(
+                    update(OAuthAccount)
+                    .where(OAuthAccount.id == oauth_account.id)
+                    .values(
+                        access_token=access_token,
+                        refresh_token=refresh_token,
+                        provider_username=username,
+                        provider_avatar=avatar,
+                        expires_at=expires_at
+                    )
+                )
                 await db.commit()
             else:
-                # Create new OAuth account link
-                new_oauth = OAuthAccount(
-                    user_id=user.id,
-                    provider=provider,
-                    provider_account_id=provider_account_id,
-                    provider_username=username,
-                    provider_avatar=avatar,
-                    access_token=access_token,
-                    refresh_token=refresh_token,
-                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in) if expires_in else None
+                # Create new OAuth account link. ON CONFLICT DO NOTHING: if the same provider account
+                # was linked concurrently, nothing is inserted and we report it as already linked
+                result = await db.execute(
+                    insert(OAuthAccount)
+                    .values(
+                        user_id=user.id,
+                        provider=provider,
+                        provider_account_id=provider_account_id,
+                        provider_username=username,
+                        provider_avatar=avatar,
+                        access_token=access_token,
+                        refresh_token=refresh_token,
+                        expires_at=expires_at
+                    )
+                    .on_conflict_do_nothing(index_elements=["provider", "provider_account_id"])
+                    .returning(OAuthAccount.id)
                 )
-                db.add(new_oauth)
+                if result.scalar() is None:
+                    await db.rollback()
+                    return auth_error_redirect("already_linked")
                 await db.commit()
                 
                 # Обновляем прогресс для link_all_platforms
@@ -532,28 +764,33 @@ async def callback(
                 except Exception as e:
                     logger.error(f"Error updating quest progress for link_all_platforms: {e}")
                 
+            await invalidate_oauth_expiry_cache(user.id)
+            
             # Return success - DO NOT create JWT tokens for linking
             success_params = urlencode({"success": "true"})
             return RedirectResponse(f"{settings.FRONTEND_URL}/auth/link-success?{success_params}")
 
         # Handle Login (only if not linking)
         if oauth_account:
-            result = await db.execute(select(User).where(User.id == oauth_account.user_id))
-            user = result.scalars().first()
+            # Loaded together with the OAuth account (joinedload), no extra round-trip
+            user = oauth_account.user
             
             if not user:
                 logger.error(f"OAuth account exists but user not found: user_id={oauth_account.user_id}")
-                error_params = urlencode({"error": "user_not_found"})
-                return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+                return auth_error_redirect("user_not_found")
             
-            oauth_account.access_token = access_token
-            oauth_account.refresh_token = refresh_token
-            oauth_account.provider_username = username
-            oauth_account.provider_avatar = avatar
-            if expires_in:
-                oauth_account.expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
-            else:
-                oauth_account.expires_at = None
+            # Single UPDATE by primary key (no ORM change tracking for a plain token write)
+            await db.execute(
+                update(OAuthAccount)
+                .where(OAuthAccount.id == oauth_account.id)
+                .values(
+                    access_token=access_token,
+                    refresh_token=refresh_token,
+                    provider_username=username,
+                    provider_avatar=avatar,
+                    expires_at=expires_at
+                )
+            )
             await db.commit()
         else:
             # Only search by email if it exists (Steam doesn't provide email)
@@ -566,24 +803,64 @@ async def callback(
                 # If username already exists, make it unique by adding a suffix
                 final_username = username
                 if username:
-                    base_username = username
-                    counter = 1
-                    while True:
-                        result = await db.execute(select(User).where(User.username == final_username))
-                        existing = result.scalars().first()
-                        if not existing:
-                            break
-                        final_username = f"{base_username}{counter}"
-                        counter += 1
-                        if counter > 100:  # Safety limit
-                            final_username = f"{base_username}_{secrets.token_hex(4)}"
-                            break
+                    # Candidates in order of preference (name, name1 ... name100) probed in one query
+                    candidates = [username] + [f"{username}{counter}" for counter in range(1, 101)]
+                    result = await db.execute(select(User.username).where(User.username.in_(candidates)))
+                    taken = set(result.scalars().all())
+                    # Safety fallback if all of them are taken
+                    final_username = next(
+                        (candidate for candidate in candidates if candidate not in taken),
+                        f"{username}_{secrets.token_hex(4)}"
+                    )
                 
                 user = User(email=email, username=final_username, avatar=avatar if avatar else None)
                 db.add(user)
-                await db.commit()
-                await db.refresh(user)
-                
+                # INSERT without commit: the user and its OAuth account are committed together below
+                await db.flush()
+                new_user = user
+            else:
+                new_user = None
+            
+            # Single upsert on (provider, provider_account_id): if a concurrent first login has just
+            # created this OAuth account, its tokens are refreshed instead of failing on the unique key
+            insert_stmt = insert(OAuthAccount).values(
+                user_id=user.id,
+                provider=provider,
+                provider_account_id=provider_account_id,
+                provider_username=username,
+                provider_avatar=avatar,
+                access_token=access_token,
+                refresh_token=refresh_token,
+                expires_at=expires_at
+            )
+            upserted = insert_stmt.on_conflict_do_update(
+                index_elements=["provider", "provider_account_id"],
+                set_={
+                    "provider_username": insert_stmt.excluded.provider_username,
+                    "provider_avatar": insert_stmt.excluded.provider_avatar,
+                    "access_token": insert_stmt.excluded.access_token,
+                    "refresh_token": insert_stmt.excluded.refresh_token,
+                    "expires_at": insert_stmt.excluded.expires_at,
+                }
+            ).returning(OAuthAccount.id, OAuthAccount.user_id).cte("upserted")
+            # RETURNING can't hold a correlated subquery, so the expiry of the user's other
+            # accounts is read by the SELECT over the upsert CTE - still one statement
+            result = await db.execute(
+                select(upserted.c.user_id, other_accounts_max_expiry(upserted.c))
+            )
+            account_user_id, other_expires_at = result.one()
+            
+            if account_user_id != user.id:
+                # The concurrent login won: the account belongs to the user it created,
+                # the user inserted above is left without an account and is not kept
+                if new_user is not None:
+                    await db.execute(delete(User).where(User.id == new_user.id))
+                    new_user = None
+                result = await db.execute(select(User).where(User.id == account_user_id))
+                user = result.scalars().first()
+            await db.commit()
+            
+            if new_user is not None:
                 # Создаем событие активности для нового пользователя
                 try:
                     from app.services.activity import create_activity
@@ -592,37 +869,26 @@ async def callback(
                         db=db,
                         activity_type=ActivityType.new_user,
                         title="Новый игрок присоединился",
-                        description=f"{final_username} зарегистрировался",
-                        user_id=user.id,
+                        description=f"{new_user.username} зарегистрировался",
+                        user_id=new_user.id,
                         meta_data={
-                            "username": final_username,
+                            "username": new_user.username,
                             "provider": provider
                         }
                     )
                 except Exception as e:
-                    logger.error(f"Failed to create new_user activity for user {user.id}: {e}", exc_info=True)
-            
-            new_oauth = OAuthAccount(
-                user_id=user.id,
-                provider=provider,
-                provider_account_id=provider_account_id,
-                provider_username=username,
-                provider_avatar=avatar,
-                access_token=access_token,
-                refresh_token=refresh_token,
-                expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in) if expires_in else None
-            )
-            db.add(new_oauth)
-            await db.commit()
+                    logger.error(f"Failed to create new_user activity for user {new_user.id}: {e}", exc_info=True)
 
         # Verify user exists before creating JWT
         if not user:
             logger.error("User is None after OAuth processing")
-            error_params = urlencode({"error": "user_creation_failed"})
-            return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+            return auth_error_redirect("user_creation_failed")
+        
+        # The account's tokens and expiry were just rewritten
+        await invalidate_oauth_expiry_cache(user.id)
 
         # Create JWT access token
-        access_token_jwt = create_access_token(subject=user.id)
+        access_token_jwt = create_access_token(subject=user.id, roles=roles_to_bits(user.is_admin, user.is_super_admin))
         
         # Create refresh token
         refresh_token_value = create_refresh_token()
@@ -631,15 +897,11 @@ async def callback(
         min_refresh_ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60  # 30 days in seconds
         refresh_ttl = min_refresh_ttl
         
-        # Check all OAuth token expirations to find maximum
-        result = await db.execute(
-            select(OAuthAccount).where(OAuthAccount.user_id == user.id)
-        )
-        all_oauth_accounts = result.scalars().all()
-        
-        for acc in all_oauth_accounts:
-            if acc.expires_at:
-                oauth_ttl = int((acc.expires_at - datetime.now(timezone.utc)).total_seconds())
+        # Latest OAuth token expiration: this account's new expiry and the user's other accounts
+        # (read together with the account itself, no separate query)
+        for acc_expires_at in (expires_at, other_expires_at):
+            if acc_expires_at:
+                oauth_ttl = int((acc_expires_at - datetime.now(timezone.utc)).total_seconds())
                 if oauth_ttl > refresh_ttl:
                     refresh_ttl = oauth_ttl
         
@@ -675,27 +937,63 @@ async def callback(
         
     except Exception as e:
         logger.exception(f"OAuth callback error for provider {provider}: {str(e)}")
-        error_params = urlencode({"error": "server_error"})
-        return RedirectResponse(f"{settings.FRONTEND_URL}/auth/error?{error_params}")
+        return auth_error_redirect("server_error")
 
-@router.get("/me")
-async def get_current_user_info(current_user: User = Depends(deps.get_current_user)):
-    """Get current authenticated user information"""
-    return {
-        "id": str(current_user.id),
-        "email": current_user.email,
-        "username": current_user.username,
-        "avatar": current_user.avatar,
-        "is_active": current_user.is_active,
-        "is_admin": current_user.is_admin,
-        "is_super_admin": current_user.is_super_admin,
-        "selected_badge_id": str(current_user.selected_badge_id) if current_user.selected_badge_id else None,
-        "created_at": current_user.created_at.isoformat()
-    }
+# Entity tags in an If-None-Match list, weak ("W/") or strong
+ENTITY_TAG_RE = re.compile(r'(?:W/)?("[^"]*")')
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check per RFC 9110 13.1.2: "*" or any listed tag matches by weak comparison"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in ENTITY_TAG_RE.findall(if_none_match)
+
+@router.get(
+    "/me",
+    response_class=Response,
+    responses={
+        200: {"model": CurrentUserResponse, "description": "Current user"},
+        304: {"description": "Not Modified: the If-None-Match tag is still current"},
+    },
+)
+async def get_current_user_info(
+    request: Request,
+    auth: Tuple[str, Optional[User], Optional[int]] = Depends(deps.get_authenticated_user_id),
+    db: AsyncSession = Depends(deps.get_db)
+):
+    """Get current authenticated user information.
+    The serialized body is cached in Redis for a few seconds and served with an ETag,
+    so repeated page loads skip the users query and may get 304 Not Modified"""
+    user_id, current_user, _ = auth
+    cache_key = f"{deps.USER_INFO_CACHE_PREFIX}{user_id}"
+    
+    # A user loaded during token rotation is fresh already
+    body = None if current_user else await get_cache(cache_key)
+    if body is None:
+        if current_user is None:
+            result = await db.execute(select(User).where(User.id == user_id))
+            current_user = result.scalars().first()
+            if current_user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Could not validate credentials",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        body = CurrentUserResponse.model_validate(current_user).model_dump_json()
+        await set_cache(cache_key, body, deps.USER_INFO_CACHE_TTL)
+    
+    etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+    # no-cache: the browser keeps the body but revalidates it with If-None-Match on every load
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/me/providers", response_model=List[OAuthAccountPublic])
 async def get_user_providers(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.AuthPrincipal = Depends(deps.get_current_principal),
     db: AsyncSession = Depends(deps.get_db)
 ):
     """Get list of linked OAuth providers for current user"""
@@ -705,7 +1003,7 @@ async def get_user_providers(
     oauth_accounts = result.scalars().all()
     return [OAuthAccountPublic.model_validate(account) for account in oauth_accounts]
 
-@router.post("/me/avatar")
+@router.post("/me/avatar", response_model=UpdatedUserResponse)
 async def upload_avatar(
     file: UploadFile = File(...),
     current_user: User = Depends(deps.get_current_user),
@@ -765,19 +1063,11 @@ async def upload_avatar(
     # Обновляем аватар в БД
     current_user.avatar = avatar_url
     await db.commit()
-    await db.refresh(current_user)
+    await deps.invalidate_user_info_cache(current_user.id)
     
-    return {
-        "id": str(current_user.id),
-        "email": current_user.email,
-        "username": current_user.username,
-        "avatar": current_user.avatar,
-        "is_active": current_user.is_active,
-        "selected_badge_id": str(current_user.selected_badge_id) if current_user.selected_badge_id else None,
-        "created_at": current_user.created_at.isoformat()
-    }
+    return current_user
 
-@router.patch("/me")
+@router.patch("/me", response_model=UpdatedUserResponse)
 async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(deps.get_current_user),
@@ -786,29 +1076,35 @@ async def update_current_user(
     """Update current user profile"""
     update_data = user_update.model_dump(exclude_unset=True)
     
-    if "email" in update_data and update_data["email"] is not None:
-        # Check if email is already taken by another user
-        result = await db.execute(select(User).where(User.email == update_data["email"]))
-        existing_user = result.scalars().first()
-        if existing_user and existing_user.id != current_user.id:
+    new_email = update_data.get("email")
+    new_username = update_data.get("username")
+    # Пустая строка в username означает сброс, уникальность проверяем только для непустого
+    if new_username is not None and not new_username.strip():
+        new_username = None
+    
+    # Email и username проверяем одним запросом: строки других пользователей с любым из значений
+    conditions = []
+    if new_email is not None:
+        conditions.append(User.email == new_email)
+    if new_username is not None:
+        conditions.append(User.username == new_username)
+    if conditions:
+        result = await db.execute(
+            select(User.email, User.username).where(User.id != current_user.id, or_(*conditions))
+        )
+        taken = result.all()
+        if new_email is not None and any(row.email == new_email for row in taken):
             raise HTTPException(status_code=400, detail="Email already registered")
-        current_user.email = update_data["email"]
+        if new_username is not None and any(row.username == new_username for row in taken):
+            raise HTTPException(status_code=400, detail="Username already taken")
+    
+    if new_email is not None:
+        current_user.email = new_email
     
     # Обновляем username независимо от наличия email в запросе
     if "username" in update_data:
-        # Разрешаем обновление username даже если он None или пустая строка
-        new_username = update_data["username"]
-        # Если username не None и не пустая строка, проверяем уникальность
-        if new_username is not None and new_username.strip():
-            # Check if username is already taken by another user
-            result = await db.execute(select(User).where(User.username == new_username))
-            existing_user = result.scalars().first()
-            if existing_user and existing_user.id != current_user.id:
-                raise HTTPException(status_code=400, detail="Username already taken")
-            current_user.username = new_username
-        else:
-            # Если username None или пустая строка, устанавливаем None
-            current_user.username = None
+        # Разрешаем обновление username даже если он None или пустая строка (тогда устанавливаем None)
+        current_user.username = new_username
     
     if "avatar" in update_data:
         # Если новый аватар - это URL (обратная совместимость)
@@ -837,17 +1133,9 @@ async def update_current_user(
         current_user.is_active = update_data["is_active"]
     
     await db.commit()
-    await db.refresh(current_user)
+    await deps.invalidate_user_info_cache(current_user.id)
     
-    return {
-        "id": str(current_user.id),
-        "email": current_user.email,
-        "username": current_user.username,
-        "avatar": current_user.avatar,
-        "is_active": current_user.is_active,
-        "selected_badge_id": str(current_user.selected_badge_id) if current_user.selected_badge_id else None,
-        "created_at": current_user.created_at.isoformat()
-    }
+    return current_user
 
 @router.post("/refresh")
 async def refresh(
@@ -874,8 +1162,8 @@ async def refresh(
         )
     
     # Use lock to prevent race condition when multiple requests try to refresh simultaneously
-    lock_key = f"token_refresh_lock:{user_id}"
-    lock_acquired = await acquire_lock(lock_key, timeout=10)
+    lock_key = refresh_token_lock_key(refresh_token_value)
+    lock_acquired = await acquire_lock(lock_key, timeout=5)
     
     if not lock_acquired:
         raise HTTPException(
@@ -884,15 +1172,8 @@ async def refresh(
         )
     
     try:
-        # Verify refresh token still exists (might have been refreshed by another request)
-        current_user_id = await get_refresh_token(refresh_token_value)
-        if not current_user_id or current_user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Refresh token was already used"
-            )
-        
-        # Get user from database
+        # Get user from database. Whether the refresh token is still unused is checked
+        # atomically by rotate_refresh_token, no separate GET needed here
         result = await db.execute(select(User).where(User.id == user_id))
         user = result.scalars().first()
         
@@ -908,7 +1189,7 @@ async def refresh(
         max_expires_at, _ = await refresh_oauth_token_if_needed(user, db)
         
         # Create new tokens (rotation)
-        new_access_token = create_access_token(subject=user.id)
+        new_access_token = create_access_token(subject=user.id, roles=roles_to_bits(user.is_admin, user.is_super_admin))
         new_refresh_token = create_refresh_token()
         
         # Calculate new refresh token TTL
@@ -920,9 +1201,12 @@ async def refresh(
             if oauth_ttl > refresh_ttl:
                 refresh_ttl = oauth_ttl
         
-        # Atomic swap: save new token BEFORE deleting old one
-        await save_refresh_token(str(user.id), new_refresh_token, refresh_ttl)
-        await delete_refresh_token(refresh_token_value)
+        # Atomic compare-and-swap in one round-trip (Lua): fails if the token was already used
+        if not await rotate_refresh_token(refresh_token_value, str(user.id), new_refresh_token, refresh_ttl):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token was already used"
+            )
         
         # Update cookies
         is_secure = settings.FRONTEND_URL.startswith("https")
@@ -965,7 +1249,7 @@ async def logout(request: Request, response: Response):
 @router.delete("/unlink/{provider}")
 async def unlink_provider(
 	provider: str,
-	current_user: User = Depends(deps.get_current_user),
+	current_user: deps.AuthPrincipal = Depends(deps.get_current_principal),
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Unlink OAuth provider from current user account"""
@@ -1001,6 +1285,7 @@ async def unlink_provider(
 	# Delete the OAuth account
 	await db.execute(delete(OAuthAccount).where(OAuthAccount.id == provider_account.id))
 	await db.commit()
+	await invalidate_oauth_expiry_cache(current_user.id)
 	
 	return {"message": f"Provider {provider} has been unlinked successfully"}
 
@@ -1014,7 +1299,7 @@ def generate_link_code() -> str:
 
 @router.post("/generate-link-code", response_model=LinkCodeGenerateResponse)
 async def generate_link_code_endpoint(
-	current_user: User = Depends(deps.get_current_user)
+	current_user: deps.AuthPrincipal = Depends(deps.get_current_principal)
 ):
 	"""Generate a one-time link code for linking game UUID to user account"""
 	code = generate_link_code()
@@ -1039,14 +1324,13 @@ async def link_game_account(
 	await delete_link_code(link_data.link_code)
 	
 	# Check if this (platform, game_id) is already linked
-	result = await db.execute(
-		select(ExternalLink).where(
+	already_linked = await db.scalar(
+		select(exists().where(
 			ExternalLink.platform == link_data.platform,
 			ExternalLink.external_id == link_data.game_id
-		)
+		))
 	)
-	existing_link = result.scalars().first()
-	if existing_link:
+	if already_linked:
 		raise HTTPException(
 			status_code=status.HTTP_409_CONFLICT,
 			detail="This game ID is already linked"
@@ -8,6 +8,7 @@ from app.api import deps
 from app.models.user import User, ExternalLink
 from app.models.badge import Badge as BadgeModel, UserBadge, BadgeType
 from app.models.statistics import MinecraftUser
+from app.schemas.statistics import is_valid_uuid
 from app.schemas.badge import (
 	Badge,
 	UserBadgeWithBadge,
@@ -49,7 +50,7 @@ async def get_badges(
 async def get_my_badges(
 	skip: int = Query(0, ge=0, description="Количество пропущенных записей"),
 	limit: int = Query(50, ge=1, le=100, description="Максимальное количество записей"),
-	current_user: User = Depends(deps.get_current_user),
+	current_user: deps.AuthPrincipal = Depends(deps.get_current_principal),
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получить список моих бэджиков"""
@@ -160,6 +161,7 @@ async def select_badge(
 	current_user.selected_badge_id = badge_id
 	await db.commit()
 	await db.refresh(current_user)
+	await deps.invalidate_user_info_cache(current_user.id)
 	
 	return {"message": "Badge selected successfully", "selected_badge_id": str(badge_id)}
 
@@ -172,6 +174,7 @@ async def deselect_badge(
 	current_user.selected_badge_id = None
 	await db.commit()
 	await db.refresh(current_user)
+	await deps.invalidate_user_info_cache(current_user.id)
 	
 	return {"message": "Badge deselected successfully"}
 
@@ -216,8 +219,8 @@ async def get_minecraft_player_selected_badge(
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получить выбранный бэджик игрока Minecraft по его UUID"""
-	# Валидация UUID формата (36 символов)
-	if len(player_uuid) != 36:
+	# Валидация UUID формата (колонка в БД - нативный UUID)
+	if not is_valid_uuid(player_uuid):
 		raise HTTPException(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail="Invalid player UUID format"
@@ -640,6 +643,10 @@ async def delete_badge(
 	await db.execute(delete(BadgeModel).where(BadgeModel.id == badge_id))
 	await db.commit()
 	
+	if user_badges:
+		for user in users_with_selected:
+			await deps.invalidate_user_info_cache(user.id)
+	
 	# Перегенерируем ресурс-пак для всех GameServer'ов после удаления баджа
 	try:
 		game_servers_result = await db.execute(select(GameServer))
@@ -794,6 +801,7 @@ async def revoke_badge(
 		delete(UserBadge).where(UserBadge.id == user_badge.id)
 	)
 	await db.commit()
+	await deps.invalidate_user_info_cache(user_id)
 	
 	return {"message": "Badge revoked successfully"}
 
@@ -3,7 +3,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 from typing import List
 from app.api import deps
-from app.models.user import User
 from app.models.notification import Notification
 from app.schemas.notification import NotificationResponse
 
@@ -12,7 +11,7 @@ router = APIRouter()
 
 @router.get("/recent", response_model=List[NotificationResponse])
 async def get_recent_notifications(
-	current_user: User = Depends(deps.get_current_user),
+	current_user: deps.AuthPrincipal = Depends(deps.get_current_principal),
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получить 3 последних уведомления текущего пользователя"""
@@ -30,7 +29,7 @@ async def get_recent_notifications(
 async def get_all_notifications(
 	skip: int = Query(0, ge=0, description="Количество пропущенных записей"),
 	limit: int = Query(50, ge=1, le=100, description="Максимальное количество записей"),
-	current_user: User = Depends(deps.get_current_user),
+	current_user: deps.AuthPrincipal = Depends(deps.get_current_principal),
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получить все уведомления текущего пользователя с пагинацией"""
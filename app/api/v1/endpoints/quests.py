@@ -57,7 +57,7 @@ async def get_quests(
 async def get_my_quests(
 	skip: int = Query(0, ge=0, description="Количество пропущенных записей"),
 	limit: int = Query(50, ge=1, le=100, description="Максимальное количество записей"),
-	current_user: User = Depends(deps.get_current_user),
+	current_user: deps.AuthPrincipal = Depends(deps.get_current_principal),
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получить список моих квестов с прогрессом"""
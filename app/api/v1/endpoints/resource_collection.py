@@ -69,33 +69,28 @@ async def get_server_progress(
 			detail="Server not found"
 		)
 	
-	# Получаем все активные цели для сервера
+	# Активные цели сервера вместе с прогрессом по тому же (server_id, resource_type) - один запрос
 	result = await db.execute(
-		select(ResourceGoal).where(
+		select(ResourceGoal, ResourceProgress)
+		.outerjoin(
+			ResourceProgress,
+			and_(
+				ResourceProgress.server_id == ResourceGoal.server_id,
+				ResourceProgress.resource_type == ResourceGoal.resource_type
+			)
+		)
+		.where(
 			and_(
 				ResourceGoal.server_id == server_id,
 				ResourceGoal.is_active
 			)
 		)
 	)
-	goals = result.scalars().all()
-	
-	# Получаем весь прогресс для сервера
-	result = await db.execute(
-		select(ResourceProgress).where(ResourceProgress.server_id == server_id)
-	)
-	progress_list = result.scalars().all()
-	
-	# Создаем словари для быстрого поиска
-
-	progress_dict = {progress.resource_type: progress for progress in progress_list}
 	
 	# Формируем список ресурсов с детальной информацией
 	resources = []
 	
-	# Добавляем ресурсы, по которым есть цели
-	for goal in goals:
-		progress = progress_dict.get(goal.resource_type)
+	for goal, progress in result.all():
 		current_amount = progress.current_amount if progress else 0
 		
 		# Вычисляем процент выполнения
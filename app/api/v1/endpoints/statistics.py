@@ -25,6 +25,7 @@ from app.schemas.statistics import (
 	MinecraftKillResponse,
 	MinecraftServerStats,
 	MinecraftTopPlayer,
+	is_valid_uuid,
 )
 from app.services.statistics import process_statistics_batch
 import logging
@@ -79,7 +80,7 @@ async def get_player_profile(
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получает профиль игрока по UUID"""
-	if len(player_uuid) != 36:
+	if not is_valid_uuid(player_uuid):
 		raise HTTPException(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail="Invalid player UUID format"
@@ -246,7 +247,7 @@ async def get_player_sessions(
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получает сессии игрока"""
-	if len(player_uuid) != 36:
+	if not is_valid_uuid(player_uuid):
 		raise HTTPException(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail="Invalid player UUID format"
@@ -395,7 +396,7 @@ async def get_player_kills(
 	db: AsyncSession = Depends(deps.get_db)
 ):
 	"""Получает убийства игрока (где он убийца)"""
-	if len(player_uuid) != 36:
+	if not is_valid_uuid(player_uuid):
 		raise HTTPException(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail="Invalid player UUID format"
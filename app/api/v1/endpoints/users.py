@@ -8,7 +8,7 @@ from app.models.quest import UserQuest
 from app.models.badge import UserBadge, UserBadgeProgress
 from app.models.notification import Notification
 from app.models.activity import Activity
-from app.db.redis import delete_refresh_token, get_cache, set_cache, acquire_lock, release_lock
+from app.db.redis import delete_refresh_token, get_cache, set_cache, delete_cache, acquire_lock, release_lock
 from app.schemas.user import LeaderboardPlayer
 from app.core.progression import award_xp, get_progression_info
 import json
@@ -46,7 +46,7 @@ async def get_balance(
 @router.post("/me/award-xp")
 async def award_xp_to_user(
 	request: AwardXPRequest,
-	current_user: User = Depends(deps.get_current_user),
+	current_user: deps.AuthPrincipal = Depends(deps.get_current_principal),
 	db: AsyncSession = Depends(deps.get_db),
 	_ = Depends(deps.require_debug_mode)
 ):
@@ -73,7 +73,6 @@ async def reset_progression(
 		current_user.xp = 0
 		current_user.level = 1
 		await db.commit()
-		await db.refresh(current_user)
 		
 		progression = get_progression_info(0)
 		return {
@@ -118,6 +117,9 @@ async def delete_current_user(
 	# Delete user from database
 	await db.execute(delete(User).where(User.id == current_user.id))
 	await db.commit()
+	await deps.invalidate_user_roles_cache(current_user.id)
+	if current_user.is_super_admin:
+		await delete_cache(deps.HAS_SUPER_ADMIN_CACHE_KEY)
 	
 	# Clear cookies
 	response.delete_cookie(key="access_token")
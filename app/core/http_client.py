@@ -0,0 +1,26 @@
+from typing import Optional
+import httpx
+
+# Общий клиент для запросов к OAuth провайдерам: пул keep-alive соединений переживает запрос,
+# поэтому TCP+TLS handshake с Twitch/Discord/Steam не повторяется на каждом callback.
+# Простаивающее соединение держим 30 с вместо 5 по умолчанию: логины редкие, с 5 с пул почти всегда пуст
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+	"""Возвращает общий httpx.AsyncClient (создается при первом обращении)"""
+	global _http_client
+	if _http_client is None or _http_client.is_closed:
+		_http_client = httpx.AsyncClient(
+			timeout=httpx.Timeout(10.0, connect=5.0),
+			limits=httpx.Limits(max_keepalive_connections=50, keepalive_expiry=30.0)
+		)
+	return _http_client
+
+
+async def close_http_client() -> None:
+	"""Закрывает общий клиент (при остановке приложения)"""
+	global _http_client
+	if _http_client is not None:
+		await _http_client.aclose()
+		_http_client = None
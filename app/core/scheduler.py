@@ -10,6 +10,7 @@ import logging
 from app.db.session import AsyncSessionLocal
 from app.services.badge_progress import check_periodic_badges
 from app.services.quest_progress import initialize_daily_quests_for_user
+from app.services.statistics_partitions import ensure_monthly_partitions
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -65,6 +66,15 @@ async def initialize_daily_quests_job():
 		logger.error(f"Error in daily quests initialization job: {e}", exc_info=True)
 
 
+async def ensure_statistics_partitions_job():
+	"""Задача для создания партиций статистики на ближайшие месяцы."""
+	try:
+		async with AsyncSessionLocal() as db:
+			await ensure_monthly_partitions(db)
+	except Exception as e:
+		logger.error(f"Error in statistics partitions job: {e}", exc_info=True)
+
+
 def start_scheduler():
 	"""Запускает планировщик задач."""
 	if scheduler.running:
@@ -89,8 +99,17 @@ def start_scheduler():
 		replace_existing=True
 	)
 	
+	# Добавляем задачу создания партиций статистики каждый день в 03:00 (идемпотентна)
+	scheduler.add_job(
+		ensure_statistics_partitions_job,
+		trigger=CronTrigger(hour=3, minute=0),
+		id="ensure_statistics_partitions",
+		name="Ensure statistics partitions",
+		replace_existing=True
+	)
+	
 	scheduler.start()
-	logger.info("Scheduler started with periodic badge check (every hour) and daily quests initialization (daily at 00:00)")
+	logger.info("Scheduler started with periodic badge check (every hour), daily quests initialization (daily at 00:00) and statistics partitions (daily at 03:00)")
 
 
 def shutdown_scheduler():
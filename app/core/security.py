@@ -1,19 +1,29 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Optional, Union
+from jose import jwk, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 import secrets
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+# HMAC key object built once per process and shared by signing (here) and verification (api/deps.py):
+# with a str key python-jose tries json.loads() on it and constructs a new key on every encode/decode
+JWT_KEY = jwk.construct(settings.SECRET_KEY, settings.ALGORITHM)
+
+def roles_to_bits(is_admin: bool, is_super_admin: bool) -> int:
+    """Roles as 2 bits: 1 - is_admin, 2 - is_super_admin (adm claim and roles cache)"""
+    return int(bool(is_admin)) | int(bool(is_super_admin)) << 1
+
+def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None, roles: Optional[int] = None) -> str:
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    if roles is not None:
+        to_encode["adm"] = roles
+    encoded_jwt = jwt.encode(to_encode, JWT_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -1,4 +1,5 @@
 from typing import Optional
+import hashlib
 import redis.asyncio as redis
 from app.core.config import settings
 
@@ -34,6 +35,41 @@ async def delete_refresh_token(token: str) -> None:
     key = f"{settings.REFRESH_TOKEN_REDIS_PREFIX}{token}"
     await client.delete(key)
 
+def refresh_token_lock_key(token: str) -> str:
+    """Lock key for rotating one refresh token. Scoped to the token (not the user), so a user's
+    other devices refresh independently; hashed so the token itself is not written to another key"""
+    return f"token_refresh_lock:{hashlib.sha256(token.encode()).hexdigest()[:24]}"
+
+# KEYS[1] - old token key, KEYS[2] - new token key, ARGV[1] - TTL, ARGV[2] - expected user_id.
+# Old token is consumed only if it still belongs to the user: two concurrent refreshes can't both rotate it
+_ROTATE_REFRESH_TOKEN_LUA = """
+local user_id = redis.call('GET', KEYS[1])
+if user_id ~= ARGV[2] then
+    return 0
+end
+redis.call('SET', KEYS[2], user_id, 'EX', ARGV[1])
+redis.call('DEL', KEYS[1])
+return 1
+"""
+_rotate_refresh_token_script = None
+
+async def rotate_refresh_token(old_token: str, user_id: str, new_token: str, expires_in_seconds: int) -> bool:
+    """Atomically replace refresh token in one round-trip (Lua script via EVALSHA).
+    Returns False if old token was already used or belongs to another user"""
+    global _rotate_refresh_token_script
+    client = await get_redis()
+    if _rotate_refresh_token_script is None:
+        _rotate_refresh_token_script = client.register_script(_ROTATE_REFRESH_TOKEN_LUA)
+    rotated = await _rotate_refresh_token_script(
+        keys=[
+            f"{settings.REFRESH_TOKEN_REDIS_PREFIX}{old_token}",
+            f"{settings.REFRESH_TOKEN_REDIS_PREFIX}{new_token}"
+        ],
+        args=[expires_in_seconds, user_id],
+        client=client
+    )
+    return rotated == 1
+
 async def get_cache(key: str) -> Optional[str]:
     """Get value from cache"""
     try:
@@ -50,14 +86,27 @@ async def set_cache(key: str, value: str, ttl: int) -> None:
     except Exception:
         pass
 
-async def acquire_lock(key: str, timeout: int = 5) -> bool:
-    """Acquire distributed lock. Returns True if lock acquired, False otherwise"""
+async def delete_cache(key: str) -> None:
+    """Delete value from cache"""
+    try:
+        client = await get_redis()
+        await client.delete(key)
+    except Exception:
+        pass
+
+async def try_acquire_lock(key: str, timeout: int = 5) -> Optional[bool]:
+    """Acquire distributed lock. Returns True if lock acquired, False if it is held by someone else,
+    None if Redis is unavailable - for callers that can proceed without the lock"""
     try:
         client = await get_redis()
         result = await client.set(key, "1", nx=True, ex=timeout)
         return result is True
     except Exception:
-        return False
+        return None
+
+async def acquire_lock(key: str, timeout: int = 5) -> bool:
+    """Acquire distributed lock. Returns True if lock acquired, False otherwise"""
+    return await try_acquire_lock(key, timeout) is True
 
 async def release_lock(key: str) -> None:
 	"""Release distributed lock"""
@@ -94,3 +143,17 @@ async def delete_link_code(code: str) -> None:
 		await client.delete(key)
 	except Exception:
 		pass
+
+async def save_oauth_state(state: str, data: str, ttl: int = 600) -> None:
+	"""Save OAuth state payload to Redis with TTL (default 10 minutes)"""
+	client = await get_redis()
+	await client.setex(f"oauth_state:{state}", ttl, data)
+
+async def pop_oauth_state(state: str) -> Optional[str]:
+	"""Get and delete OAuth state payload in one command (one-time use).
+	Returns None if state is unknown, expired or already used"""
+	try:
+		client = await get_redis()
+		return await client.getdel(f"oauth_state:{state}")
+	except Exception:
+		return None
@@ -6,17 +6,22 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.scheduler import start_scheduler, shutdown_scheduler
+from app.core.scheduler import start_scheduler, shutdown_scheduler, ensure_statistics_partitions_job
+from app.core.http_client import close_http_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 	"""Управление жизненным циклом приложения."""
 	# Startup
+	# Партиции статистики проверяем сразу: если задача в 03:00 была пропущена,
+	# новые строки иначе копились бы в DEFAULT партиции до следующего запуска
+	await ensure_statistics_partitions_job()
 	start_scheduler()
 	yield
 	# Shutdown
 	shutdown_scheduler()
+	await close_http_client()
 
 
 app = FastAPI(
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, DateTime, ForeignKey, String, Text, Integer, Index
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM as PG_ENUM
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -9,17 +9,18 @@ class Notification(Base):
 	__tablename__ = "notifications"
 
 	id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-	user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-	notification_type = Column(String, nullable=False)  # "level_up", "achievement_unlocked", "badge_earned"
+	user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+	notification_type = Column(PG_ENUM("level_up", "achievement_unlocked", "badge_earned", name="notification_type", create_type=False), nullable=False)
 	title = Column(String, nullable=False)
 	message = Column(Text, nullable=True)
 	reward_xp = Column(Integer, default=0, nullable=False)
 	reward_balance = Column(Integer, default=0, nullable=False)
 	meta_data = Column(JSONB, nullable=True)
-	created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+	created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 	user = relationship("User", back_populates="notifications")
 
 	__table_args__ = (
 		Index('ix_notifications_user_created', 'user_id', func.desc('created_at')),
+		Index('ix_notifications_created_at_brin', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
 	)
@@ -10,7 +10,7 @@ class ResourceGoal(Base):
 	__tablename__ = "resource_goals"
 
 	id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-	server_id = Column(UUID(as_uuid=True), ForeignKey("game_servers.id"), nullable=False, index=True)
+	server_id = Column(UUID(as_uuid=True), ForeignKey("game_servers.id"), nullable=False)
 	name = Column(String, nullable=False)
 	resource_type = Column(String, nullable=False, index=True)
 	target_amount = Column(Integer, nullable=False)
@@ -26,11 +26,12 @@ class ResourceGoal(Base):
 
 
 class ResourceProgress(Base):
-	"""Текущий прогресс сбора ресурсов по серверам"""
+	"""Текущий прогресс сбора ресурсов по серверам.
+	Привязан к (server_id, resource_type), а не к цели: переживает удаление, пересоздание и правку цели"""
 	__tablename__ = "resource_progress"
 
 	id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-	server_id = Column(UUID(as_uuid=True), ForeignKey("game_servers.id"), nullable=False, index=True)
+	server_id = Column(UUID(as_uuid=True), ForeignKey("game_servers.id"), nullable=False)
 	resource_type = Column(String, nullable=False, index=True)
 	current_amount = Column(Integer, default=0, nullable=False)
 	updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -38,7 +39,7 @@ class ResourceProgress(Base):
 	server = relationship("GameServer", back_populates="resource_progress")
 
 	__table_args__ = (
+		# Уникальный индекс обслуживает и поиск по (server_id, resource_type), и ON CONFLICT при инкременте
 		UniqueConstraint('server_id', 'resource_type', name='uq_resource_progress_server_resource'),
-		Index('ix_resource_progress_server_resource', 'server_id', 'resource_type'),
 	)
 
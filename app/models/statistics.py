@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Text, BigInteger, Double, Boolean
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, BigInteger, Double, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -10,14 +10,14 @@ class MinecraftServer(Base):
 	__tablename__ = "minecraft_servers"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	game_server_id = Column(UUID(as_uuid=True), ForeignKey("game_servers.id"), nullable=False, unique=True, index=True)
-	server_uuid = Column(String(36), nullable=False, unique=True, index=True)  # UUID сервера из игры
+	game_server_id = Column(UUID(as_uuid=True), ForeignKey("game_servers.id"), nullable=False, unique=True)
+	server_uuid = Column(UUID(as_uuid=False), nullable=False, unique=True)  # UUID сервера из игры
 	name = Column(String(100), nullable=False)
 	web_address = Column(String(100), nullable=True)
 	is_installed = Column(Boolean, default=True, nullable=False)
 	is_proxy = Column(Boolean, default=False, nullable=False)
 	max_players = Column(Integer, default=-1, nullable=False)
-	plan_version = Column(String(18), default='Old', nullable=False)
+	plan_version = Column(Text, default='Old', nullable=False)
 
 	game_server = relationship("GameServer", backref="minecraft_server")
 
@@ -27,7 +27,7 @@ class MinecraftUser(Base):
 	__tablename__ = "minecraft_users"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	uuid = Column(String(36), nullable=False, unique=True, index=True)
+	uuid = Column(UUID(as_uuid=False), nullable=False, unique=True)
 	registered = Column(BigInteger, nullable=False)  # timestamp в миллисекундах
 	name = Column(String(36), nullable=False, index=True)
 	times_kicked = Column(Integer, default=0, nullable=False)
@@ -40,7 +40,7 @@ class MinecraftUserInfo(Base):
 	id = Column(Integer, primary_key=True, autoincrement=True)
 	user_id = Column(Integer, ForeignKey("minecraft_users.id"), nullable=False, index=True)
 	server_id = Column(Integer, ForeignKey("minecraft_servers.id"), nullable=False, index=True)
-	join_address = Column(String(191), nullable=True)
+	join_address = Column(Text, nullable=True)
 	registered = Column(BigInteger, nullable=False)  # timestamp в миллисекундах
 	opped = Column(Boolean, default=False, nullable=False)
 	banned = Column(Boolean, default=False, nullable=False)
@@ -67,15 +67,19 @@ class MinecraftSession(Base):
 	server = relationship("MinecraftServer", backref="sessions")
 	join_address_rel = relationship("MinecraftJoinAddress", backref="sessions")
 
+	__table_args__ = (
+		Index('ix_minecraft_sessions_user_server_start', 'user_id', 'server_id', 'session_start'),
+	)
+
 
 class MinecraftNickname(Base):
 	"""История ников игроков"""
 	__tablename__ = "minecraft_nicknames"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	uuid = Column(String(36), nullable=False, index=True)
+	uuid = Column(UUID(as_uuid=False), nullable=False, index=True)
 	nickname = Column(String(75), nullable=False)
-	server_uuid = Column(String(36), nullable=False, index=True)
+	server_uuid = Column(UUID(as_uuid=False), nullable=False, index=True)
 	last_used = Column(BigInteger, nullable=False)  # timestamp в миллисекундах
 
 
@@ -84,24 +88,31 @@ class MinecraftKill(Base):
 	__tablename__ = "minecraft_kills"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	killer_uuid = Column(String(36), nullable=False, index=True)
-	victim_uuid = Column(String(36), nullable=False, index=True)
-	server_uuid = Column(String(36), nullable=False, index=True)
+	killer_uuid = Column(UUID(as_uuid=False), nullable=False, index=True)
+	victim_uuid = Column(UUID(as_uuid=False), nullable=False, index=True)
+	server_uuid = Column(UUID(as_uuid=False), nullable=False)
 	weapon = Column(String(30), nullable=True)
-	date = Column(BigInteger, nullable=False, index=True)  # timestamp в миллисекундах
+	date = Column(BigInteger, primary_key=True, nullable=False)  # timestamp в миллисекундах
 	session_id = Column(Integer, ForeignKey("minecraft_sessions.id"), nullable=True)
 
 	session = relationship("MinecraftSession", backref="kills")
 
+	# Партиционирована по date (помесячно), поэтому date входит в первичный ключ
+	__table_args__ = (
+		Index('ix_minecraft_kills_server_date', 'server_uuid', date.desc()),
+		Index('ix_minecraft_kills_date_brin', 'date', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+		{'postgresql_partition_by': 'RANGE (date)'},
+	)
+
 
 class MinecraftPing(Base):
 	"""Пинг игроков"""
 	__tablename__ = "minecraft_ping"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	user_id = Column(Integer, ForeignKey("minecraft_users.id"), nullable=False, index=True)
-	server_id = Column(Integer, ForeignKey("minecraft_servers.id"), nullable=False, index=True)
-	date = Column(BigInteger, nullable=False, index=True)  # timestamp в миллисекундах
+	user_id = Column(Integer, ForeignKey("minecraft_users.id"), nullable=False)
+	server_id = Column(Integer, ForeignKey("minecraft_servers.id"), nullable=False)
+	date = Column(BigInteger, primary_key=True, nullable=False)  # timestamp в миллисекундах
 	max_ping = Column(Integer, nullable=True)
 	min_ping = Column(Integer, nullable=True)
 	avg_ping = Column(Double, nullable=True)
@@ -109,13 +120,19 @@ class MinecraftPing(Base):
 	user = relationship("MinecraftUser", backref="pings")
 	server = relationship("MinecraftServer", backref="pings")
 
+	# Партиционирована по date (помесячно), поэтому date входит в первичный ключ
+	__table_args__ = (
+		Index('ix_minecraft_ping_user_server_date', 'user_id', 'server_id', date.desc()),
+		{'postgresql_partition_by': 'RANGE (date)'},
+	)
+
 
 class MinecraftPlatform(Base):
 	"""Платформы игроков (Java/Bedrock)"""
 	__tablename__ = "minecraft_platforms"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	uuid = Column(String(36), nullable=False, unique=True, index=True)
+	uuid = Column(UUID(as_uuid=False), nullable=False, unique=True)
 	platform = Column(Integer, nullable=False)  # 0 = Java, 1 = Bedrock
 	bedrock_username = Column(String(32), nullable=True)
 	java_username = Column(String(16), nullable=True)
@@ -142,7 +159,7 @@ class MinecraftTPS(Base):
 	__tablename__ = "minecraft_tps"
 
 	server_id = Column(Integer, ForeignKey("minecraft_servers.id"), primary_key=True, nullable=False)
-	date = Column(BigInteger, primary_key=True, nullable=False, index=True)  # timestamp в миллисекундах
+	date = Column(BigInteger, primary_key=True, nullable=False)  # timestamp в миллисекундах
 	tps = Column(Double, nullable=True)
 	players_online = Column(Integer, nullable=True)
 	cpu_usage = Column(Double, nullable=True)
@@ -153,6 +170,11 @@ class MinecraftTPS(Base):
 
 	server = relationship("MinecraftServer", backref="tps_data")
 
+	__table_args__ = (
+		Index('ix_minecraft_tps_date_brin', 'date', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+		{'postgresql_partition_by': 'RANGE (date)'},
+	)
+
 
 class MinecraftWorld(Base):
 	"""Миры на серверах"""
@@ -160,7 +182,7 @@ class MinecraftWorld(Base):
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
 	world_name = Column(String(100), nullable=False)
-	server_uuid = Column(String(36), nullable=False, index=True)
+	server_uuid = Column(UUID(as_uuid=False), nullable=False, index=True)
 
 
 class MinecraftWorldTime(Base):
@@ -168,9 +190,9 @@ class MinecraftWorldTime(Base):
 	__tablename__ = "minecraft_world_times"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	user_id = Column(Integer, ForeignKey("minecraft_users.id"), nullable=False, index=True)
-	world_id = Column(Integer, ForeignKey("minecraft_worlds.id"), nullable=False, index=True)
-	server_id = Column(Integer, ForeignKey("minecraft_servers.id"), nullable=False, index=True)
+	user_id = Column(Integer, ForeignKey("minecraft_users.id"), nullable=False)
+	world_id = Column(Integer, ForeignKey("minecraft_worlds.id"), nullable=False)
+	server_id = Column(Integer, ForeignKey("minecraft_servers.id"), nullable=False)
 	session_id = Column(Integer, ForeignKey("minecraft_sessions.id"), nullable=True)
 	survival_time = Column(BigInteger, default=0, nullable=False)  # время в миллисекундах
 	creative_time = Column(BigInteger, default=0, nullable=False)
@@ -182,13 +204,17 @@ class MinecraftWorldTime(Base):
 	server = relationship("MinecraftServer", backref="world_times")
 	session = relationship("MinecraftSession", backref="world_times")
 
+	__table_args__ = (
+		Index('ix_minecraft_world_times_user_server_world', 'user_id', 'server_id', 'world_id'),
+	)
+
 
 class MinecraftJoinAddress(Base):
 	"""Адреса подключений"""
 	__tablename__ = "minecraft_join_address"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	join_address = Column(String(191), nullable=False, unique=True, index=True)
+	join_address = Column(Text, nullable=False, unique=True)
 
 
 class MinecraftVersionProtocol(Base):
@@ -196,7 +222,7 @@ class MinecraftVersionProtocol(Base):
 	__tablename__ = "minecraft_version_protocol"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	uuid = Column(String(36), nullable=False, unique=True, index=True)
+	uuid = Column(UUID(as_uuid=False), nullable=False, unique=True)
 	protocol_version = Column(Integer, nullable=False)
 
 
@@ -217,7 +243,7 @@ class MinecraftSettings(Base):
 	__tablename__ = "minecraft_settings"
 
 	id = Column(Integer, primary_key=True, autoincrement=True)
-	server_uuid = Column(String(39), nullable=False, unique=True, index=True)
+	server_uuid = Column(String(39), nullable=False, unique=True)
 	updated = Column(BigInteger, nullable=False)
 	content = Column(Text, nullable=True)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, UniqueConstraint, BigInteger
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, UniqueConstraint, BigInteger, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -30,11 +30,23 @@ class User(Base):
 	user_counters = relationship("UserCounter", back_populates="user", cascade="all, delete-orphan")
 	selected_badge_id = Column(UUID(as_uuid=True), ForeignKey("badges.id"), nullable=True)
 
+	__table_args__ = (
+		# Частичный индекс только по super admin: проверка существования без скана users
+		Index('ix_users_is_super_admin', 'id', postgresql_where=text('is_super_admin')),
+		# Список админов (/admin/list): порядок по created_at из индекса, колонки ответа в INCLUDE - index-only scan
+		Index(
+			'ix_users_admins_created',
+			'created_at',
+			postgresql_where=text('is_admin OR is_super_admin'),
+			postgresql_include=['id', 'email', 'username', 'is_admin', 'is_super_admin']
+		),
+	)
+
 class OAuthAccount(Base):
 	__tablename__ = "oauth_accounts"
 
 	id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-	user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+	user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
 	provider = Column(String, nullable=False)  # twitch, discord, steam
 	provider_account_id = Column(String, nullable=False)
 	provider_username = Column(String, nullable=True)  # username from provider
@@ -46,6 +58,10 @@ class OAuthAccount(Base):
 
 	user = relationship("User", back_populates="oauth_accounts")
 
+	__table_args__ = (
+		UniqueConstraint('provider', 'provider_account_id', name='uq_oauth_accounts_provider_account'),
+	)
+
 class ExternalLink(Base):
 	__tablename__ = "external_links"
 
@@ -59,7 +75,11 @@ class ExternalLink(Base):
 	user = relationship("User", back_populates="external_links")
 
 	__table_args__ = (
-		UniqueConstraint('platform', 'external_id', name='uq_platform_external_id'),
+		UniqueConstraint(
+			'platform', 'external_id',
+			name='uq_platform_external_id',
+			postgresql_include=['user_id', 'platform_username']
+		),
 	)
 
 class UserCounter(Base):
@@ -1,12 +1,35 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Dict
+from pydantic import BaseModel, Field, AfterValidator
+from typing import Optional, List, Dict, Annotated
+from uuid import UUID
+
+
+def is_valid_uuid(value: str) -> bool:
+	"""Проверяет, что строка - UUID в формате из игры (8-4-4-4-12, 36 символов)"""
+	if len(value) != 36:
+		return False
+	try:
+		# UUID() принимает и фигурные скобки, и дефисы в любом месте - сверяем с каноническим видом
+		return str(UUID(value)) == value.lower()
+	except ValueError:
+		return False
+
+
+def validate_game_uuid(value: str) -> str:
+	if not is_valid_uuid(value):
+		raise ValueError("must be a UUID in 8-4-4-4-12 format")
+	return value
+
+
+# UUID из игры: колонки в БД нативного типа uuid, поэтому неверное значение отклоняется
+# здесь (422), а не ошибкой БД посреди batch-транзакции
+GameUUID = Annotated[str, Field(max_length=36), AfterValidator(validate_game_uuid)]
 
 
 # ========== Batch запросы от игровых серверов ==========
 
 class MinecraftServerData(BaseModel):
 	"""Данные сервера для batch запроса"""
-	server_uuid: str = Field(..., max_length=36, description="UUID сервера из игры")
+	server_uuid: GameUUID = Field(..., description="UUID сервера из игры")
 	name: str = Field(..., max_length=100)
 	web_address: Optional[str] = Field(None, max_length=100)
 	is_installed: bool = True
@@ -17,7 +40,7 @@ class MinecraftServerData(BaseModel):
 
 class MinecraftUserData(BaseModel):
 	"""Данные игрока для batch запроса"""
-	uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
 	registered: int = Field(..., description="Timestamp в миллисекундах")
 	name: str = Field(..., max_length=36)
 	times_kicked: int = 0
@@ -25,8 +48,8 @@ class MinecraftUserData(BaseModel):
 
 class MinecraftUserInfoData(BaseModel):
 	"""Информация об игроке на сервере"""
-	uuid: str = Field(..., max_length=36)
-	server_uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
+	server_uuid: GameUUID
 	join_address: Optional[str] = Field(None, max_length=191)
 	registered: int = Field(..., description="Timestamp в миллисекундах")
 	opped: bool = False
@@ -35,8 +58,8 @@ class MinecraftUserInfoData(BaseModel):
 
 class MinecraftSessionData(BaseModel):
 	"""Данные игровой сессии"""
-	uuid: str = Field(..., max_length=36)
-	server_uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
+	server_uuid: GameUUID
 	session_start: int = Field(..., description="Timestamp в миллисекундах")
 	session_end: Optional[int] = Field(None, description="Timestamp в миллисекундах")
 	mob_kills: Optional[int] = None
@@ -47,17 +70,17 @@ class MinecraftSessionData(BaseModel):
 
 class MinecraftNicknameData(BaseModel):
 	"""Данные ника"""
-	uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
 	nickname: str = Field(..., max_length=75)
-	server_uuid: str = Field(..., max_length=36)
+	server_uuid: GameUUID
 	last_used: int = Field(..., description="Timestamp в миллисекундах")
 
 
 class MinecraftKillData(BaseModel):
 	"""Данные убийства"""
-	killer_uuid: str = Field(..., max_length=36)
-	victim_uuid: str = Field(..., max_length=36)
-	server_uuid: str = Field(..., max_length=36)
+	killer_uuid: GameUUID
+	victim_uuid: GameUUID
+	server_uuid: GameUUID
 	weapon: Optional[str] = Field(None, max_length=30)
 	date: int = Field(..., description="Timestamp в миллисекундах")
 	session_id: Optional[int] = None
@@ -65,8 +88,8 @@ class MinecraftKillData(BaseModel):
 
 class MinecraftPingData(BaseModel):
 	"""Данные пинга"""
-	uuid: str = Field(..., max_length=36)
-	server_uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
+	server_uuid: GameUUID
 	date: int = Field(..., description="Timestamp в миллисекундах")
 	max_ping: Optional[int] = None
 	min_ping: Optional[int] = None
@@ -75,7 +98,7 @@ class MinecraftPingData(BaseModel):
 
 class MinecraftPlatformData(BaseModel):
 	"""Данные платформы игрока"""
-	uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
 	platform: int = Field(..., description="0 = Java, 1 = Bedrock")
 	bedrock_username: Optional[str] = Field(None, max_length=32)
 	java_username: Optional[str] = Field(None, max_length=16)
@@ -86,7 +109,7 @@ class MinecraftPlatformData(BaseModel):
 
 class MinecraftPluginVersionData(BaseModel):
 	"""Данные версии плагина"""
-	server_uuid: str = Field(..., max_length=36)
+	server_uuid: GameUUID
 	plugin_name: str = Field(..., max_length=100)
 	version: Optional[str] = Field(None, max_length=255)
 	modified: int = Field(default=0, description="Timestamp в миллисекундах")
@@ -94,7 +117,7 @@ class MinecraftPluginVersionData(BaseModel):
 
 class MinecraftTPSData(BaseModel):
 	"""Данные производительности сервера"""
-	server_uuid: str = Field(..., max_length=36)
+	server_uuid: GameUUID
 	date: int = Field(..., description="Timestamp в миллисекундах")
 	tps: Optional[float] = None
 	players_online: Optional[int] = None
@@ -107,15 +130,15 @@ class MinecraftTPSData(BaseModel):
 
 class MinecraftWorldData(BaseModel):
 	"""Данные мира"""
-	server_uuid: str = Field(..., max_length=36)
+	server_uuid: GameUUID
 	world_name: str = Field(..., max_length=100)
 
 
 class MinecraftWorldTimeData(BaseModel):
 	"""Данные времени в мире"""
-	uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
 	world_id: int
-	server_uuid: str = Field(..., max_length=36)
+	server_uuid: GameUUID
 	session_id: Optional[int] = None
 	survival_time: int = Field(default=0, description="Время в миллисекундах")
 	creative_time: int = Field(default=0, description="Время в миллисекундах")
@@ -125,13 +148,13 @@ class MinecraftWorldTimeData(BaseModel):
 
 class MinecraftVersionProtocolData(BaseModel):
 	"""Данные версии протокола"""
-	uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
 	protocol_version: int
 
 
 class MinecraftGeolocationData(BaseModel):
 	"""Данные геолокации"""
-	uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
 	geolocation: Optional[str] = Field(None, max_length=50)
 	last_used: int = Field(default=0, description="Timestamp в миллисекундах")
 
@@ -142,15 +165,15 @@ class MinecraftPlayerCountersData(BaseModel):
 	Гибкая структура: в моде можно добавлять любые ключи счетчиков.
 	Примеры ключей: blocks_traveled, messages_sent, blocks_broken, items_crafted и т.д.
 	"""
-	uuid: str = Field(..., max_length=36)
-	server_uuid: str = Field(..., max_length=36)
+	uuid: GameUUID
+	server_uuid: GameUUID
 	counters: Dict[str, int] = Field(default_factory=dict, description="Словарь счетчиков: ключ -> значение (инкремент)")
 	# Пример: {"blocks_traveled": 1000, "messages_sent": 50, "blocks_broken": 200}
 
 
 class MinecraftStatisticsBatch(BaseModel):
 	"""Batch запрос статистики от игрового сервера"""
-	server_uuid: str = Field(..., max_length=36, description="UUID сервера для идентификации")
+	server_uuid: GameUUID = Field(..., description="UUID сервера для идентификации")
 	
 	# Опциональные массивы данных
 	servers: Optional[List[MinecraftServerData]] = None
@@ -169,13 +192,6 @@ class MinecraftStatisticsBatch(BaseModel):
 	geolocations: Optional[List[MinecraftGeolocationData]] = None
 	counters: Optional[List[MinecraftPlayerCountersData]] = None
 
-	@field_validator('server_uuid')
-	@classmethod
-	def validate_server_uuid(cls, v: str) -> str:
-		if len(v) != 36:
-			raise ValueError("server_uuid must be 36 characters long")
-		return v
-
 
 # ========== API ответы для фронта ==========
 
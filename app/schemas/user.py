@@ -1,8 +1,11 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, PlainSerializer
+from typing import Optional, Annotated
 from uuid import UUID
 from datetime import datetime
 
+# In JSON created_at keeps the datetime.isoformat() form ("+00:00" rather than pydantic's "Z")
+IsoDatetime = Annotated[datetime, PlainSerializer(datetime.isoformat, return_type=str, when_used="json")]
+
 class UserBase(BaseModel):
     email: Optional[EmailStr] = None
     username: Optional[str] = None
@@ -51,6 +54,34 @@ class OAuthAccount(OAuthAccountBase):
     class Config:
         from_attributes = True
 
+class CurrentUserResponse(BaseModel):
+    """Schema for GET /auth/me - built straight from the User model"""
+    id: UUID
+    email: Optional[str] = None
+    username: Optional[str] = None
+    avatar: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_admin: bool
+    is_super_admin: bool
+    selected_badge_id: Optional[UUID] = None
+    created_at: IsoDatetime
+
+    class Config:
+        from_attributes = True
+
+class UpdatedUserResponse(BaseModel):
+    """Schema for PATCH /auth/me and avatar upload - same fields as CurrentUserResponse, without roles"""
+    id: UUID
+    email: Optional[str] = None
+    username: Optional[str] = None
+    avatar: Optional[str] = None
+    is_active: Optional[bool] = None
+    selected_badge_id: Optional[UUID] = None
+    created_at: IsoDatetime
+
+    class Config:
+        from_attributes = True
+
 class OAuthAccountPublic(BaseModel):
     """Public schema for OAuth account - safe to return to client"""
     provider: str
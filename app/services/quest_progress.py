@@ -13,6 +13,7 @@ import logging
 from app.models.quest import Quest, UserQuest, QuestType
 from app.models.user import OAuthAccount, ExternalLink
 from app.models.statistics import MinecraftSession, MinecraftUser
+from app.schemas.statistics import is_valid_uuid
 from app.core.progression import award_xp
 from app.core.currency import add_currency
 from app.services.user_counters import get_counter
@@ -461,7 +462,9 @@ async def check_initial_quest_conditions(
 				)
 				external_link = external_link_result.scalar_one_or_none()
 				
-				if external_link:
+				# external_id приходит из запроса привязки без проверки формата, а колонка uuid нативная:
+				# строку не-UUID Postgres не сравнит, а отклонит запрос
+				if external_link and is_valid_uuid(external_link.external_id):
 					# Получаем MinecraftUser по UUID
 					mc_user_result = await db.execute(
 						select(MinecraftUser).where(MinecraftUser.uuid == external_link.external_id)
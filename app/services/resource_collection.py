@@ -1,19 +1,26 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func, literal
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
 from typing import Tuple, Optional
 import logging
+import uuid
 
 from app.models.game_server import GameServer
-from app.models.resource_collection import ResourceProgress, ResourceGoal
+from app.models.resource_collection import ResourceGoal, ResourceProgress
 from app.models.statistics import MinecraftServer as MinecraftServerModel
 from app.schemas.resource_collection import ResourceCollectionRequest
+from app.schemas.statistics import is_valid_uuid
 
 logger = logging.getLogger(__name__)
 
 
 async def validate_server_uuid(db: AsyncSession, server_uuid: str) -> Optional[GameServer]:
 	"""Валидирует server_uuid и возвращает GameServer если найден"""
+	# Обе колонки - нативный UUID: строку другого формата Postgres отклонит ошибкой, а не "не найдено"
+	if not is_valid_uuid(server_uuid):
+		return None
+	
 	# Проверяем наличие minecraft_server с таким server_uuid
 	result = await db.execute(
 		select(MinecraftServerModel)
@@ -57,57 +64,57 @@ async def process_resource_collection(
 		if not game_server:
 			return False, 0, f"Server with UUID {request.server_uuid} not found"
 		
-		# Проверяем наличие активной цели для этого ресурса
-		result = await db.execute(
-			select(ResourceGoal).where(
+		# Один атомарный upsert вместо SELECT цели, SELECT прогресса и read-modify-write:
+		# строка для вставки берется из активной цели, без цели ничего не вставляется.
+		# Прогресс по-прежнему привязан к (server_id, resource_type), а не к самой цели
+		active_goal = (
+			select(
+				literal(uuid.uuid4(), ResourceProgress.id.type),
+				ResourceGoal.server_id,
+				ResourceGoal.resource_type,
+				literal(request.amount)
+			)
+			.where(
 				and_(
 					ResourceGoal.server_id == game_server.id,
 					ResourceGoal.resource_type == request.resource_type,
 					ResourceGoal.is_active.is_(True)
 				)
 			)
+			.limit(1)
+		)
+		insert_stmt = insert(ResourceProgress).from_select(
+			["id", "server_id", "resource_type", "current_amount"],
+			active_goal
 		)
-		goal = result.scalar_one_or_none()
-		
-		if not goal:
-			# Если нет активной цели, игнорируем обновление, но не возвращаем ошибку
-			# (мод может слать всё подряд)
-			return True, 0, None
-
-		# Получаем или создаем запись прогресса
 		result = await db.execute(
-			select(ResourceProgress).where(
-				and_(
-					ResourceProgress.server_id == game_server.id,
-					ResourceProgress.resource_type == request.resource_type
-				)
+			insert_stmt.on_conflict_do_update(
+				constraint="uq_resource_progress_server_resource",
+				set_={
+					"current_amount": ResourceProgress.current_amount + insert_stmt.excluded.current_amount,
+					"updated_at": func.now()
+				}
 			)
+			.returning(ResourceProgress.current_amount)
 		)
-		progress = result.scalar_one_or_none()
+		current_amount = result.scalar_one_or_none()
 		
-		if progress:
-			# Обновляем существующий прогресс (инкремент)
-			progress.current_amount += request.amount
-		else:
-			# Создаем новую запись прогресса
-			progress = ResourceProgress(
-				server_id=game_server.id,
-				resource_type=request.resource_type,
-				current_amount=request.amount
-			)
-			db.add(progress)
+		if current_amount is None:
+			# Если нет активной цели, игнорируем обновление, но не возвращаем ошибку
+			# (мод может слать всё подряд)
+			await db.rollback()
+			return True, 0, None
 		
 		await db.commit()
-		await db.refresh(progress)
 		
 		logger.info(
 			f"Resource collection updated: server_id={game_server.id}, "
 			f"resource_type={request.resource_type}, "
 			f"amount={request.amount}, "
-			f"current_amount={progress.current_amount}"
+			f"current_amount={current_amount}"
 		)
 		
-		return True, progress.current_amount, None
+		return True, current_amount, None
 		
 	except Exception as e:
 		await db.rollback()
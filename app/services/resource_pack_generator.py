@@ -84,9 +84,9 @@ async def generate_resource_pack(
 				badge.unicode_char = generate_unicode_char(index)
 				badges_to_update.append(badge)
 		
-		# Сохраняем обновления одним коммитом
-		if badges_to_update:
-			await db.commit()
+		# Сохраняем обновления одним коммитом. Коммит нужен и без изменений: он завершает транзакцию
+		# чтения, и соединение возвращается в пул на время скачивания картинок
+		await db.commit()
 		
 		# Создаем структуру директорий
 		font_providers = []
@@ -0,0 +1,104 @@
+"""
+Сервис для обслуживания партиций time-series таблиц Minecraft статистики.
+
+minecraft_tps, minecraft_ping и minecraft_kills партиционированы по RANGE (date),
+где date - timestamp в миллисекундах. Партиции помесячные: <table>_pYYYYMM.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("minecraft_tps", "minecraft_ping", "minecraft_kills")
+
+
+def month_start_ms(year: int, month: int) -> int:
+	"""Начало месяца (UTC) в миллисекундах."""
+	return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def next_month(year: int, month: int) -> tuple[int, int]:
+	"""Следующий месяц как (год, месяц)."""
+	return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+async def _create_month_partition(db: AsyncSession, table: str, year: int, month: int) -> bool:
+	"""
+	Создает партицию table за месяц, если её еще нет. Возвращает True, если партиция создана.
+
+	Строки этого месяца, успевшие попасть в DEFAULT партицию, переносятся в новую:
+	PostgreSQL не создаст партицию, пока DEFAULT содержит строки из её диапазона.
+	Вызывающий коммитит или откатывает транзакцию целиком.
+	"""
+	partition = f"{table}_p{year}{month:02d}"
+	default_partition = f"{table}_p_default"
+	upper_year, upper_month = next_month(year, month)
+	lower, upper = month_start_ms(year, month), month_start_ms(upper_year, upper_month)
+	bounds = f"FOR VALUES FROM ({lower}) TO ({upper})"
+
+	result = await db.execute(
+		text("SELECT to_regclass(:partition) IS NOT NULL, to_regclass(:default_partition) IS NOT NULL"),
+		{"partition": partition, "default_partition": default_partition}
+	)
+	partition_exists, default_exists = result.one()
+	if partition_exists:
+		return False
+
+	has_default_rows = False
+	if default_exists:
+		result = await db.execute(text(
+			f"SELECT EXISTS (SELECT 1 FROM {default_partition} WHERE date >= {lower} AND date < {upper})"
+		))
+		has_default_rows = result.scalar()
+
+	if not has_default_rows:
+		await db.execute(text(f"CREATE TABLE {partition} PARTITION OF {table} {bounds}"))
+		return True
+
+	# DEFAULT отсоединяется на время переноса, после чего подключается обратно (одна транзакция)
+	await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default_partition}"))
+	await db.execute(text(f"CREATE TABLE {partition} PARTITION OF {table} {bounds}"))
+	result = await db.execute(text(
+		f"WITH moved AS (DELETE FROM {default_partition} WHERE date >= {lower} AND date < {upper} RETURNING *) "
+		f"INSERT INTO {partition} SELECT * FROM moved"
+	))
+	await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default_partition} DEFAULT"))
+	logger.warning(f"Moved {result.rowcount} rows from {default_partition} to {partition}")
+	return True
+
+
+async def ensure_monthly_partitions(db: AsyncSession, months_ahead: int = 2) -> None:
+	"""
+	Создает помесячные партиции на текущий и months_ahead следующих месяцев.
+
+	Партиции создаются заранее, чтобы новые строки не попадали в DEFAULT партицию;
+	если строки туда все же попали (задача не запускалась), они переносятся в новую партицию.
+	Каждая пара (таблица, месяц) - отдельная транзакция: ошибка в одной не мешает остальным.
+
+	Args:
+		db: Асинхронная сессия базы данных
+		months_ahead: На сколько месяцев вперед создавать партиции
+	"""
+	now = datetime.now(timezone.utc)
+	year, month = now.year, now.month
+	created = 0
+	failed = 0
+
+	for _ in range(months_ahead + 1):
+		for table in PARTITIONED_TABLES:
+			try:
+				if await _create_month_partition(db, table, year, month):
+					created += 1
+				await db.commit()
+			except Exception as e:
+				await db.rollback()
+				failed += 1
+				logger.error(f"Failed to create partition {table}_p{year}{month:02d}: {e}", exc_info=True)
+		year, month = next_month(year, month)
+
+	if failed:
+		logger.error(f"Statistics partitions: {created} created, {failed} failed")
+	else:
+		logger.info(f"Statistics partitions ensured for {months_ahead + 1} months ({created} created)")
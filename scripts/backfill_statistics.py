@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Скрипт для массовой загрузки статистики Minecraft из CSV (например, экспорт plan.db).
+
+Данные сначала копируются (COPY) в UNLOGGED staging-таблицу - запись в неё не идёт в WAL,
+затем одним INSERT ... SELECT переносятся в основную (логируемую) таблицу.
+ALTER TABLE ... SET UNLOGGED на самих таблицах не используется: он переписывает таблицу
+целиком и недоступен для партиционированных minecraft_tps/minecraft_ping/minecraft_kills.
+
+Использование:
+	python scripts/backfill_statistics.py minecraft_kills kills.csv
+
+Первая строка CSV - заголовок с именами колонок (id можно не указывать).
+"""
+import asyncio
+import csv
+import sys
+from pathlib import Path
+
+import asyncpg
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import settings  # noqa: E402
+
+BACKFILL_TABLES = (
+	"minecraft_sessions",
+	"minecraft_kills",
+	"minecraft_ping",
+	"minecraft_tps",
+)
+
+
+async def backfill(table: str, csv_path: Path) -> int:
+	"""Загружает CSV в таблицу через UNLOGGED staging. Возвращает число перенесенных строк."""
+	if table not in BACKFILL_TABLES:
+		raise ValueError(f"Unsupported table: {table}")
+
+	with csv_path.open(newline="") as f:
+		columns = next(csv.reader(f))
+
+	staging = f"{table}_staging"
+	column_list = ", ".join(columns)
+	dsn = settings.SQLALCHEMY_DATABASE_URI.replace("postgresql+asyncpg://", "postgresql://", 1)
+	conn = await asyncpg.connect(dsn)
+
+	try:
+		await conn.execute(f"DROP TABLE IF EXISTS {staging}")
+		# Без индексов и ограничений: только колонки и DEFAULT (id из последовательности основной таблицы)
+		await conn.execute(f"CREATE UNLOGGED TABLE {staging} (LIKE {table} INCLUDING DEFAULTS)")
+		await conn.copy_to_table(
+			staging,
+			source=csv_path,
+			columns=columns,
+			format="csv",
+			header=True
+		)
+
+		async with conn.transaction():
+			result = await conn.execute(
+				f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} ON CONFLICT DO NOTHING"
+			)
+		return int(result.split()[-1])
+	finally:
+		try:
+			await conn.execute(f"DROP TABLE IF EXISTS {staging}")
+		except asyncpg.PostgresError as e:
+			# Не подменяем исходную ошибку, но и не молчим: staging-таблицу придется удалить вручную
+			print(f"Не удалось удалить {staging}: {e}", file=sys.stderr)
+		finally:
+			await conn.close()
+
+
+if __name__ == "__main__":
+	if len(sys.argv) != 3:
+		print(f"Использование: {sys.argv[0]} <таблица> <файл.csv>", file=sys.stderr)
+		sys.exit(1)
+
+	try:
+		inserted = asyncio.run(backfill(sys.argv[1], Path(sys.argv[2])))
+		print(f"Загружено строк: {inserted}")
+	except (ValueError, OSError, asyncpg.PostgresError) as e:
+		print(f"Ошибка при загрузке статистики: {e}", file=sys.stderr)
+		sys.exit(1)
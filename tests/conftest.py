@@ -0,0 +1,44 @@
+import fakeredis.aioredis
+import pytest
+
+import app.main  # noqa: F401 - registers every model before mappers are configured
+import app.db.redis as redis_module
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+	"""In-memory Redis in place of the shared client (fakeredis runs the Lua scripts too)"""
+	client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+	monkeypatch.setattr(redis_module, "_redis_client", client)
+	return client
+
+
+class FakeResult:
+	def __init__(self, row):
+		self.row = row
+
+	def scalars(self):
+		return self
+
+	def first(self):
+		return self.row
+
+
+class FakeSession:
+	"""AsyncSession stand-in: every execute() returns `row` and is counted"""
+
+	def __init__(self, row=None):
+		self.row = row
+		self.queries = 0
+
+	async def execute(self, statement):
+		self.queries += 1
+		return FakeResult(self.row)
+
+	async def commit(self):
+		pass
+
+
+@pytest.fixture
+def fake_session():
+	return FakeSession()
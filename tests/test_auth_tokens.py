@@ -0,0 +1,182 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.main import app
+from app.api import deps
+from app.api.v1.endpoints import auth
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token, roles_to_bits
+from app.db.redis import rotate_refresh_token, save_refresh_token, get_refresh_token, refresh_token_lock_key
+from app.models.user import User
+
+REFRESH_TTL = 3600
+
+
+def refresh_request(refresh_token: str) -> Request:
+	"""Request carrying only a refresh token cookie (the access token has expired)"""
+	return Request({
+		"type": "http",
+		"method": "GET",
+		"path": "/",
+		"query_string": b"",
+		"headers": [(b"cookie", f"refresh_token={refresh_token}".encode())],
+	})
+
+
+@pytest.fixture
+def slow_oauth_refresh(monkeypatch):
+	"""Keep the rotating request inside its lock long enough for a concurrent one to arrive.
+	Returns the list of users it was called for"""
+	calls = []
+
+	async def refresh_oauth_token_if_needed(user, db):
+		calls.append(user)
+		await asyncio.sleep(0.05)
+		return None, False
+	monkeypatch.setattr(auth, "refresh_oauth_token_if_needed", refresh_oauth_token_if_needed)
+	return calls
+
+
+async def test_rotate_refresh_token_only_once(fake_redis):
+	"""Test that concurrent rotations of one refresh token let exactly one caller through"""
+	user_id = str(uuid.uuid4())
+	old_token = create_refresh_token()
+	await save_refresh_token(user_id, old_token, REFRESH_TTL)
+
+	new_tokens = [create_refresh_token() for _ in range(5)]
+	results = await asyncio.gather(*(
+		rotate_refresh_token(old_token, user_id, new_token, REFRESH_TTL) for new_token in new_tokens
+	))
+
+	assert results.count(True) == 1
+	assert await get_refresh_token(old_token) is None
+	winner = new_tokens[results.index(True)]
+	assert await get_refresh_token(winner) == user_id
+	assert await fake_redis.ttl(f"{settings.REFRESH_TOKEN_REDIS_PREFIX}{winner}") == REFRESH_TTL
+	for new_token in new_tokens:
+		if new_token != winner:
+			assert await get_refresh_token(new_token) is None
+
+
+async def test_rotate_refresh_token_rejects_other_user(fake_redis):
+	"""Test that a token is not rotated for a user it doesn't belong to"""
+	old_token = create_refresh_token()
+	await save_refresh_token("owner", old_token, REFRESH_TTL)
+
+	assert not await rotate_refresh_token(old_token, "someone-else", create_refresh_token(), REFRESH_TTL)
+	assert await get_refresh_token(old_token) == "owner"
+
+
+def test_refresh_token_lock_key_is_per_token():
+	"""Test that lock keys differ per token and don't contain the token itself"""
+	token = create_refresh_token()
+	assert refresh_token_lock_key(token) == refresh_token_lock_key(token)
+	assert refresh_token_lock_key(token) != refresh_token_lock_key(create_refresh_token())
+	assert token not in refresh_token_lock_key(token)
+
+
+async def test_concurrent_refresh_with_same_token_rotates_once(fake_redis, fake_session, slow_oauth_refresh):
+	"""Test that two requests racing with one refresh token produce one rotation and one 401"""
+	user = User(id=uuid.uuid4(), is_admin=False, is_super_admin=False)
+	fake_session.row = user
+	refresh_token = create_refresh_token()
+	await save_refresh_token(str(user.id), refresh_token, REFRESH_TTL)
+
+	requests = [refresh_request(refresh_token), refresh_request(refresh_token)]
+	results = await asyncio.gather(
+		*(deps.get_authenticated_user_id(request, db=fake_session, token=None) for request in requests),
+		return_exceptions=True
+	)
+
+	rotated = [result for result in results if not isinstance(result, BaseException)]
+	rejected = [result for result in results if isinstance(result, HTTPException)]
+	assert len(rotated) == 1 and len(rejected) == 1
+	assert rejected[0].status_code == 401
+	assert rotated[0][:2] == (str(user.id), user)
+	# The request that lost the lock never reached the OAuth refresh
+	assert slow_oauth_refresh == [user]
+
+	new_tokens = [request.state.new_tokens for request in requests if hasattr(request.state, "new_tokens")]
+	assert len(new_tokens) == 1
+	assert await get_refresh_token(refresh_token) is None
+	assert await get_refresh_token(new_tokens[0]["refresh_token"]) == str(user.id)
+	# The lock is released once the rotation is done
+	assert not await fake_redis.exists(refresh_token_lock_key(refresh_token))
+
+
+async def test_refresh_lock_does_not_block_other_devices(fake_redis, fake_session, slow_oauth_refresh):
+	"""Test that two refresh tokens of one user (two devices) rotate concurrently"""
+	user = User(id=uuid.uuid4(), is_admin=False, is_super_admin=False)
+	fake_session.row = user
+	refresh_tokens = [create_refresh_token(), create_refresh_token()]
+	for refresh_token in refresh_tokens:
+		await save_refresh_token(str(user.id), refresh_token, REFRESH_TTL)
+
+	results = await asyncio.gather(*(
+		deps.get_authenticated_user_id(refresh_request(refresh_token), db=fake_session, token=None)
+		for refresh_token in refresh_tokens
+	))
+
+	assert [result[0] for result in results] == [str(user.id), str(user.id)]
+	for refresh_token in refresh_tokens:
+		assert await get_refresh_token(refresh_token) is None
+
+
+async def test_principal_adm_claim_is_stale_after_demotion(fake_redis, fake_session):
+	"""Test that get_current_principal trusts the adm claim while get_verified_principal sees the demotion"""
+	user_id = uuid.uuid4()
+	admin_claim = roles_to_bits(True, False)
+	# Roles cached while the user was still an admin
+	await fake_redis.set(f"{deps.USER_ROLES_CACHE_PREFIX}{user_id}", str(admin_claim))
+
+	# Demotion: the row changes and the cached roles are dropped
+	fake_session.row = (user_id, False, False)
+	await deps.invalidate_user_roles_cache(user_id)
+
+	auth_result = (str(user_id), None, admin_claim)
+	principal = await deps.get_current_principal(db=fake_session, auth=auth_result)
+	assert principal.is_admin
+	assert fake_session.queries == 0
+
+	verified = await deps.get_verified_principal(db=fake_session, auth=auth_result)
+	assert verified.id == user_id
+	assert not verified.is_admin and not verified.is_super_admin
+	assert fake_session.queries == 1
+	assert await fake_redis.get(f"{deps.USER_ROLES_CACHE_PREFIX}{user_id}") == "0"
+
+
+async def test_principal_without_adm_claim_loads_roles(fake_redis, fake_session):
+	"""Test that tokens issued without the adm claim fall back to the roles cache/Postgres"""
+	user_id = uuid.uuid4()
+	fake_session.row = (user_id, True, True)
+
+	principal = await deps.get_current_principal(db=fake_session, auth=(str(user_id), None, None))
+	assert principal.is_admin and principal.is_super_admin
+	assert fake_session.queries == 1
+
+	await deps.get_current_principal(db=fake_session, auth=(str(user_id), None, None))
+	assert fake_session.queries == 1
+
+
+async def test_admin_endpoint_rejects_stale_admin_claim(fake_redis, fake_session):
+	"""Test that a demoted admin is refused by role-checked endpoints while their token still says admin"""
+	user_id = uuid.uuid4()
+	access_token = create_access_token(subject=user_id, roles=roles_to_bits(True, False))
+	fake_session.row = (user_id, False, False)
+
+	async def get_db():
+		yield fake_session
+
+	app.dependency_overrides[deps.get_db] = get_db
+	try:
+		async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+			response = await client.get("/api/v1/admin/list", cookies={"access_token": access_token})
+	finally:
+		app.dependency_overrides.clear()
+
+	assert response.status_code == 403
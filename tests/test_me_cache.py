@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.main import app
+from app.api import deps
+from app.api.v1.endpoints.auth import etag_matches
+from app.models.user import User
+
+ME_URL = "/api/v1/auth/me"
+
+
+@pytest.fixture
+def user():
+	return User(
+		id=uuid.uuid4(),
+		email="steve@example.com",
+		username="steve",
+		is_active=True,
+		is_admin=False,
+		is_super_admin=False,
+		created_at=datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+	)
+
+
+@pytest.fixture
+async def me_client(fake_redis, fake_session, user):
+	"""Client authenticated as `user`, whose row is served by fake_session"""
+	fake_session.row = user
+
+	async def get_db():
+		yield fake_session
+
+	app.dependency_overrides[deps.get_db] = get_db
+	app.dependency_overrides[deps.get_authenticated_user_id] = lambda: (str(user.id), None, 0)
+	try:
+		async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+			yield client
+	finally:
+		app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+	(None, False),
+	("", False),
+	('"abc"', True),
+	('W/"abc"', True),
+	('"old", W/"abc"', True),
+	('"old","abc"', True),
+	("*", True),
+	(" * ", True),
+	('"abcd"', False),
+	("abc", False),
+	('"old"', False),
+])
+def test_etag_matches(if_none_match, matches):
+	"""Test If-None-Match parsing: weak validators, lists and "*" (RFC 9110)"""
+	assert etag_matches(if_none_match, '"abc"') is matches
+
+
+async def test_me_body_is_cached(me_client, fake_session, user):
+	"""Test that repeated GET /me is served from Redis without querying users"""
+	first = await me_client.get(ME_URL)
+	assert first.status_code == 200
+	assert first.json()["id"] == str(user.id)
+	assert first.json()["created_at"] == "2025-01-02T03:04:05+00:00"
+	assert first.headers["cache-control"] == "private, no-cache"
+	assert fake_session.queries == 1
+
+	second = await me_client.get(ME_URL)
+	assert second.status_code == 200
+	assert second.text == first.text
+	assert second.headers["etag"] == first.headers["etag"]
+	assert fake_session.queries == 1
+
+
+@pytest.mark.parametrize("if_none_match", [
+	"{etag}",
+	"W/{etag}",
+	'"stale", {etag}',
+	"*",
+])
+async def test_me_not_modified(me_client, if_none_match):
+	"""Test that a matching If-None-Match gets 304 with an empty body and the ETag"""
+	etag = (await me_client.get(ME_URL)).headers["etag"]
+
+	response = await me_client.get(ME_URL, headers={"If-None-Match": if_none_match.format(etag=etag)})
+	assert response.status_code == 304
+	assert response.content == b""
+	assert response.headers["etag"] == etag
+
+
+async def test_me_invalidation_changes_etag(me_client, fake_session, user):
+	"""Test that invalidating the cache serves the changed profile under a new ETag"""
+	first = await me_client.get(ME_URL)
+	etag = first.headers["etag"]
+
+	user.username = "alex"
+	await deps.invalidate_user_info_cache(user.id)
+
+	response = await me_client.get(ME_URL, headers={"If-None-Match": etag})
+	assert response.status_code == 200
+	assert response.json()["username"] == "alex"
+	assert response.headers["etag"] != etag
+	assert fake_session.queries == 2
+
+
+async def test_me_role_change_invalidates_cache(me_client, fake_session, user):
+	"""Test that dropping the roles cache drops the /me body too (roles are part of it)"""
+	assert (await me_client.get(ME_URL)).json()["is_admin"] is False
+
+	user.is_admin = True
+	await deps.invalidate_user_roles_cache(user.id)
+
+	assert (await me_client.get(ME_URL)).json()["is_admin"] is True
+	assert fake_session.queries == 2
@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+import redis.exceptions
+
+import app.db.redis as redis_module
+
+from app.api.v1.endpoints import auth
+from app.models.user import OAuthAccount
+
+CONFIG = {
+	"token_url": "https://provider.test/oauth2/token",
+	"client_id": "client",
+	"client_secret": "secret",
+}
+
+
+class FakeProvider:
+	"""Shared HTTP client stand-in: counts token POSTs and answers after a short delay"""
+
+	def __init__(self, status_code=200, error=None):
+		self.status_code = status_code
+		self.error = error
+		self.posts = []
+
+	async def post(self, url, data=None, timeout=None):
+		self.posts.append(data)
+		await asyncio.sleep(0.05)
+		if self.error is not None:
+			raise self.error
+		return httpx.Response(self.status_code, json={"access_token": "new", "refresh_token": "rotated"})
+
+
+@pytest.fixture
+def oauth_account():
+	return OAuthAccount(id=uuid.uuid4(), user_id=uuid.uuid4(), provider="discord", refresh_token="refresh")
+
+
+def use_provider(monkeypatch, provider: FakeProvider) -> FakeProvider:
+	monkeypatch.setattr(auth, "get_http_client", lambda: provider)
+	return provider
+
+
+async def test_concurrent_refreshes_share_one_post(fake_redis, monkeypatch, oauth_account):
+	"""Test that concurrent refreshes of one account in a process send a single POST"""
+	provider = use_provider(monkeypatch, FakeProvider())
+
+	results = await asyncio.gather(*(auth.request_refreshed_token(oauth_account, CONFIG) for _ in range(3)))
+
+	assert len(provider.posts) == 1
+	assert provider.posts[0]["refresh_token"] == "refresh"
+	assert results == [{"access_token": "new", "refresh_token": "rotated"}] * 3
+	assert auth._refresh_inflight == {}
+	# After a successful refresh the lock is left to expire, not released
+	lock_key = auth.oauth_refresh_lock_key(oauth_account)
+	assert 0 < await fake_redis.ttl(lock_key) <= auth.OAUTH_REFRESH_LOCK_TIMEOUT
+
+
+async def test_refresh_skipped_while_another_worker_holds_lock(fake_redis, monkeypatch, oauth_account):
+	"""Test that a worker that can't take the account's lock doesn't POST the same refresh token"""
+	provider = use_provider(monkeypatch, FakeProvider())
+	lock_key = auth.oauth_refresh_lock_key(oauth_account)
+	await fake_redis.set(lock_key, "other-worker", ex=auth.OAUTH_REFRESH_LOCK_TIMEOUT)
+
+	assert await auth.request_refreshed_token(oauth_account, CONFIG) is None
+	assert provider.posts == []
+	# The other worker's lock is left alone
+	assert await fake_redis.get(lock_key) == "other-worker"
+	assert auth._refresh_inflight == {}
+
+
+async def test_refresh_goes_ahead_while_redis_is_down(monkeypatch, oauth_account):
+	"""Test that a Redis outage doesn't stop OAuth refreshes: they run without the cross-worker lock"""
+	class UnavailableRedis:
+		async def set(self, *args, **kwargs):
+			raise redis.exceptions.ConnectionError("Connection refused")
+
+		async def delete(self, *args, **kwargs):
+			raise redis.exceptions.ConnectionError("Connection refused")
+
+	monkeypatch.setattr(redis_module, "_redis_client", UnavailableRedis())
+	provider = use_provider(monkeypatch, FakeProvider())
+
+	results = await asyncio.gather(*(auth.request_refreshed_token(oauth_account, CONFIG) for _ in range(2)))
+
+	# The in-process dedupe still holds: one POST for both callers
+	assert len(provider.posts) == 1
+	assert results == [{"access_token": "new", "refresh_token": "rotated"}] * 2
+	assert auth._refresh_inflight == {}
+
+
+async def test_rejected_refresh_releases_lock(fake_redis, monkeypatch, oauth_account):
+	"""Test that a refresh the provider rejected can be retried right away"""
+	provider = use_provider(monkeypatch, FakeProvider(status_code=400))
+
+	assert await auth.request_refreshed_token(oauth_account, CONFIG) is None
+	assert len(provider.posts) == 1
+	assert not await fake_redis.exists(auth.oauth_refresh_lock_key(oauth_account))
+
+
+async def test_failed_refresh_fails_leader_only(fake_redis, monkeypatch, oauth_account):
+	"""Test that a provider error is raised to the leader, followers get None and the lock is released"""
+	provider = use_provider(monkeypatch, FakeProvider(error=httpx.ConnectTimeout("timed out")))
+
+	leader = asyncio.create_task(auth.request_refreshed_token(oauth_account, CONFIG))
+	await asyncio.sleep(0)
+	follower = asyncio.create_task(auth.request_refreshed_token(oauth_account, CONFIG))
+
+	with pytest.raises(httpx.ConnectTimeout):
+		await leader
+	assert await follower is None
+	assert len(provider.posts) == 1
+	assert auth._refresh_inflight == {}
+	assert not await fake_redis.exists(auth.oauth_refresh_lock_key(oauth_account))
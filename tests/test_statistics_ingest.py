@@ -0,0 +1,72 @@
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.main import app
+from app.schemas.statistics import MinecraftStatisticsBatch, is_valid_uuid
+from app.services.resource_collection import validate_server_uuid
+
+client = TestClient(app)
+
+SERVER_UUID = "3f1c2a9e-8b7d-4e6f-a5c4-1b2d3e4f5a6b"
+PLAYER_UUID = "069a79f4-44e9-4726-a5be-fca90e38aaf5"
+
+
+@pytest.mark.parametrize("value", [
+	SERVER_UUID,
+	SERVER_UUID.upper(),
+])
+def test_is_valid_uuid_accepts_hyphenated_form(value):
+	"""Test that canonical 8-4-4-4-12 UUIDs pass in either case"""
+	assert is_valid_uuid(value)
+
+
+@pytest.mark.parametrize("value", [
+	"",
+	"not-a-uuid",
+	SERVER_UUID.replace("-", ""),
+	"{" + SERVER_UUID[1:-1] + "}",
+	SERVER_UUID[:-1] + "g",
+	"urn:uuid:" + SERVER_UUID,
+])
+def test_is_valid_uuid_rejects_other_forms(value):
+	"""Test that forms uuid.UUID() would parse but Postgres rows must not hold are rejected"""
+	assert not is_valid_uuid(value)
+
+
+def test_batch_rejects_malformed_server_uuid():
+	"""Test that the batch-level server_uuid is checked for format, not only length"""
+	with pytest.raises(ValidationError) as exc_info:
+		MinecraftStatisticsBatch(server_uuid="x" * 36)
+	assert exc_info.value.errors()[0]["loc"] == ("server_uuid",)
+
+
+def test_batch_rejects_malformed_nested_uuid():
+	"""Test that a bad UUID inside one of the arrays fails the whole batch"""
+	with pytest.raises(ValidationError) as exc_info:
+		MinecraftStatisticsBatch(
+			server_uuid=SERVER_UUID,
+			kills=[{
+				"killer_uuid": PLAYER_UUID,
+				"victim_uuid": "steve",
+				"server_uuid": SERVER_UUID,
+				"date": 1700000000000,
+			}]
+		)
+	assert exc_info.value.errors()[0]["loc"] == ("kills", 0, "victim_uuid")
+
+
+def test_batch_endpoint_returns_422_for_malformed_uuid():
+	"""Test that the ingest endpoint answers 422 before anything reaches the database"""
+	response = client.post("/api/v1/statistics/minecraft/batch", json={
+		"server_uuid": SERVER_UUID,
+		"users": [{"uuid": "not-a-uuid", "registered": 1700000000000, "name": "Steve"}],
+	})
+	assert response.status_code == 422
+	assert response.json()["detail"][0]["loc"] == ["body", "users", 0, "uuid"]
+
+
+async def test_validate_server_uuid_skips_query_for_malformed_uuid(fake_session):
+	"""Test that a malformed server UUID is "not found" without reaching the native uuid columns"""
+	assert await validate_server_uuid(fake_session, "x" * 36) is None
+	assert fake_session.queries == 0